@@ -32,6 +32,11 @@ type UploadResult = {
   }>;
 };
 
+// The report lists the first rows of each outcome, the summary counts all of them
+function listedCount(total: number, listed: number): string {
+  return listed < total ? `first ${listed} of ${total}` : `${total}`;
+}
+
 export default function BulkUploadPage() {
   const params = useParams();
   const router = useRouter();
@@ -203,7 +208,7 @@ export default function BulkUploadPage() {
             {result.errors.length > 0 && (
               <div style={{ marginTop: 20 }}>
                 <h4 style={{ fontSize: 14, fontWeight: 600, marginBottom: 8 }}>
-                  Errors ({result.errors.length}):
+                  Errors ({listedCount(result.summary.errors, result.errors.length)}):
                 </h4>
                 <div
                   style={{
@@ -235,7 +240,7 @@ export default function BulkUploadPage() {
             {result.skipped.length > 0 && (
               <div style={{ marginTop: 20 }}>
                 <h4 style={{ fontSize: 14, fontWeight: 600, marginBottom: 8 }}>
-                  Skipped ({result.skipped.length}):
+                  Skipped ({listedCount(result.summary.skipped, result.skipped.length)}):
                 </h4>
                 <div
                   style={{
@@ -259,7 +264,7 @@ export default function BulkUploadPage() {
             {result.created.length > 0 && (
               <div style={{ marginTop: 20 }}>
                 <h4 style={{ fontSize: 14, fontWeight: 600, marginBottom: 8 }}>
-                  Created ({result.created.length}):
+                  Created ({listedCount(result.summary.created, result.created.length)}):
                 </h4>
                 <div
                   style={{
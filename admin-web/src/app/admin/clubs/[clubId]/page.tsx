@@ -4,11 +4,19 @@ import { useEffect, useState } from 'react';
 import { useParams } from 'next/navigation';
 import Link from 'next/link';
 import { API_BASE } from '@/lib/apiConfig';
+import { fetchClubStats, type ClubStats } from '@/lib/api/adminMembers';
 
 export default function ClubDashboardPage() {
   const params = useParams();
   const clubId = params.clubId as string;
   const [clubName, setClubName] = useState<string | null>(null);
+  const [stats, setStats] = useState<ClubStats | null>(null);
+
+  useEffect(() => {
+    fetchClubStats(Number(clubId))
+      .then(setStats)
+      .catch((err) => console.error('Failed to fetch club stats:', err));
+  }, [clubId]);
 
   useEffect(() => {
     async function fetchClubName() {
@@ -64,6 +72,49 @@ export default function ClubDashboardPage() {
         {clubName ? `Managing Club: ${clubName}` : `Managing Club ID: ${clubId}`}
       </p>
 
+      {stats && (
+        <div
+          style={{
+            marginTop: 24,
+            display: 'grid',
+            gridTemplateColumns: 'repeat(auto-fit, minmax(150px, 1fr))',
+            gap: 16,
+          }}
+        >
+          <Stat label="Active members" value={stats.members.active} />
+          <Stat label="Pending requests" value={stats.members.pending} />
+          <Stat label="Rejected" value={stats.members.rejected} />
+          <Stat label="Expired" value={stats.members.expired} />
+          <Stat
+            label={`Expiring in ${stats.expiring_days} days`}
+            value={stats.members.expiring}
+          />
+        </div>
+      )}
+
+      {stats && stats.passes_per_event.length > 0 && (
+        <table style={{ marginTop: 24, width: '100%', borderCollapse: 'collapse' }}>
+          <thead>
+            <tr style={{ textAlign: 'left', color: '#555' }}>
+              <th style={{ padding: 8 }}>Event</th>
+              <th style={{ padding: 8 }}>Date</th>
+              <th style={{ padding: 8 }}>Passes</th>
+            </tr>
+          </thead>
+          <tbody>
+            {stats.passes_per_event.map((e) => (
+              <tr key={e.event_id} style={{ borderTop: '1px solid #eee' }}>
+                <td style={{ padding: 8 }}>{e.title}</td>
+                <td style={{ padding: 8 }}>{new Date(e.event_date).toLocaleDateString()}</td>
+                <td style={{ padding: 8 }}>
+                  {e.capacity ? `${e.passes} / ${e.capacity}` : e.passes}
+                </td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      )}
+
       <div
         style={{
           marginTop: 24,
@@ -100,3 +151,19 @@ function Card({ title }: { title: string }) {
     </div>
   );
 }
+
+function Stat({ label, value }: { label: string; value: number }) {
+  return (
+    <div
+      style={{
+        background: '#fff',
+        padding: 16,
+        borderRadius: 10,
+        border: '1px solid #e5e5e5',
+      }}
+    >
+      <div style={{ fontSize: 24, fontWeight: 700 }}>{value}</div>
+      <p style={{ marginTop: 4, color: '#666' }}>{label}</p>
+    </div>
+  );
+}
@@ -29,21 +29,31 @@ export default function ClubPassesPage() {
           return;
         }
 
-        const res = await fetch(
-          `${API_BASE}/admin/clubs/${clubId}/passes`,
-          {
+        // The endpoint is paginated, follow next_cursor to the last page
+        const all: EventPass[] = [];
+        let cursor: string | null = null;
+
+        do {
+          const url: string = cursor
+            ? `${API_BASE}/admin/clubs/${clubId}/passes?cursor=${encodeURIComponent(cursor)}`
+            : `${API_BASE}/admin/clubs/${clubId}/passes`;
+
+          const res = await fetch(url, {
             headers: {
               Authorization: `Bearer ${token}`,
             },
+          });
+
+          if (!res.ok) {
+            throw new Error('Failed to load passes');
           }
-        );
 
-        if (!res.ok) {
-          throw new Error('Failed to load passes');
-        }
+          const data = await res.json();
+          all.push(...data.items);
+          cursor = data.next_cursor;
+        } while (cursor);
 
-        const data = await res.json();
-        setPasses(data);
+        setPasses(all);
       } catch (err) {
         console.error(err);
         alert('Failed to load passes');
@@ -6,6 +6,7 @@ import {
   fetchPendingMembers,
   approveMember,
   rejectMember,
+  bulkDecideMembers,
   PendingMember,
 } from '@/lib/api/adminMembers';
 
@@ -14,6 +15,8 @@ type ActionState = {
   type: ActionType;
   membershipId: number | null;
   memberName: string;
+  // Set when the action applies to every selected member
+  bulkIds?: number[];
 };
 
 export default function PendingMembersPage() {
@@ -33,6 +36,7 @@ export default function PendingMembersPage() {
   const [rejectionReason, setRejectionReason] = useState('');
   const [processing, setProcessing] = useState(false);
   const [actionError, setActionError] = useState<string | null>(null);
+  const [selected, setSelected] = useState<number[]>([]);
 
   async function loadMembers() {
     try {
@@ -40,6 +44,9 @@ export default function PendingMembersPage() {
       setError(null);
       const data = await fetchPendingMembers(clubId);
       setMembers(data);
+      setSelected((prev) =>
+        prev.filter((id) => data.some((m) => m.membership_id === id))
+      );
     } catch (err) {
       console.error(err);
       setError('Failed to fetch pending members');
@@ -71,6 +78,57 @@ export default function PendingMembersPage() {
     setActionError(null);
   }
 
+  function toggleSelected(membershipId: number) {
+    setSelected((prev) =>
+      prev.includes(membershipId)
+        ? prev.filter((id) => id !== membershipId)
+        : [...prev, membershipId]
+    );
+  }
+
+  function toggleAll() {
+    setSelected((prev) =>
+      prev.length === members.length ? [] : members.map((m) => m.membership_id)
+    );
+  }
+
+  function openBulkDialog(type: 'approve' | 'reject') {
+    setActionState({
+      type,
+      membershipId: null,
+      memberName: `${selected.length} selected members`,
+      bulkIds: selected,
+    });
+    setRejectionReason('');
+    setActionError(null);
+  }
+
+  async function confirmBulk(type: 'approve' | 'reject') {
+    const ids = actionState.bulkIds ?? [];
+    const reason = rejectionReason.trim();
+
+    try {
+      setProcessing(true);
+      setActionError(null);
+      await bulkDecideMembers(
+        clubId,
+        ids.map((membership_id) =>
+          type === 'approve'
+            ? { membership_id, decision: 'approve' }
+            : { membership_id, decision: 'reject', reason }
+        )
+      );
+      setSelected([]);
+      closeActionDialog();
+      await loadMembers();
+    } catch (err) {
+      console.error(`Failed to ${type} members:`, err);
+      setActionError(`Failed to ${type} members. Please try again.`);
+    } finally {
+      setProcessing(false);
+    }
+  }
+
   function closeActionDialog() {
     setActionState({ type: null, membershipId: null, memberName: '' });
     setRejectionReason('');
@@ -78,6 +136,10 @@ export default function PendingMembersPage() {
   }
 
   async function confirmApprove() {
+    if (actionState.bulkIds) {
+      if (!processing) await confirmBulk('approve');
+      return;
+    }
     if (!actionState.membershipId || processing) return;
 
     try {
@@ -107,6 +169,10 @@ export default function PendingMembersPage() {
   }
 
   async function confirmReject() {
+    if (actionState.bulkIds && rejectionReason.trim()) {
+      if (!processing) await confirmBulk('reject');
+      return;
+    }
     if (!actionState.membershipId || !rejectionReason.trim() || processing) {
       if (!rejectionReason.trim()) {
         setActionError('Please enter a rejection reason');
@@ -160,9 +226,53 @@ export default function PendingMembersPage() {
 
       {members.length === 0 && <p>No pending members.</p>}
 
+      {selected.length > 0 && (
+        <div style={{ marginTop: 16, display: 'flex', gap: 8, alignItems: 'center' }}>
+          <span>{selected.length} selected</span>
+          <button
+            onClick={() => openBulkDialog('approve')}
+            disabled={processing}
+            style={{
+              padding: '6px 12px',
+              backgroundColor: processing ? '#ccc' : '#22c55e',
+              color: '#fff',
+              border: 'none',
+              borderRadius: '4px',
+              cursor: processing ? 'not-allowed' : 'pointer',
+              fontSize: '14px',
+            }}
+          >
+            Approve selected
+          </button>
+          <button
+            onClick={() => openBulkDialog('reject')}
+            disabled={processing}
+            style={{
+              padding: '6px 12px',
+              backgroundColor: processing ? '#ccc' : '#dc2626',
+              color: '#fff',
+              border: 'none',
+              borderRadius: '4px',
+              cursor: processing ? 'not-allowed' : 'pointer',
+              fontSize: '14px',
+            }}
+          >
+            Reject selected
+          </button>
+        </div>
+      )}
+
       <table style={{ marginTop: 20, width: '100%', borderCollapse: 'collapse' }}>
         <thead>
           <tr>
+            <th align="left" style={{ padding: '8px', borderBottom: '1px solid #ddd' }}>
+              <input
+                type="checkbox"
+                checked={members.length > 0 && selected.length === members.length}
+                onChange={toggleAll}
+                disabled={processing}
+              />
+            </th>
             <th align="left" style={{ padding: '8px', borderBottom: '1px solid #ddd' }}>
               Phone
             </th>
@@ -184,6 +294,14 @@ export default function PendingMembersPage() {
             
             return (
               <tr key={m.membership_id}>
+                <td style={{ padding: '8px', borderBottom: '1px solid #eee' }}>
+                  <input
+                    type="checkbox"
+                    checked={selected.includes(m.membership_id)}
+                    onChange={() => toggleSelected(m.membership_id)}
+                    disabled={processing}
+                  />
+                </td>
                 <td style={{ padding: '8px', borderBottom: '1px solid #eee' }}>
                   {m.phone}
                 </td>
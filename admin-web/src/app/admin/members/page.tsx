@@ -8,7 +8,6 @@ import {
   rejectMember,
   PendingMember,
 } from '@/lib/api/adminMembers';
-import { API_BASE } from '@/lib/apiConfig';
 
 type ActionType = 'approve' | 'reject' | null;
 type ActionState = {
@@ -43,22 +42,7 @@ export default function MembersPage() {
     try {
       setLoading(true);
       setError(null);
-      const token = localStorage.getItem('admin_token');
-      const res = await fetch(
-        `${API_BASE}/admin/clubs/${clubId}/pending-members`,
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
-      
-      if (!res.ok) {
-        throw new Error('Failed to load pending members');
-      }
-      
-      const data = await res.json();
-      setMembers(data);
+      setMembers(await fetchPendingMembers(Number(clubId)));
     } catch (err) {
       console.error('Failed to load members', err);
       setError('Failed to load pending members');
@@ -17,25 +17,48 @@ export type ClubMember = {
   rejection_reason: string | null;
 };
 
-// PENDING MEMBERS
+type Page<T> = {
+  items: T[];
+  next_cursor: string | null;
+};
 
-export async function fetchPendingMembers(clubId: number): Promise<PendingMember[]> {
+// Follows next_cursor until the last page
+async function fetchAllPages<T>(url: string, errorMessage: string): Promise<T[]> {
   const token = localStorage.getItem('admin_token');
+  const items: T[] = [];
+  let cursor: string | null = null;
 
-  const res = await fetch(
-    `${API_BASE}/admin/clubs/${clubId}/pending-members`,
-    {
+  do {
+    const pageUrl: string = cursor
+      ? `${url}?cursor=${encodeURIComponent(cursor)}`
+      : url;
+
+    const res = await fetch(pageUrl, {
       headers: {
         Authorization: `Bearer ${token}`,
       },
+    });
+
+    if (!res.ok) {
+      const text = await res.text();
+      throw new Error(text || errorMessage);
     }
-  );
 
-  if (!res.ok) {
-    throw new Error('Failed to fetch pending members');
-  }
+    const page: Page<T> = await res.json();
+    items.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
 
-  return res.json();
+  return items;
+}
+
+// PENDING MEMBERS
+
+export async function fetchPendingMembers(clubId: number): Promise<PendingMember[]> {
+  return fetchAllPages<PendingMember>(
+    `${API_BASE}/admin/clubs/${clubId}/pending-members`,
+    'Failed to fetch pending members'
+  );
 }
 
 export async function approveMember(membershipId: number) {
@@ -79,25 +102,87 @@ export async function rejectMember(
   }
 }
 
-// ALL MEMBERS
+// BULK DECISIONS
 
-export async function fetchAllClubMembers(
-  clubId: number
-): Promise<ClubMember[]> {
+export type MemberDecision = {
+  membership_id: number;
+  decision: 'approve' | 'reject';
+  reason?: string;
+};
+
+export type DecisionResult = {
+  membership_id: number;
+  outcome: 'approved' | 'rejected' | 'unchanged' | 'not_found';
+};
+
+export async function bulkDecideMembers(
+  clubId: number,
+  decisions: MemberDecision[]
+): Promise<DecisionResult[]> {
   const token = localStorage.getItem('admin_token');
 
   const res = await fetch(
-    `${API_BASE}/admin/clubs/${clubId}/members`,
+    `${API_BASE}/admin/clubs/${clubId}/memberships/bulk-decision`,
     {
+      method: 'POST',
       headers: {
+        'Content-Type': 'application/json',
         Authorization: `Bearer ${token}`,
       },
+      body: JSON.stringify({ decisions }),
     }
   );
 
   if (!res.ok) {
-    const text = await res.text();
-    throw new Error(text || 'Failed to fetch members');
+    throw new Error('Failed to update memberships');
+  }
+
+  const data = await res.json();
+  return data.results;
+}
+
+// ALL MEMBERS
+
+export async function fetchAllClubMembers(
+  clubId: number
+): Promise<ClubMember[]> {
+  return fetchAllPages<ClubMember>(
+    `${API_BASE}/admin/clubs/${clubId}/members`,
+    'Failed to fetch members'
+  );
+}
+
+// DASHBOARD STATS
+
+export type ClubStats = {
+  members: {
+    active: number;
+    pending: number;
+    rejected: number;
+    expired: number;
+    expiring: number;
+  };
+  expiring_days: number;
+  passes_per_event: Array<{
+    event_id: number;
+    title: string;
+    event_date: string;
+    capacity: number | null;
+    passes: number;
+  }>;
+};
+
+export async function fetchClubStats(clubId: number): Promise<ClubStats> {
+  const token = localStorage.getItem('admin_token');
+
+  const res = await fetch(`${API_BASE}/admin/clubs/${clubId}/stats`, {
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+  });
+
+  if (!res.ok) {
+    throw new Error('Failed to fetch club stats');
   }
 
   return res.json();
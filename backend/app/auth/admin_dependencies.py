@@ -1,68 +1,86 @@
+import os
 from fastapi import Depends, HTTPException
-from app.core.auth import get_current_user_id
-from app.db.session import engine
-from sqlalchemy import text
+from app.core.auth import get_token_claims
+from app.core.cache import TTLCache
+from app.core.tokens import admin_club_ids
+from app.auth.role_cache import get_cached_admin_role
+from app.db.async_session import RequestDB, request_db, run_db
+from app.db.event_repo import get_event_club_id
 
+# event_id -> club_id, which never changes for an event
+EVENT_CLUB_CACHE_TTL_SECONDS = float(os.getenv("EVENT_CLUB_CACHE_TTL_SECONDS", "3600"))
+_event_clubs = TTLCache(max_entries=10000, ttl_seconds=EVENT_CLUB_CACHE_TTL_SECONDS)
 
-def get_admin_user(
-    user_id: int = Depends(get_current_user_id),
+
+async def get_admin_user(
+    claims: dict = Depends(get_token_claims),
+    db: RequestDB = request_db,
 ):
     """
     Verify user has admin or superadmin role in at least one club.
+    Answered from the token's role claims when they are fresh, else from the role cache.
     """
-    with engine.connect() as conn:
-        result = conn.execute(
-            text(
-                """
-                SELECT 1
-                FROM memberships
-                WHERE user_id = :user_id
-                  AND role IN ('admin', 'superadmin')
-                LIMIT 1
-                """
-            ),
-            {"user_id": user_id},
-        ).fetchone()
-
-        if not result:
-            raise HTTPException(
-                status_code=403,
-                detail="Admin access required",
-            )
+    user_id = claims["sub"]
+    club_ids = admin_club_ids(claims)
+
+    if club_ids is not None:
+        is_admin = bool(club_ids)
+    else:
+        is_admin = await get_cached_admin_role(user_id, None, db) is not None
+
+    if not is_admin:
+        raise HTTPException(
+            status_code=403,
+            detail="Admin access required",
+        )
 
     return user_id
 
 
-def get_club_admin(
+async def get_club_admin(
     club_id: int,
-    user_id: int = Depends(get_current_user_id),
+    claims: dict = Depends(get_token_claims),
+    db: RequestDB = request_db,
 ):
     """
     Verify user has admin or superadmin role for the specific club.
     Returns user_id if authorized, raises 403 if not.
     """
-    with engine.connect() as conn:
-        result = conn.execute(
-            text(
-                """
-                SELECT 1
-                FROM memberships
-                WHERE user_id = :user_id
-                  AND club_id = :club_id
-                  AND role IN ('admin', 'superadmin')
-                LIMIT 1
-                """
-            ),
-            {
-                "user_id": user_id,
-                "club_id": club_id,
-            },
-        ).fetchone()
-
-        if not result:
-            raise HTTPException(
-                status_code=403,
-                detail="Admin access required for this club",
-            )
+    return await _require_club_admin(claims, club_id, db)
+
+
+async def get_event_admin(
+    event_id: int,
+    claims: dict = Depends(get_token_claims),
+    db: RequestDB = request_db,
+):
+    """
+    Verify user is an admin of the club that runs the event.
+    Raises 404 if the event doesn't exist.
+    """
+    club_id = _event_clubs.get(event_id)
+    if club_id is None:
+        club_id = await run_db(get_event_club_id, event_id, db=db)
+        if club_id is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        _event_clubs.set(event_id, club_id)
+
+    return await _require_club_admin(claims, club_id, db)
+
+
+async def _require_club_admin(claims: dict, club_id: int, db: RequestDB):
+    user_id = claims["sub"]
+    club_ids = admin_club_ids(claims)
+
+    if club_ids is not None:
+        is_admin = club_id in club_ids
+    else:
+        is_admin = await get_cached_admin_role(user_id, club_id, db) is not None
+
+    if not is_admin:
+        raise HTTPException(
+            status_code=403,
+            detail="Admin access required for this club",
+        )
 
     return user_id
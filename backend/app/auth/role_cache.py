@@ -0,0 +1,71 @@
+import os
+from typing import Optional
+
+from app.core.cache import TTLCache, publish_invalidation, subscribe_invalidations
+from app.db.async_session import RequestDB, run_db
+from app.db.membership_repo import get_admin_role
+
+# Invalidations only reach this process until a shared backend is installed
+# (app.core.cache.set_invalidation_backend), so with several workers a revoked
+# admin keeps access on the other workers for up to this long.
+ROLE_CACHE_TTL_SECONDS = float(os.getenv("ROLE_CACHE_TTL_SECONDS", "60"))
+ROLE_CACHE_MAX_ENTRIES = int(os.getenv("ROLE_CACHE_MAX_ENTRIES", "10000"))
+
+# (user_id, club_id) -> 'admin' / 'superadmin' / None.
+# club_id None means "admin of any club".
+_cache = TTLCache(max_entries=ROLE_CACHE_MAX_ENTRIES, ttl_seconds=ROLE_CACHE_TTL_SECONDS)
+
+_NOT_CACHED = object()
+
+# Bumped by every invalidation, so a lookup that overlapped one isn't stored
+_epoch = 0
+
+
+def _on_invalidate(message: dict):
+    global _epoch
+    if message.get("cache") != "admin_roles":
+        return
+    user_id = message.get("user_id")
+    club_id = message.get("club_id")
+
+    _epoch += 1
+
+    if user_id is not None and club_id is not None:
+        _cache.delete((user_id, club_id))
+        _cache.delete((user_id, None))
+    elif user_id is not None:
+        _cache.delete_where(lambda key: key[0] == user_id)
+    elif club_id is not None:
+        # The "any club" entries of the club's members are unknown here, drop them all
+        _cache.delete_where(lambda key: key[1] == club_id or key[1] is None)
+    else:
+        _cache.clear()
+
+
+subscribe_invalidations(_on_invalidate)
+
+
+def invalidate_admin_roles(user_id: Optional[int] = None, club_id: Optional[int] = None):
+    """
+    Call after memberships or roles change. With neither argument, everything is dropped.
+    """
+    publish_invalidation({"cache": "admin_roles", "user_id": user_id, "club_id": club_id})
+
+
+async def get_cached_admin_role(user_id: int, club_id: Optional[int], db: RequestDB) -> Optional[str]:
+    key = (user_id, club_id)
+    role = _cache.get(key, default=_NOT_CACHED)
+    if role is not _NOT_CACHED:
+        return role
+
+    epoch = _epoch
+    role = await run_db(get_admin_role, user_id, club_id, db=db)
+    # The role may have been read before an invalidation landed: use it, don't cache it
+    if _epoch == epoch:
+        _cache.set(key, role)
+    return role
+
+
+def get_role_cache_stats() -> dict:
+    return _cache.stats()
+
@@ -1,18 +1,32 @@
-from fastapi import Header, HTTPException
+import os
+from fastapi import Depends, Header, HTTPException
+from app.core.tokens import TokenError, decode_token
 
+# Accept the old unsigned "user-{id}" tokens while clients move to signed ones.
+# Anyone can write one for any user id, so this is off unless set explicitly.
+# Legacy tokens carry no roles, so admin checks for them go to the database.
+AUTH_ALLOW_LEGACY_TOKENS = os.getenv("AUTH_ALLOW_LEGACY_TOKENS", "false").lower() == "true"
 
-def get_current_user_id(authorization: str = Header(...)):
+
+def get_token_claims(authorization: str = Header(...)) -> dict:
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid auth header")
 
     token = authorization.replace("Bearer ", "")
 
-    if not token.startswith("user-"):
-        raise HTTPException(status_code=401, detail="Invalid token")
+    if token.startswith("user-"):
+        if not AUTH_ALLOW_LEGACY_TOKENS:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        try:
+            return {"sub": int(token.replace("user-", "")), "legacy": True}
+        except ValueError:
+            raise HTTPException(status_code=401, detail="Invalid token format")
 
     try:
-        user_id = int(token.replace("user-", ""))
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Invalid token format")
+        return decode_token(token)
+    except TokenError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
 
-    return user_id
+def get_current_user_id(claims: dict = Depends(get_token_claims)):
+    return claims["sub"]
@@ -0,0 +1,235 @@
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from app.core.metrics import Counter, Histogram
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with a per-entry TTL and LRU eviction
+    once max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = Counter()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits.inc()
+                return entry[1]
+            if entry is not _MISSING:
+                del self._entries[key]
+        self.misses.inc()
+        return default
+
+    def set(self, key, value, ttl_seconds: Optional[float] = None):
+        expires_at = time.monotonic() + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions.inc()
+
+    def peek(self, key, default=None):
+        """
+        Like get(), without counting a hit or miss or refreshing LRU order.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_where(self, predicate):
+        """
+        Drop every entry whose key matches predicate. O(entries).
+        """
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        hits = self.hits.value
+        misses = self.misses.value
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+            "evictions": self.evictions.value,
+        }
+
+
+class InvalidationBackend(ABC):
+    """
+    Carries invalidation messages between cache instances.
+    A shared implementation (e.g. Redis pub/sub) lets every gunicorn worker
+    drop its entries when one worker sees a write.
+    Messages are plain JSON-safe dicts naming their cache under "cache".
+    """
+
+    @abstractmethod
+    def publish(self, message: dict):
+        ...
+
+    @abstractmethod
+    def subscribe(self, handler):
+        ...
+
+
+class InMemoryInvalidationBackend(InvalidationBackend):
+    """
+    Delivers messages to subscribers in this process only.
+    """
+
+    def __init__(self):
+        self._handlers = []
+
+    def publish(self, message: dict):
+        for handler in list(self._handlers):
+            handler(message)
+
+    def subscribe(self, handler):
+        self._handlers.append(handler)
+
+
+# Every cache in the process publishes and subscribes through this backend
+_backend: InvalidationBackend = InMemoryInvalidationBackend()
+_handlers = []
+
+
+def _dispatch(message: dict):
+    for handler in list(_handlers):
+        handler(message)
+
+
+_backend.subscribe(_dispatch)
+
+
+def set_invalidation_backend(backend: InvalidationBackend):
+    """
+    Install a shared backend (e.g. Redis pub/sub) for every cache at once.
+    Until then invalidations only reach the worker that made the write,
+    and other workers see the change when their entries expire.
+    Call it at startup, before requests are served.
+    """
+    global _backend
+    _backend = backend
+    _backend.subscribe(_dispatch)
+
+
+def subscribe_invalidations(handler):
+    """
+    handler(message) is called for every invalidation, from any cache.
+    """
+    _handlers.append(handler)
+
+
+def publish_invalidation(message: dict):
+    _backend.publish(message)
+
+
+class ReadThroughCache:
+    """
+    Async read-through cache over a TTLCache.
+
+    get() returns the cached value or awaits loader() to fetch it.
+    Concurrent misses for the same key share one load (single-flight), so
+    an expired hot key costs one query instead of one per waiting request.
+    The load runs as its own task: a caller that disconnects doesn't
+    cancel it for the others.
+
+    Invalidations go through the process-wide InvalidationBackend so every
+    worker drops the key. A load that overlapped an invalidation may have read
+    the old data: it is returned to its waiters but not stored.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._inflight = {}  # key -> asyncio.Task
+        # Bumped by every invalidation. Writes are rare, so skipping the
+        # store for loads of unrelated keys costs little.
+        self._epoch = 0
+        self.loads = Counter()
+        self.coalesced = Counter()
+        self.load_ms = Histogram()
+        subscribe_invalidations(self._on_invalidate)
+
+    async def get(self, key: str, loader: Callable[[], Awaitable], ttl_seconds: Optional[float] = None):
+        value = self._cache.get(key, default=_MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, ttl_seconds))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        else:
+            self.coalesced.inc()
+
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, loader, ttl_seconds: Optional[float]):
+        epoch = self._epoch
+        self.loads.inc()
+        started = time.perf_counter()
+        value = await loader()
+        self.load_ms.observe((time.perf_counter() - started) * 1000)
+
+        if self._epoch == epoch:
+            self._cache.set(key, value, ttl_seconds)
+        return value
+
+    def peek(self, key: str, default=None):
+        """
+        The cached value, without loading it.
+        """
+        return self._cache.peek(key, default)
+
+    def invalidate(self, key: str):
+        publish_invalidation({"cache": self.name, "key": key})
+
+    def _on_invalidate(self, message: dict):
+        if message.get("cache") != self.name:
+            return
+        key = message.get("key")
+        self._epoch += 1
+        self._cache.delete(key)
+        # New callers start a fresh load instead of joining one that may be stale
+        self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats["loads"] = self.loads.value
+        stats["coalesced"] = self.coalesced.value
+        stats["load_ms"] = self.load_ms.snapshot()
+        return stats
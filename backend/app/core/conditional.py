@@ -0,0 +1,65 @@
+import hashlib
+import inspect
+import json
+from email.utils import formatdate
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Clients may keep the body but must revalidate before using it
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """
+    Weak ETag from a version stamp, e.g. (scope, id, row count, max updated_at).
+    """
+    raw = json.dumps(parts, default=str, separators=(",", ":")).encode()
+    return f'W/"{hashlib.sha256(raw).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    True if the request's If-None-Match lists etag (weak comparison) or is *.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _headers(etag: str, last_modified: Optional[float]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(float(last_modified), usegmt=True)
+    return headers
+
+
+async def conditional_response(
+    request: Request,
+    etag: str,
+    build: Callable,
+    last_modified: Optional[float] = None,
+) -> Response:
+    """
+    304 Not Modified if the client already has etag, else the JSON from
+    build() (sync or async) with ETag and Last-Modified headers. build() only runs
+    when the payload is actually sent. last_modified is epoch seconds.
+
+    The 304 decision is made on If-None-Match only: Last-Modified has
+    one-second resolution and can't reflect deleted rows, so it is sent
+    for information and If-Modified-Since is ignored.
+    """
+    headers = _headers(etag, last_modified)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    content = build()
+    if inspect.isawaitable(content):
+        content = await content
+    return JSONResponse(jsonable_encoder(content), headers=headers)
@@ -0,0 +1,19 @@
+import os
+
+# Local development only: lets the server start without its secrets and use a
+# public placeholder instead. Anyone can sign tokens or forge pass codes with
+# it, so never set this on a deployed server.
+ALLOW_DEV_KEYS = os.getenv("ALLOW_DEV_KEYS", "false").lower() in ("1", "true")
+
+_DEV_KEY = "clubvision-dev-only"
+
+
+def dev_key(name: str) -> str:
+    """
+    The placeholder secret for an unset setting name, or a RuntimeError
+    (refusing to start) unless ALLOW_DEV_KEYS is set.
+    """
+    if not ALLOW_DEV_KEYS:
+        raise RuntimeError(f"{name} is not set. Set it, or ALLOW_DEV_KEYS=1 for local development.")
+    print(f"[KEYS] {name} is not set, using an insecure development key (ALLOW_DEV_KEYS)")
+    return _DEV_KEY
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows are buffered into chunks of about this many bytes before being sent,
+# so a large export isn't written to the socket one small row at a time
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _csv_chunks(rows: Iterable[dict], fields: list[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    # Send the header straight away so the download starts before the query returns
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows: Iterable[dict]) -> Iterator[str]:
+    rows = iter(rows)
+    # Like the CSV header, the first row goes out on its own
+    for row in rows:
+        yield json.dumps(row, default=str) + "\n"
+        break
+
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, default=str) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield "".join(lines)
+            lines = []
+            size = 0
+
+    if lines:
+        yield "".join(lines)
+
+
+def export_response(rows: Iterable[dict], fields: list[str], export_format: str, filename: str) -> StreamingResponse:
+    """
+    Stream rows as CSV (columns in fields order) or NDJSON.
+
+    rows should be a lazy generator, e.g. a repo iter_* function: it is
+    consumed on a worker thread while the response is being sent, so only
+    one chunk is held in memory at a time.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+
+    chunks = _csv_chunks(rows, fields) if export_format == "csv" else _ndjson_chunks(rows)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
@@ -0,0 +1,66 @@
+import bisect
+import threading
+
+# Latency buckets in milliseconds, the last bucket is +Inf
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram of observations in milliseconds.
+    """
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self._buckets = tuple(buckets_ms)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float):
+        index = bisect.bisect_left(self._buckets, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value_ms
+            if value_ms > self._max:
+                self._max = value_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total_ms = self._sum
+            max_ms = self._max
+
+        count = sum(counts)
+        buckets = {}
+        cumulative = 0
+        for bound, bucket_count in zip(self._buckets, counts):
+            cumulative += bucket_count
+            buckets[f"le_{bound}ms"] = cumulative
+        buckets["le_inf"] = count
+
+        return {
+            "count": count,
+            "sum_ms": round(total_ms, 3),
+            "avg_ms": round(total_ms / count, 3) if count else None,
+            "max_ms": round(max_ms, 3),
+            "buckets": buckets,
+        }
+
+
+class Counter:
+    """
+    Thread-safe counter.
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
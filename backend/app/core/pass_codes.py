@@ -0,0 +1,114 @@
+import hashlib
+import hmac
+import os
+import re
+from typing import Optional
+
+from app.core.dev_keys import dev_key
+
+# Secret for pass codes. Codes can't be verified after it changes, so it is
+# not rotated like the token keys: passes would have to be re-issued.
+# Fails closed: with a known key anyone could compute valid codes.
+PASS_CODE_KEY = os.getenv("PASS_CODE_KEY", "") or dev_key("PASS_CODE_KEY")
+
+_key = PASS_CODE_KEY.encode()
+
+# Crockford base32: no I, L, O or U, so codes read aloud or typed from paper
+# don't get confused
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_VALUES = {c: i for i, c in enumerate(_ALPHABET)}
+_TYPO_FIXES = str.maketrans({"O": "0", "I": "1", "L": "1"})
+
+# A code is 6 characters of permuted serial followed by a 4 character tag
+SERIAL_BITS = 30
+TAG_BITS = 20
+_HALF_BITS = SERIAL_BITS // 2
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_FEISTEL_ROUNDS = 4
+_TAG_LENGTH = TAG_BITS // 5
+CODE_LENGTH = SERIAL_BITS // 5 + _TAG_LENGTH
+
+# Passes issued before these codes: str(uuid4())[:10]
+_LEGACY_CODE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]$")
+
+MAX_SERIAL = (1 << SERIAL_BITS) - 1
+
+
+def _prf(event_id: int, label: str, value: int, bits: int) -> int:
+    digest = hashlib.blake2b(f"{event_id}:{label}:{value}".encode(), key=_key, digest_size=8).digest()
+    return int.from_bytes(digest, "big") & ((1 << bits) - 1)
+
+
+def _permute(event_id: int, serial: int) -> int:
+    left, right = serial >> _HALF_BITS, serial & _HALF_MASK
+    for round_ in range(_FEISTEL_ROUNDS):
+        left, right = right, left ^ _prf(event_id, f"r{round_}", right, _HALF_BITS)
+    return (left << _HALF_BITS) | right
+
+
+def _unpermute(event_id: int, value: int) -> int:
+    left, right = value >> _HALF_BITS, value & _HALF_MASK
+    for round_ in reversed(range(_FEISTEL_ROUNDS)):
+        left, right = right ^ _prf(event_id, f"r{round_}", left, _HALF_BITS), left
+    return (left << _HALF_BITS) | right
+
+
+def _tag(event_id: int, serial: int) -> int:
+    return _prf(event_id, "tag", serial, TAG_BITS)
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def make_pass_code(event_id: int, serial: int) -> str:
+    """
+    Code for the event's serial'th pass. Serials come from the event's
+    pass sequence, so codes are unique per event; the keyed permutation
+    keeps them from looking sequential.
+    """
+    if not 0 < serial <= MAX_SERIAL:
+        raise ValueError("Pass serial out of range")
+    body = _encode(_permute(event_id, serial), CODE_LENGTH - _TAG_LENGTH)
+    return body + _encode(_tag(event_id, serial), _TAG_LENGTH)
+
+
+def normalize_pass_code(code: str) -> str:
+    """
+    Canonical form of a scanned or typed code. Legacy codes are kept as they are.
+    """
+    code = code.strip()
+    if _LEGACY_CODE.match(code):
+        return code
+    return code.upper().replace("-", "").replace(" ", "").translate(_TYPO_FIXES)
+
+
+def is_legacy_pass_code(code: str) -> bool:
+    return bool(_LEGACY_CODE.match(code))
+
+
+def verify_pass_code(event_id: int, code: str) -> Optional[int]:
+    """
+    Serial of a normalized code if it was issued for event_id, else None.
+    Mistyped codes, made-up codes and codes of other events fail the tag
+    check without a database lookup.
+    """
+    if len(code) != CODE_LENGTH:
+        return None
+    value = 0
+    for char in code[:-_TAG_LENGTH]:
+        digit = _VALUES.get(char)
+        if digit is None:
+            return None
+        value = (value << 5) | digit
+
+    serial = _unpermute(event_id, value)
+    if serial == 0:
+        return None
+    if not hmac.compare_digest(_encode(_tag(event_id, serial), _TAG_LENGTH), code[-_TAG_LENGTH:]):
+        return None
+    return serial
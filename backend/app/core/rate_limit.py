@@ -0,0 +1,113 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.core.metrics import Counter
+
+# Behind a reverse proxy request.client is the proxy; trust X-Forwarded-For only when set
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets held in memory (per worker process).
+
+    Each key gets capacity tokens, refilled at refill_per_second. Buckets are
+    kept in LRU order and capped at max_keys; an evicted key starts full again.
+    """
+
+    def __init__(self, name: str, capacity: float, refill_per_second: float, max_keys: int = 100_000):
+        # A bucket below one token never allows a request, and with no refill
+        # acquire() would divide by zero once it is empty
+        if capacity < 1:
+            raise ValueError(f"Rate limit {name}: capacity must be at least 1")
+        if refill_per_second <= 0:
+            raise ValueError(f"Rate limit {name}: refill_per_second must be positive")
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+        self.allowed = Counter()
+        self.throttled = Counter()
+
+    def acquire(self, key: str) -> float:
+        """
+        Take one token for key. Returns 0 if allowed, else seconds until a token is available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.capacity, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.allowed.inc()
+                return 0
+
+            self.throttled.inc()
+            return (1 - bucket[0]) / self.refill_per_second
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "refill_per_second": self.refill_per_second,
+            "keys": len(self._buckets),
+            "allowed": self.allowed.value,
+            "throttled": self.throttled.value,
+        }
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def too_many_requests(retry_after: float, detail: str = "Too many requests") -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": detail},
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
+
+
+class RateLimitMiddleware:
+    """
+    Rate limit requests by client IP on selected routes.
+
+    rules maps (method, path) to a TokenBucketLimiter, e.g.
+        app.add_middleware(RateLimitMiddleware, rules={("POST", "/auth/request-otp"): limiter})
+    Limits keyed on the request body (like the phone number) belong in the handler.
+    """
+
+    def __init__(self, app, rules: dict):
+        self.app = app
+        self.rules = rules
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            limiter = self.rules.get((scope["method"], scope["path"]))
+            if limiter is not None:
+                retry_after = limiter.acquire(client_ip(Request(scope)))
+                if retry_after:
+                    await too_many_requests(retry_after)(scope, receive, send)
+                    return
+
+        await self.app(scope, receive, send)
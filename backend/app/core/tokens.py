@@ -0,0 +1,125 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Optional
+
+from app.core.dev_keys import dev_key
+
+# Signing keys as "kid:secret" pairs, comma separated. The first key signs new
+# tokens, all of them verify. To rotate: prepend a new key, and drop the old
+# one once tokens signed with it have expired.
+AUTH_TOKEN_KEYS = os.getenv("AUTH_TOKEN_KEYS", "")
+
+# Lifetime of a token
+AUTH_TOKEN_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# How long the admin club ids in a token are trusted without a DB check.
+# After that admin checks fall back to the memberships table until /auth/refresh.
+AUTH_ROLE_TTL_SECONDS = int(os.getenv("AUTH_ROLE_TTL_SECONDS", "900"))
+
+
+class TokenError(ValueError):
+    pass
+
+
+def _parse_keys(raw: str) -> list[tuple[str, bytes]]:
+    keys = []
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        kid, sep, secret = item.partition(":")
+        if not sep or not kid or not secret:
+            raise ValueError("AUTH_TOKEN_KEYS entries must be kid:secret")
+        keys.append((kid, secret.encode()))
+    return keys
+
+
+# Fails closed: a known key would let anyone sign tokens with any admin claims
+_keys = _parse_keys(AUTH_TOKEN_KEYS) or [("dev", dev_key("AUTH_TOKEN_KEYS").encode())]
+
+_keys_by_id = dict(_keys)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(key: bytes, signing_input: str) -> bytes:
+    return hmac.new(key, signing_input.encode(), hashlib.sha256).digest()
+
+
+def issue_token(user_id: int, admin_club_ids: list[int]) -> tuple[str, int]:
+    """
+    Issue an HS256 JWT for user_id carrying the clubs where they are admin.
+    Returns (token, expires_at).
+    """
+    now = int(time.time())
+    kid, key = _keys[0]
+    header = {"alg": "HS256", "typ": "JWT", "kid": kid}
+    claims = {
+        "sub": user_id,
+        "adm": sorted(admin_club_ids),
+        "iat": now,
+        "exp": now + AUTH_TOKEN_TTL_SECONDS,
+        "rexp": now + AUTH_ROLE_TTL_SECONDS,
+    }
+    signing_input = (
+        _b64encode(json.dumps(header, separators=(",", ":")).encode())
+        + "."
+        + _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    )
+    token = signing_input + "." + _b64encode(_sign(key, signing_input))
+    return token, claims["exp"]
+
+
+def decode_token(token: str) -> dict:
+    """
+    Verify signature and expiry and return the claims.
+    Raises TokenError if the token is malformed, forged or expired.
+    """
+    try:
+        header_b64, claims_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        signature = _b64decode(signature_b64)
+    except ValueError:
+        raise TokenError("Invalid token format")
+
+    key = _keys_by_id.get(header.get("kid")) if isinstance(header, dict) else None
+    if key is None or header.get("alg") != "HS256":
+        raise TokenError("Invalid token")
+
+    expected = _sign(key, f"{header_b64}.{claims_b64}")
+    if not hmac.compare_digest(signature, expected):
+        raise TokenError("Invalid token")
+
+    try:
+        claims = json.loads(_b64decode(claims_b64))
+    except ValueError:
+        raise TokenError("Invalid token format")
+
+    if not isinstance(claims.get("sub"), int) or not isinstance(claims.get("exp"), int):
+        raise TokenError("Invalid token")
+
+    if claims["exp"] <= time.time():
+        raise TokenError("Token expired")
+
+    return claims
+
+
+def admin_club_ids(claims: dict) -> Optional[list[int]]:
+    """
+    Clubs where the token holder is admin, or None when the token can't answer
+    (legacy token, or role claims older than AUTH_ROLE_TTL_SECONDS) and the
+    caller has to check the database.
+    """
+    if "adm" not in claims or claims.get("rexp", 0) <= time.time():
+        return None
+    return claims["adm"]
@@ -1,39 +1,82 @@
-from sqlalchemy import text
-from app.db.session import engine
-
-
-def get_all_members_for_club(club_id: int):
-    with engine.connect() as conn:
-        result = conn.execute(
-            text("""
-                SELECT
-                    m.id,
-                    u.phone_number,
-                    m.status,
-                    m.rejection_reason,
-                    d.name AS dependent_name,
-                    d.relation AS dependent_relation
-                FROM memberships m
-                JOIN users u ON u.id = m.user_id
-                LEFT JOIN dependents d ON d.id = m.dependent_id
-                WHERE m.club_id = :club_id
-                ORDER BY u.phone_number
-            """),
-            {"club_id": club_id},
-        )
-
-        members = []
+from typing import Optional
+from sqlalchemy import Connection, text
+from app.db.session import connect
 
+
+def _members_query(club_id: int, limit: Optional[int], after: Optional[list]):
+    keyset = ""
+    params = {"club_id": club_id}
+    if after is not None:
+        keyset = """
+                  AND (
+                    u.phone_number > :after_phone
+                    OR (u.phone_number = :after_phone AND m.id > :after_id)
+                  )"""
+        params.update({"after_phone": after[0], "after_id": after[1]})
+
+    page = ""
+    if limit is not None:
+        page = "LIMIT :limit"
+        params["limit"] = limit + 1
+
+    query = text(f"""
+        SELECT
+            m.id,
+            u.phone_number,
+            m.status,
+            m.rejection_reason,
+            d.name AS dependent_name,
+            d.relation AS dependent_relation
+        FROM memberships m
+        JOIN users u ON u.id = m.user_id
+        LEFT JOIN dependents d ON d.id = m.dependent_id
+        WHERE m.club_id = :club_id{keyset}
+        ORDER BY u.phone_number, m.id
+        {page}
+    """)
+    return query, params
+
+
+def _member_row(r) -> dict:
+    return {
+        "membership_id": r["id"],
+        "phone": r["phone_number"],
+        "member_type": "self" if r["dependent_name"] is None else "dependent",
+        "name": r["dependent_name"],
+        "relation": r["dependent_relation"],
+        "status": r["status"],
+        "rejection_reason": r["rejection_reason"],
+    }
+
+
+def get_all_members_for_club(
+    club_id: int,
+    limit: Optional[int] = None,
+    after: Optional[list] = None,
+    conn: Optional[Connection] = None,
+):
+    """
+    Members of a club ordered by (phone, membership id).
+    With limit, returns at most limit + 1 rows starting after the
+    (phone, membership_id) key in after, so the caller can tell if there is a next page.
+    """
+    query, params = _members_query(club_id, limit, after)
+
+    with connect(conn) as conn:
+        result = conn.execute(query, params)
+        return [_member_row(row._mapping) for row in result]
+
+
+def iter_members_for_club(club_id: int, conn: Optional[Connection] = None):
+    """
+    Yield every member of a club, in the same order and shape as
+    get_all_members_for_club, from a server-side cursor so memory stays
+    flat however large the club is. The connection is busy until the
+    generator is exhausted or closed.
+    """
+    query, params = _members_query(club_id, None, None)
+
+    with connect(conn) as conn:
+        result = conn.execute(query, params, execution_options={"stream_results": True})
         for row in result:
-            r = row._mapping
-            members.append({
-                "membership_id": r["id"],
-                "phone": r["phone_number"],
-                "member_type": "self" if r["dependent_name"] is None else "dependent",
-                "name": r["dependent_name"],
-                "relation": r["dependent_relation"],
-                "status": r["status"],
-                "rejection_reason": r["rejection_reason"],
-            })
-
-        return members
+            yield _member_row(row._mapping)
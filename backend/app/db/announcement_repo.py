@@ -1,10 +1,12 @@
-from app.db.session import SessionLocal
-from sqlalchemy import text
+from typing import Optional
+from sqlalchemy import Connection, text
+from app.db.session import begin, connect
+from app.db.sync import changes_filter
 
-def get_announcements_for_club(club_id: int):
-    db = SessionLocal()
-    try:
-        result = db.execute(
+
+def get_announcements_for_club(club_id: int, conn: Optional[Connection] = None):
+    with connect(conn) as conn:
+        result = conn.execute(
             text(
                 """
                 SELECT
@@ -14,11 +16,107 @@ def get_announcements_for_club(club_id: int):
                     created_at
                 FROM announcements
                 WHERE club_id = :club_id
+                  AND deleted_at IS NULL
                 ORDER BY created_at DESC
                 """
             ),
             {"club_id": club_id},
         )
         return [dict(row._mapping) for row in result]
-    finally:
-        db.close()
+
+
+def get_announcements_version(club_id: int, conn: Optional[Connection] = None) -> dict:
+    """
+    Change stamp for get_announcements_for_club, read from the
+    (club_id, updated_at) index.
+    """
+    with connect(conn) as conn:
+        row = conn.execute(
+            text("""
+                SELECT
+                    COUNT(*) AS count,
+                    UNIX_TIMESTAMP(MAX(updated_at)) AS updated_at
+                FROM announcements
+                WHERE club_id = :club_id
+            """),
+            {"club_id": club_id},
+        ).fetchone()
+        return dict(row._mapping)
+
+
+def get_announcement_changes(
+    club_id: int,
+    after: Optional[list],
+    limit: int,
+    conn: Optional[Connection] = None,
+) -> list[dict]:
+    """
+    Up to limit + 1 announcements (deleted ones included, with deleted_at
+    set) changed after the (updated_at, id) key in after, oldest change first.
+    """
+    changed, params = changes_filter("a", after)
+    params.update({"club_id": club_id, "limit": limit + 1})
+
+    with connect(conn) as conn:
+        result = conn.execute(
+            text(f"""
+                SELECT
+                    a.id,
+                    a.title,
+                    a.message,
+                    a.created_at,
+                    a.updated_at,
+                    a.deleted_at
+                FROM announcements a
+                WHERE a.club_id = :club_id{changed}
+                ORDER BY a.updated_at, a.id
+                LIMIT :limit
+            """),
+            params,
+        )
+        return [dict(row._mapping) for row in result]
+
+
+def delete_announcement(club_id: int, announcement_id: int, conn: Optional[Connection] = None) -> bool:
+    """
+    Soft delete, so syncing clients get a tombstone. False if there was
+    no such live announcement in the club.
+    """
+    with begin(conn) as conn:
+        result = conn.execute(
+            text("""
+                UPDATE announcements
+                SET deleted_at = NOW(6)
+                WHERE id = :announcement_id
+                  AND club_id = :club_id
+                  AND deleted_at IS NULL
+            """),
+            {"announcement_id": announcement_id, "club_id": club_id},
+        )
+        return result.rowcount > 0
+
+
+def create_announcement(
+    club_id: int,
+    title: Optional[str],
+    message: Optional[str],
+    conn: Optional[Connection] = None,
+):
+    """
+    Returns the new announcement's id.
+    """
+    with begin(conn) as conn:
+        result = conn.execute(
+            text(
+                """
+                INSERT INTO announcements (club_id, title, message)
+                VALUES (:club_id, :title, :message)
+                """
+            ),
+            {
+                "club_id": club_id,
+                "title": title,
+                "message": message,
+            },
+        )
+        return result.lastrowid
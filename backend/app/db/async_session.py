@@ -0,0 +1,141 @@
+import os
+from typing import Optional
+from fastapi import Depends
+from starlette.concurrency import run_in_threadpool
+from app.db.session import engine, DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+
+# Async mode runs repo functions over SQLAlchemy asyncio (aiomysql driver)
+# instead of holding a threadpool slot per in-flight query.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() == "true"
+
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("mysql+pymysql://", "mysql+aiomysql://"),
+)
+
+async_engine = None
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.db.pool_metrics import InstrumentedAsyncQueuePool
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+async def run_db(fn, *args, db: Optional["RequestDB"] = None, **kwargs):
+    """
+    Await a repo function from an async handler.
+
+    With db, the function runs on the request's shared connection.
+    Without it, it gets a connection (and transaction) of its own.
+
+    Repo functions take an optional conn. In async mode they run through
+    AsyncConnection.run_sync on a connection from the async engine: the SQL
+    and row shaping are shared with sync mode, but waits on MySQL yield to the
+    event loop. Otherwise they run on the threadpool as plain def handlers did.
+    """
+    if db is not None:
+        return await db.run(fn, *args, **kwargs)
+
+    if async_engine is None:
+        return await run_in_threadpool(fn, *args, **kwargs)
+
+    async with async_engine.begin() as conn:
+        return await conn.run_sync(
+            lambda sync_conn: fn(*args, conn=sync_conn, **kwargs)
+        )
+
+
+class RequestDB:
+    """
+    One connection and transaction per request, shared by the handler and its
+    auth dependencies. The connection is checked out on first use, so requests
+    that never touch the database don't take one from the pool.
+    """
+
+    def __init__(self):
+        # sync Connection, or AsyncConnection in async mode
+        self._conn = None
+        self._after_commit = []
+
+    def after_commit(self, callback, *args, **kwargs):
+        """
+        Run callback once the request's transaction has committed,
+        e.g. to invalidate caches without racing the write.
+        """
+        self._after_commit.append((callback, args, kwargs))
+
+    async def run(self, fn, *args, **kwargs):
+        if async_engine is None:
+            return await run_in_threadpool(self._run_sync, fn, args, kwargs)
+
+        if self._conn is None:
+            self._conn = await async_engine.connect()
+            await self._conn.begin()
+        return await self._conn.run_sync(
+            lambda sync_conn: fn(*args, conn=sync_conn, **kwargs)
+        )
+
+    def _run_sync(self, fn, args, kwargs):
+        if self._conn is None:
+            self._conn = engine.connect()
+            self._conn.begin()
+        return fn(*args, conn=self._conn, **kwargs)
+
+    async def release(self, commit: bool = True):
+        """
+        End the transaction and return the connection to the pool.
+        Handlers that go on to do long work without the request connection
+        call this so it isn't held idle; a later run() checks out a new one.
+        """
+        conn, self._conn = self._conn, None
+        callbacks, self._after_commit = self._after_commit, []
+
+        if conn is not None:
+            if async_engine is None:
+                await run_in_threadpool(self._finish_sync, conn, commit)
+            else:
+                try:
+                    if commit:
+                        await conn.commit()
+                    else:
+                        await conn.rollback()
+                finally:
+                    await conn.close()
+
+        if commit:
+            for callback, args, kwargs in callbacks:
+                callback(*args, **kwargs)
+
+    @staticmethod
+    def _finish_sync(conn, commit: bool):
+        try:
+            if commit:
+                conn.commit()
+            else:
+                conn.rollback()
+        finally:
+            conn.close()
+
+
+async def get_db():
+    db = RequestDB()
+    try:
+        yield db
+    except Exception:
+        await db.release(commit=False)
+        raise
+    await db.release(commit=True)
+
+
+# Function scope so the commit happens before the response is sent
+request_db = Depends(get_db, scope="function")
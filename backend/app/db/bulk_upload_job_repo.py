@@ -0,0 +1,258 @@
+from typing import Optional
+from sqlalchemy import Connection, text
+from app.db.session import connect, engine
+
+
+# Errors returned by the progress endpoint, the full count is in error_count
+JOB_ERRORS_PAGE_SIZE = 100
+
+
+def create_bulk_upload_job(club_id: int, created_by: int, file_path: str) -> int:
+    with engine.begin() as conn:
+        result = conn.execute(
+            text("""
+                INSERT INTO bulk_upload_jobs (club_id, created_by, file_path)
+                VALUES (:club_id, :created_by, :file_path)
+            """),
+            {
+                "club_id": club_id,
+                "created_by": created_by,
+                "file_path": file_path,
+            },
+        )
+        return result.lastrowid
+
+
+def claim_bulk_upload_job(job_id: int, owner: str, lease_seconds: int) -> Optional[dict]:
+    """
+    Take ownership of an unfinished job.
+
+    A job can be claimed when it is queued or when its owner has stopped
+    sending heartbeats for lease_seconds (e.g. a restarted gunicorn worker).
+    Returns the job row, or None if another worker holds it.
+    """
+    with engine.begin() as conn:
+        result = conn.execute(
+            text("""
+                UPDATE bulk_upload_jobs
+                SET owner = :owner,
+                    status = 'running',
+                    started_at = COALESCE(started_at, NOW()),
+                    heartbeat_at = NOW()
+                WHERE id = :job_id
+                  AND status IN ('queued', 'running')
+                  AND (
+                    owner IS NULL
+                    OR owner = :owner
+                    OR heartbeat_at < NOW() - INTERVAL :lease_seconds SECOND
+                  )
+            """),
+            {
+                "job_id": job_id,
+                "owner": owner,
+                "lease_seconds": lease_seconds,
+            },
+        )
+        if result.rowcount == 0:
+            return None
+
+        row = conn.execute(
+            text("""
+                SELECT id, club_id, file_path, last_row
+                FROM bulk_upload_jobs
+                WHERE id = :job_id
+            """),
+            {"job_id": job_id},
+        ).fetchone()
+        return dict(row._mapping)
+
+
+def get_resumable_bulk_upload_job_ids(lease_seconds: int) -> list[int]:
+    """
+    Jobs that are queued, or running with an expired lease.
+    """
+    with engine.connect() as conn:
+        result = conn.execute(
+            text("""
+                SELECT id
+                FROM bulk_upload_jobs
+                WHERE status = 'queued'
+                   OR (
+                    status = 'running'
+                    AND heartbeat_at < NOW() - INTERVAL :lease_seconds SECOND
+                   )
+                ORDER BY id
+            """),
+            {"lease_seconds": lease_seconds},
+        )
+        return [row._mapping["id"] for row in result]
+
+
+def renew_bulk_upload_job_lease(job_id: int, owner: str) -> bool:
+    """
+    Move the job's heartbeat forward while owner is still running it.
+    Returns False if the job was taken over or is no longer running.
+    """
+    with engine.begin() as conn:
+        result = conn.execute(
+            text("""
+                UPDATE bulk_upload_jobs
+                SET heartbeat_at = NOW()
+                WHERE id = :job_id
+                  AND owner = :owner
+                  AND status = 'running'
+            """),
+            {"job_id": job_id, "owner": owner},
+        )
+        return result.rowcount > 0
+
+
+def record_bulk_upload_progress(
+    job_id: int,
+    owner: str,
+    last_row: int,
+    created: int,
+    skipped: int,
+    errors: list[dict],
+) -> bool:
+    """
+    Advance the job past last_row and store the chunk's errors.
+    Returns False, recording nothing, if owner no longer holds the job.
+    """
+    with engine.begin() as conn:
+        result = conn.execute(
+            text("""
+                UPDATE bulk_upload_jobs
+                SET last_row = :last_row,
+                    rows_processed = rows_processed + :rows,
+                    created_count = created_count + :created,
+                    skipped_count = skipped_count + :skipped,
+                    error_count = error_count + :errors,
+                    heartbeat_at = NOW()
+                WHERE id = :job_id
+                  AND owner = :owner
+                  AND status = 'running'
+            """),
+            {
+                "job_id": job_id,
+                "owner": owner,
+                "last_row": last_row,
+                "rows": created + skipped + len(errors),
+                "created": created,
+                "skipped": skipped,
+                "errors": len(errors),
+            },
+        )
+        if result.rowcount == 0:
+            return False
+
+        if errors:
+            # IGNORE: a chunk re-run after a crash reports the same rows again
+            conn.execute(
+                text("""
+                    INSERT IGNORE INTO bulk_upload_job_errors (job_id, row_num, phone, error)
+                    VALUES (:job_id, :row_num, :phone, :error)
+                """),
+                [
+                    {
+                        "job_id": job_id,
+                        "row_num": e["row"],
+                        "phone": e["phone"] or "",
+                        "error": e["error"],
+                    }
+                    for e in errors
+                ],
+            )
+        return True
+
+
+def finish_bulk_upload_job(job_id: int, owner: str, status: str, last_error: Optional[str] = None) -> bool:
+    """
+    Mark the job completed or failed, unless another worker took it over.
+    """
+    with engine.begin() as conn:
+        result = conn.execute(
+            text("""
+                UPDATE bulk_upload_jobs
+                SET status = :status,
+                    last_error = :last_error,
+                    owner = NULL,
+                    finished_at = NOW()
+                WHERE id = :job_id
+                  AND owner = :owner
+            """),
+            {
+                "job_id": job_id,
+                "owner": owner,
+                "status": status,
+                "last_error": last_error,
+            },
+        )
+        return result.rowcount > 0
+
+
+def get_bulk_upload_job(club_id: int, job_id: int, conn: Optional[Connection] = None) -> Optional[dict]:
+    """
+    Get job progress for a club, with the first JOB_ERRORS_PAGE_SIZE errors.
+    Returns None if the job doesn't exist for this club.
+    """
+    with connect(conn) as conn:
+        job = conn.execute(
+            text("""
+                SELECT
+                    id,
+                    status,
+                    rows_processed,
+                    created_count,
+                    skipped_count,
+                    error_count,
+                    last_error,
+                    created_at,
+                    started_at,
+                    heartbeat_at,
+                    finished_at
+                FROM bulk_upload_jobs
+                WHERE id = :job_id
+                  AND club_id = :club_id
+            """),
+            {"job_id": job_id, "club_id": club_id},
+        ).fetchone()
+
+        if not job:
+            return None
+
+        errors = conn.execute(
+            text("""
+                SELECT row_num AS `row`, phone, error
+                FROM bulk_upload_job_errors
+                WHERE job_id = :job_id
+                ORDER BY row_num
+                LIMIT :limit
+            """),
+            {"job_id": job_id, "limit": JOB_ERRORS_PAGE_SIZE},
+        )
+
+        r = job._mapping
+        ended_at = r["finished_at"] or r["heartbeat_at"]
+        elapsed = (
+            (ended_at - r["started_at"]).total_seconds()
+            if r["started_at"] and ended_at
+            else 0
+        )
+
+        return {
+            "job_id": r["id"],
+            "status": r["status"],
+            "rows_processed": r["rows_processed"],
+            "rows_per_second": round(r["rows_processed"] / elapsed, 1) if elapsed > 0 else None,
+            "summary": {
+                "created": r["created_count"],
+                "skipped": r["skipped_count"],
+                "errors": r["error_count"],
+            },
+            "errors": [dict(row._mapping) for row in errors],
+            "last_error": r["last_error"],
+            "created_at": r["created_at"],
+            "started_at": r["started_at"],
+            "finished_at": r["finished_at"],
+        }
@@ -1,14 +1,20 @@
 import csv
 import io
-from typing import Optional
-from sqlalchemy import text
-from app.db.session import engine
+import logging
+from typing import BinaryIO, Callable, Optional
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
+from app.db.club_stats_repo import shift_member_counts
+from app.db.session import engine, is_duplicate_key_error
 from app.db.user_repo import get_user_by_phone, create_user, update_user_name_if_null
 
+logger = logging.getLogger(__name__)
+
 
 def get_dependent_by_name_relation(user_id: int, name: str, relation: str) -> Optional[int]:
     """
-    Get dependent ID by user_id, name, and relation.
+    Get dependent ID by user_id, name, and relation, ignoring case and
+    surrounding spaces (the same match as _dependent_key).
     Returns None if not found.
     """
     with engine.connect() as conn:
@@ -16,8 +22,9 @@ def get_dependent_by_name_relation(user_id: int, name: str, relation: str) -> Op
             text("""
                 SELECT id FROM dependents
                 WHERE user_id = :user_id
-                  AND name = :name
-                  AND relation = :relation
+                  AND TRIM(name) = TRIM(:name)
+                  AND TRIM(relation) = TRIM(:relation)
+                ORDER BY id
                 LIMIT 1
             """),
             {
@@ -62,43 +69,411 @@ def create_membership_safe(user_id: int, club_id: int, dependent_id: Optional[in
     If membership already exists, returns (False, existing_id)
     """
     with engine.begin() as conn:
-        # Check for existing membership
+        # Insert first and let the (user_id, club_id, dep_key) unique index
+        # reject duplicates, so concurrent uploads can't both create one
+        try:
+            result = conn.execute(
+                text("""
+                    INSERT INTO memberships (user_id, club_id, dependent_id, status, expiry_date)
+                    VALUES (:user_id, :club_id, :dependent_id, 'active', :expiry_date)
+                """),
+                {
+                    "user_id": user_id,
+                    "club_id": club_id,
+                    "dependent_id": dependent_id,
+                    "expiry_date": expiry_date,
+                },
+            )
+            shift_member_counts(conn, [(club_id, None, ("active", expiry_date))])
+            return (True, result.lastrowid)
+        except IntegrityError as e:
+            if not is_duplicate_key_error(e):
+                raise
+
         existing = conn.execute(
             text("""
                 SELECT id FROM memberships
                 WHERE user_id = :user_id
                   AND club_id = :club_id
-                  AND (
-                    (:dependent_id IS NULL AND dependent_id IS NULL)
-                    OR
-                    (:dependent_id IS NOT NULL AND dependent_id = :dependent_id)
-                  )
-                LIMIT 1
+                  AND dep_key = :dep_key
             """),
             {
                 "user_id": user_id,
                 "club_id": club_id,
-                "dependent_id": dependent_id,
+                "dep_key": dependent_id or 0,
             },
         ).fetchone()
-        
-        if existing:
-            return (False, existing._mapping["id"])
-        
-        # Create new membership with status = 'active'
-        result = conn.execute(
-            text("""
-                INSERT INTO memberships (user_id, club_id, dependent_id, status, expiry_date)
-                VALUES (:user_id, :club_id, :dependent_id, 'active', :expiry_date)
-            """),
-            {
-                "user_id": user_id,
-                "club_id": club_id,
-                "dependent_id": dependent_id,
-                "expiry_date": expiry_date,
-            },
+        return (False, existing._mapping["id"])
+
+# Rows resolved per transaction by the batched engine
+BULK_UPLOAD_CHUNK_SIZE = 1000
+
+# Rows listed per outcome in a bulk upload report; the summary counts every row
+BULK_UPLOAD_REPORT_LIMIT = 100
+
+
+def _build_report(created: list, skipped: list, errors: list, counts: Optional[dict] = None) -> dict:
+    if counts is None:
+        counts = {"created": len(created), "skipped": len(skipped), "errors": len(errors)}
+    return {
+        "success": True,
+        "summary": {
+            "total_rows": counts["created"] + counts["skipped"] + counts["errors"],
+            **counts,
+        },
+        "created": created,
+        "skipped": skipped,
+        "errors": errors,
+    }
+
+
+def _normalize_key(key: Optional[str]) -> str:
+    # Normalize: strip BOM, trim whitespace, convert to lowercase
+    return (key or '').lstrip('\ufeff').strip().lower()
+
+
+def parse_bulk_upload_rows(csv_reader: csv.DictReader, errors: list, skip_through: int = 1):
+    """
+    Yield validated rows from a CSV reader as dicts with
+    row, phone, name, relation and membership_expiry.
+
+    Rows that fail validation are appended to errors and not yielded.
+    Rows numbered up to skip_through are skipped (used to resume a job).
+    """
+    for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (row 1 is header)
+        if row_num <= skip_through:
+            continue
+
+        # Normalize row keys the same way we normalized headers
+        normalized_row = {}
+        for orig_key, value in row.items():
+            normalized_row[_normalize_key(orig_key)] = value
+
+        # Extract values using normalized keys
+        phone = normalized_row.get('phone', '').strip() if normalized_row.get('phone') else ''
+        name = normalized_row.get('name', '').strip() if normalized_row.get('name') else ''
+        relation = normalized_row.get('relation', '').strip() if normalized_row.get('relation') else ''
+        membership_expiry = normalized_row.get('membership_expiry', '').strip() if normalized_row.get('membership_expiry') else None
+        if membership_expiry == '':
+            membership_expiry = None
+
+        # Validate phone
+        if not phone:
+            errors.append({
+                "row": row_num,
+                "phone": phone,
+                "error": "Phone number is required"
+            })
+            continue
+
+        if not phone.isdigit() or len(phone) != 10:
+            errors.append({
+                "row": row_num,
+                "phone": phone,
+                "error": "Phone number must be 10 digits"
+            })
+            continue
+
+        yield {
+            "row": row_num,
+            "phone": phone,
+            "name": name,
+            "relation": relation,
+            "membership_expiry": membership_expiry,
+        }
+
+
+def _member_label(row: dict) -> str:
+    if row["name"] and row["relation"]:
+        return f'{row["name"]} ({row["relation"]})'
+    return "Self"
+
+
+def _process_row(club_id: int, row: dict, created: list, skipped: list):
+    """
+    Row-at-a-time path. Used as a fallback when a batched chunk fails,
+    so a single bad row is reported without losing the rest of the chunk.
+    """
+    phone = row["phone"]
+    name = row["name"]
+    relation = row["relation"]
+
+    # Get or create user
+    user = get_user_by_phone(phone)
+    if user:
+        user_id = user._mapping["id"]
+        user_name = user._mapping.get("full_name")
+    else:
+        # Create new user - set name if provided and this is a SELF row
+        if name and not relation:
+            user_id = create_user(phone, name=name)
+            user_name = name
+        else:
+            user_id = create_user(phone)
+            user_name = None
+
+    # Determine if this is a dependent or self membership
+    dependent_id = None
+    if name and relation:
+        # Create or get dependent
+        dependent_id = create_dependent_safe(
+            user_id=user_id,
+            name=name,
+            relation=relation,
+        )
+    elif name and not relation:
+        # SELF row with name: update user name if currently null (for existing users)
+        if user_name is None:
+            update_user_name_if_null(user_id, name)
+
+    # Create membership (skips if duplicate)
+    was_created, membership_id = create_membership_safe(
+        user_id=user_id,
+        club_id=club_id,
+        dependent_id=dependent_id,
+        expiry_date=row["membership_expiry"],
+    )
+
+    _record_outcome(row, was_created, membership_id, created, skipped)
+
+
+def _record_outcome(row: dict, was_created: bool, membership_id: int, created: list, skipped: list):
+    if was_created:
+        created.append({
+            "row": row["row"],
+            "phone": row["phone"],
+            "member": _member_label(row),
+            "membership_id": membership_id,
+        })
+    else:
+        skipped.append({
+            "row": row["row"],
+            "phone": row["phone"],
+            "member": _member_label(row),
+            "membership_id": membership_id,
+            "reason": "Membership already exists",
+        })
+
+
+def _fetch_users(conn, phones: list[str]) -> dict:
+    result = conn.execute(
+        text("""
+            SELECT id, phone_number, full_name
+            FROM users
+            WHERE phone_number IN :phones
+        """).bindparams(bindparam("phones", expanding=True)),
+        {"phones": phones},
+    )
+    return {r._mapping["phone_number"]: r._mapping for r in result}
+
+
+def _dependent_key(user_id: int, name: str, relation: str) -> tuple[int, str, str]:
+    # get_dependent_by_name_relation matches through MySQL's case-insensitive
+    # collation, so "John", "john" and "John " are the same dependent here too
+    return user_id, name.strip().casefold(), relation.strip().casefold()
+
+
+def _fetch_dependents(conn, user_ids: list[int]) -> dict:
+    result = conn.execute(
+        text("""
+            SELECT id, user_id, name, relation
+            FROM dependents
+            WHERE user_id IN :user_ids
+            ORDER BY id
+        """).bindparams(bindparam("user_ids", expanding=True)),
+        {"user_ids": user_ids},
+    )
+    dependents = {}
+    for row in result:
+        r = row._mapping
+        # Keep the lowest id, matching get_dependent_by_name_relation's LIMIT 1
+        dependents.setdefault(_dependent_key(r["user_id"], r["name"], r["relation"]), r["id"])
+    return dependents
+
+
+def _fetch_memberships(conn, club_id: int, user_ids: list[int]) -> dict:
+    result = conn.execute(
+        text("""
+            SELECT id, user_id, dependent_id
+            FROM memberships
+            WHERE club_id = :club_id
+              AND user_id IN :user_ids
+            ORDER BY id
+        """).bindparams(bindparam("user_ids", expanding=True)),
+        {"club_id": club_id, "user_ids": user_ids},
+    )
+    memberships = {}
+    for row in result:
+        r = row._mapping
+        memberships.setdefault((r["user_id"], r["dependent_id"]), r["id"])
+    return memberships
+
+
+def _process_chunk(club_id: int, rows: list[dict], created: list, skipped: list):
+    """
+    Resolve a chunk of rows with set-based queries in one transaction.
+
+    Users, dependents and memberships are each looked up with one IN (...)
+    query and the missing ones are inserted with one executemany, which
+    PyMySQL rewrites into a multi-row INSERT.
+    """
+    with engine.begin() as conn:
+        # 1. Users: one lookup, one insert for the missing phones
+        phones = list(dict.fromkeys(r["phone"] for r in rows))
+        users = _fetch_users(conn, phones)
+
+        new_users = {}
+        for r in rows:
+            if r["phone"] in users:
+                continue
+            # New users take the name of their first SELF row, if any
+            self_name = r["name"] if r["name"] and not r["relation"] else None
+            if r["phone"] not in new_users or (new_users[r["phone"]] is None and self_name):
+                new_users[r["phone"]] = self_name
+
+        if new_users:
+            conn.execute(
+                text("INSERT INTO users (phone_number, full_name) VALUES (:phone, :name)"),
+                [{"phone": p, "name": n} for p, n in new_users.items()],
+            )
+            users = _fetch_users(conn, phones)
+
+        # SELF rows with a name fill in existing users whose name is null
+        name_updates = {}
+        for r in rows:
+            if r["phone"] in new_users or not r["name"] or r["relation"]:
+                continue
+            user = users[r["phone"]]
+            if user["full_name"] is None:
+                name_updates.setdefault(user["id"], r["name"])
+
+        if name_updates:
+            conn.execute(
+                text("""
+                    UPDATE users
+                    SET full_name = :name
+                    WHERE id = :user_id
+                      AND full_name IS NULL
+                """),
+                [{"user_id": u, "name": n} for u, n in name_updates.items()],
+            )
+
+        user_ids = list({users[r["phone"]]["id"] for r in rows})
+
+        # 2. Dependents: one lookup, one insert for the missing ones
+        dependents = _fetch_dependents(conn, user_ids)
+        new_dependents = {}
+        for r in rows:
+            if not (r["name"] and r["relation"]):
+                continue
+            user_id = users[r["phone"]]["id"]
+            key = _dependent_key(user_id, r["name"], r["relation"])
+            # The first spelling in the chunk is the one stored
+            if key not in dependents and key not in new_dependents:
+                new_dependents[key] = (user_id, r["name"], r["relation"])
+
+        if new_dependents:
+            conn.execute(
+                text("""
+                    INSERT INTO dependents (user_id, name, relation)
+                    VALUES (:user_id, :name, :relation)
+                """),
+                [{"user_id": u, "name": n, "relation": rel} for u, n, rel in new_dependents.values()],
+            )
+            dependents = _fetch_dependents(conn, user_ids)
+
+        # 3. Memberships: one lookup, one insert for the missing ones
+        memberships = _fetch_memberships(conn, club_id, user_ids)
+        row_keys = []
+        new_memberships = {}
+        for r in rows:
+            user_id = users[r["phone"]]["id"]
+            dependent_id = None
+            if r["name"] and r["relation"]:
+                dependent_id = dependents[_dependent_key(user_id, r["name"], r["relation"])]
+            key = (user_id, dependent_id)
+            row_keys.append(key)
+            if key not in memberships and key not in new_memberships:
+                new_memberships[key] = r["membership_expiry"]
+
+        if new_memberships:
+            conn.execute(
+                text("""
+                    INSERT INTO memberships (user_id, club_id, dependent_id, status, expiry_date)
+                    VALUES (:user_id, :club_id, :dependent_id, 'active', :expiry_date)
+                """),
+                [
+                    {
+                        "user_id": u,
+                        "club_id": club_id,
+                        "dependent_id": d,
+                        "expiry_date": expiry,
+                    }
+                    for (u, d), expiry in new_memberships.items()
+                ],
+            )
+            shift_member_counts(
+                conn,
+                [(club_id, None, ("active", expiry)) for expiry in new_memberships.values()],
+            )
+            memberships = _fetch_memberships(conn, club_id, user_ids)
+
+    # First row for a new membership creates it, later duplicates are skipped
+    seen = set()
+    for r, key in zip(rows, row_keys):
+        was_created = key in new_memberships and key not in seen
+        seen.add(key)
+        _record_outcome(r, was_created, memberships[key], created, skipped)
+
+
+def process_bulk_upload_rows(
+    club_id: int,
+    rows,
+    created: list,
+    skipped: list,
+    errors: list,
+    on_chunk: Optional[Callable[[int], None]] = None,
+):
+    """
+    Process an iterable of parsed rows in chunks of BULK_UPLOAD_CHUNK_SIZE.
+    If a chunk fails as a whole, it is retried row by row so errors stay per row.
+
+    on_chunk is called with the last row number after each chunk is committed.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= BULK_UPLOAD_CHUNK_SIZE:
+            _process_chunk_safe(club_id, chunk, created, skipped, errors)
+            if on_chunk:
+                on_chunk(chunk[-1]["row"])
+            chunk = []
+    if chunk:
+        _process_chunk_safe(club_id, chunk, created, skipped, errors)
+        if on_chunk:
+            on_chunk(chunk[-1]["row"])
+
+
+def _process_chunk_safe(club_id: int, rows: list[dict], created: list, skipped: list, errors: list):
+    try:
+        _process_chunk(club_id, rows, created, skipped)
+        return
+    except Exception:
+        # The row-by-row retry reports per-row errors, but not why the batch failed
+        logger.exception(
+            "Bulk upload chunk for club %s (rows %s-%s) failed, retrying row by row",
+            club_id, rows[0]["row"], rows[-1]["row"],
         )
-        return (True, result.lastrowid)
+
+    for row in rows:
+        try:
+            _process_row(club_id, row, created, skipped)
+        except Exception as e:
+            errors.append({
+                "row": row["row"],
+                "phone": row["phone"],
+                "error": str(e)
+            })
 
 
 def process_bulk_upload(club_id: int, csv_content: str) -> dict:
@@ -119,12 +494,11 @@ def process_bulk_upload(club_id: int, csv_content: str) -> dict:
     
     All memberships are created with status = 'active'.
     
-    Returns summary with created, skipped, and errors.
-    """
-    created = []
-    skipped = []
-    errors = []
+    Rows are resolved in chunks with set-based queries, one transaction per chunk.
     
+    Returns a summary counting every row, and lists the first
+    BULK_UPLOAD_REPORT_LIMIT created, skipped and error rows.
+    """
     # Strip UTF-8 BOM if present (defensive - utf-8-sig should have already handled this)
     if csv_content.startswith('\ufeff'):
         csv_content = csv_content[1:]
@@ -132,137 +506,62 @@ def process_bulk_upload(club_id: int, csv_content: str) -> dict:
     # Parse CSV with proper handling of quoted fields
     csv_reader = csv.DictReader(io.StringIO(csv_content))
     
-    # Get original fieldnames and create normalization mapping
-    original_fieldnames = csv_reader.fieldnames
-    if not original_fieldnames:
+    return _process_csv_reader(club_id, csv_reader)
+
+
+def process_bulk_upload_file(club_id: int, binary_file: BinaryIO) -> dict:
+    """
+    Streaming variant of process_bulk_upload.
+
+    Decodes the binary file incrementally (utf-8-sig strips a BOM) and feeds
+    rows to the batched engine in chunks, so only one chunk of rows is held
+    in memory at a time. Outcomes are counted per chunk and only the first
+    BULK_UPLOAD_REPORT_LIMIT of each kind are kept for the report.
+    This is blocking and meant to run on a worker thread.
+    """
+    text_file = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    try:
+        return _process_csv_reader(club_id, csv.DictReader(text_file))
+    finally:
+        # Leave the underlying file open for its owner to close
+        text_file.detach()
+
+
+def _process_csv_reader(club_id: int, csv_reader: csv.DictReader) -> dict:
+    created = []
+    skipped = []
+    errors = []
+
+    if not csv_reader.fieldnames:
         errors.append({
             "row": 1,
             "phone": "",
             "error": "CSV file has no headers"
         })
-        return {
-            "success": True,
-            "summary": {
-                "total_rows": 0,
-                "created": 0,
-                "skipped": 0,
-                "errors": len(errors),
-            },
-            "created": created,
-            "skipped": skipped,
-            "errors": errors,
-        }
-    
-    # Create mapping from normalized header to original header
-    header_mapping = {}
-    for original_header in original_fieldnames:
-        # Normalize: strip BOM, trim whitespace, convert to lowercase
-        normalized = original_header.lstrip('\ufeff').strip().lower()
-        header_mapping[normalized] = original_header
-    
-    for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (row 1 is header)
-        try:
-            # Normalize row keys by mapping through header_mapping
-            normalized_row = {}
-            for orig_key, value in row.items():
-                # Normalize the key the same way we normalized headers
-                normalized_key = orig_key.lstrip('\ufeff').strip().lower()
-                normalized_row[normalized_key] = value
-            
-            # Extract values using normalized keys
-            phone = normalized_row.get('phone', '').strip() if normalized_row.get('phone') else ''
-            name = normalized_row.get('name', '').strip() if normalized_row.get('name') else ''
-            relation = normalized_row.get('relation', '').strip() if normalized_row.get('relation') else ''
-            membership_expiry = normalized_row.get('membership_expiry', '').strip() if normalized_row.get('membership_expiry') else None
-            if membership_expiry == '':
-                membership_expiry = None
-            
-            # Validate phone
-            if not phone:
-                errors.append({
-                    "row": row_num,
-                    "phone": phone,
-                    "error": "Phone number is required"
-                })
-                continue
-            
-            if not phone.isdigit() or len(phone) != 10:
-                errors.append({
-                    "row": row_num,
-                    "phone": phone,
-                    "error": "Phone number must be 10 digits"
-                })
-                continue
-            
-            # Get or create user
-            user = get_user_by_phone(phone)
-            if user:
-                user_id = user._mapping["id"]
-                user_name = user._mapping.get("full_name")
-            else:
-                # Create new user - set name if provided and this is a SELF row
-                if name and not relation:
-                    user_id = create_user(phone, name=name)
-                    user_name = name
-                else:
-                    user_id = create_user(phone)
-                    user_name = None
-            
-            # Determine if this is a dependent or self membership
-            dependent_id = None
-            if name and relation:
-                # Create or get dependent
-                dependent_id = create_dependent_safe(
-                    user_id=user_id,
-                    name=name,
-                    relation=relation,
-                )
-            elif name and not relation:
-                # SELF row with name: update user name if currently null (for existing users)
-                if user_name is None:
-                    update_user_name_if_null(user_id, name)
-            
-            # Create membership (skips if duplicate)
-            was_created, membership_id = create_membership_safe(
-                user_id=user_id,
-                club_id=club_id,
-                dependent_id=dependent_id,
-                expiry_date=membership_expiry,
-            )
-            
-            if was_created:
-                created.append({
-                    "row": row_num,
-                    "phone": phone,
-                    "member": f"{name} ({relation})" if name and relation else "Self",
-                    "membership_id": membership_id,
-                })
-            else:
-                skipped.append({
-                    "row": row_num,
-                    "phone": phone,
-                    "member": f"{name} ({relation})" if name and relation else "Self",
-                    "membership_id": membership_id,
-                    "reason": "Membership already exists",
-                })
-                
-        except Exception as e:
-            errors.append({
-                "row": row_num,
-                "phone": row.get('phone', ''),
-                "error": str(e)
-            })
-    
-    return {
-        "success": True,
-        "summary": {
-            "total_rows": len(created) + len(skipped) + len(errors),
-            "created": len(created),
-            "skipped": len(skipped),
-            "errors": len(errors),
-        },
-        "created": created,
-        "skipped": skipped,
-        "errors": errors,
-    }
+        return _build_report(created, skipped, errors)
+
+    counts = {"created": 0, "skipped": 0, "errors": 0}
+    report = {"created": [], "skipped": [], "errors": []}
+
+    def flush(_last_row: int = 0):
+        # Parse errors and chunk errors are collected separately, report them in row order.
+        # Everything flushed so far is for earlier rows, so sorting per chunk keeps the order.
+        errors.sort(key=lambda e: e["row"])
+        for kind, outcomes in (("created", created), ("skipped", skipped), ("errors", errors)):
+            counts[kind] += len(outcomes)
+            kept = report[kind]
+            kept.extend(outcomes[:BULK_UPLOAD_REPORT_LIMIT - len(kept)])
+            outcomes.clear()
+
+    process_bulk_upload_rows(
+        club_id,
+        parse_bulk_upload_rows(csv_reader, errors),
+        created,
+        skipped,
+        errors,
+        on_chunk=flush,
+    )
+    # Trailing rows that failed validation after the last chunk
+    flush()
 
+    return _build_report(report["created"], report["skipped"], report["errors"], counts)
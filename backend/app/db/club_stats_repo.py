@@ -0,0 +1,208 @@
+import datetime
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import Connection, text
+
+from app.db.session import begin, connect
+
+# Member statuses counted on the dashboard
+MEMBER_STATUSES = ("active", "pending", "rejected", "expired")
+
+# (status, expiry_date) of a membership, or None before it exists
+MemberState = Optional[tuple[str, object]]
+
+
+def _day(value) -> str:
+    # Bulk upload passes the CSV's text, which MySQL accepts unpadded (2030-1-5)
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.strptime(value.strip()[:10], "%Y-%m-%d").date().isoformat()
+        except ValueError:
+            return value
+    return str(value)[:10]
+
+
+def _member_counters(state: MemberState) -> list[str]:
+    if state is None:
+        return []
+    status, expiry_date = state
+    counters = [f"members:{status}"]
+    if status == "active" and expiry_date is not None:
+        counters.append(f"expiry:{_day(expiry_date)}")
+    return counters
+
+
+def shift_member_counts(conn: Connection, changes: Iterable[tuple[int, MemberState, MemberState]]):
+    """
+    Apply (club_id, old state, new state) membership changes to the club
+    counters, in the caller's transaction so they commit with the change.
+    All changes go out as one executemany upsert.
+    """
+    deltas = defaultdict(int)
+    for club_id, old, new in changes:
+        if old == new:
+            continue
+        for counter in _member_counters(old):
+            deltas[(club_id, counter)] -= 1
+        for counter in _member_counters(new):
+            deltas[(club_id, counter)] += 1
+
+    rows = [
+        {"club_id": club_id, "counter": counter, "delta": delta}
+        for (club_id, counter), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    # Sorted, so concurrent writers lock counter rows in the same order
+    conn.execute(
+        text("""
+            INSERT INTO club_counters (club_id, counter, value)
+            VALUES (:club_id, :counter, :delta)
+            ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+        """),
+        rows,
+    )
+
+
+def get_club_stats(
+    club_id: int,
+    expiring_days: int,
+    today: Optional[datetime.date] = None,
+    conn: Optional[Connection] = None,
+) -> dict:
+    """
+    Member counts by status, active members expiring within expiring_days
+    and passes per live event, read from the materialized counters: the
+    cost depends on the number of events and expiry days, not members.
+    """
+    today = today or datetime.date.today()
+    until = today + datetime.timedelta(days=expiring_days)
+
+    with connect(conn) as conn:
+        result = conn.execute(
+            text("""
+                SELECT counter, value
+                FROM club_counters
+                WHERE club_id = :club_id
+                  AND (counter LIKE 'members:%' OR counter BETWEEN :expiring_from AND :expiring_until)
+            """),
+            {
+                "club_id": club_id,
+                "expiring_from": f"expiry:{today.isoformat()}",
+                "expiring_until": f"expiry:{until.isoformat()}",
+            },
+        )
+        counters = {row.counter: row.value for row in result}
+
+        events = conn.execute(
+            text("""
+                SELECT
+                    id AS event_id,
+                    title,
+                    event_date,
+                    capacity,
+                    seats_taken AS passes
+                FROM events
+                WHERE club_id = :club_id
+                  AND deleted_at IS NULL
+                ORDER BY event_date DESC
+            """),
+            {"club_id": club_id},
+        )
+        passes = [dict(row._mapping) for row in events]
+
+    members = {status: counters.get(f"members:{status}", 0) for status in MEMBER_STATUSES}
+    members["expiring"] = sum(v for c, v in counters.items() if c.startswith("expiry:"))
+    return {
+        "members": members,
+        "expiring_days": expiring_days,
+        "passes_per_event": passes,
+    }
+
+
+def rebuild_club_counters(club_id: Optional[int] = None, conn: Optional[Connection] = None) -> dict:
+    """
+    Recount the club counters and events.seats_taken from the memberships
+    and event_passes tables, for one club or all of them. The rows counted
+    are share-locked until commit, so writes made meanwhile wait instead of
+    being lost. Returns the counters and events that had drifted.
+    """
+    params = {"club_id": club_id}
+
+    with begin(conn) as conn:
+        fresh = {}
+        for row in conn.execute(
+            text("""
+                SELECT club_id, status, expiry_date, COUNT(*) AS members
+                FROM memberships
+                WHERE (:club_id IS NULL OR club_id = :club_id)
+                GROUP BY club_id, status, expiry_date
+                FOR SHARE
+            """),
+            params,
+        ):
+            for counter in _member_counters((row.status, row.expiry_date)):
+                key = (row.club_id, counter)
+                fresh[key] = fresh.get(key, 0) + row.members
+
+        stored = {
+            (row.club_id, row.counter): row.value
+            for row in conn.execute(
+                text("""
+                    SELECT club_id, counter, value
+                    FROM club_counters
+                    WHERE (:club_id IS NULL OR club_id = :club_id)
+                    FOR UPDATE
+                """),
+                params,
+            )
+        }
+        drifted = sorted(
+            key for key in fresh.keys() | stored.keys()
+            if fresh.get(key, 0) != stored.get(key, 0)
+        )
+
+        conn.execute(text("DELETE FROM club_counters WHERE :club_id IS NULL OR club_id = :club_id"), params)
+        if fresh:
+            conn.execute(
+                text("""
+                    INSERT INTO club_counters (club_id, counter, value)
+                    VALUES (:club_id, :counter, :value)
+                """),
+                [
+                    {"club_id": c, "counter": counter, "value": value}
+                    for (c, counter), value in sorted(fresh.items())
+                ],
+            )
+
+        seats = conn.execute(
+            text("""
+                SELECT e.id, e.seats_taken, COUNT(p.id) AS passes
+                FROM events e
+                LEFT JOIN event_passes p ON p.event_id = e.id
+                WHERE (:club_id IS NULL OR e.club_id = :club_id)
+                GROUP BY e.id, e.seats_taken
+                FOR UPDATE
+            """),
+            params,
+        ).fetchall()
+        drifted_events = [row for row in seats if row.seats_taken != row.passes]
+        if drifted_events:
+            conn.execute(
+                text("UPDATE events SET seats_taken = :passes WHERE id = :id"),
+                [{"id": row.id, "passes": row.passes} for row in drifted_events],
+            )
+
+    return {
+        "counters": [
+            {"club_id": c, "counter": counter, "stored": stored.get((c, counter), 0), "actual": fresh.get((c, counter), 0)}
+            for c, counter in drifted
+        ],
+        "events": [
+            {"event_id": row.id, "stored": row.seats_taken, "actual": row.passes}
+            for row in drifted_events
+        ],
+    }
@@ -1,11 +1,17 @@
-from app.db.session import SessionLocal
-from sqlalchemy import text
+from typing import Optional
+from sqlalchemy import Connection, text
+from app.db.session import begin, connect
 
 
-def create_dependent(user_id: int, name: str, relation: str, date_of_birth=None):
-    db = SessionLocal()
-    try:
-        db.execute(
+def create_dependent(
+    user_id: int,
+    name: str,
+    relation: str,
+    date_of_birth=None,
+    conn: Optional[Connection] = None,
+):
+    with begin(conn) as conn:
+        conn.execute(
             text(
                 """
                 INSERT INTO dependents (user_id, name, relation, date_of_birth)
@@ -19,15 +25,11 @@ def create_dependent(user_id: int, name: str, relation: str, date_of_birth=None)
                 "dob": date_of_birth,
             },
         )
-        db.commit()
-    finally:
-        db.close()
 
 
-def get_dependents_for_user(user_id: int):
-    db = SessionLocal()
-    try:
-        result = db.execute(
+def get_dependents_for_user(user_id: int, conn: Optional[Connection] = None):
+    with connect(conn) as conn:
+        result = conn.execute(
             text(
                 """
                 SELECT id, name, relation, date_of_birth, created_at
@@ -39,5 +41,3 @@ def get_dependents_for_user(user_id: int):
             {"user_id": user_id},
         )
         return [dict(row._mapping) for row in result]
-    finally:
-        db.close()
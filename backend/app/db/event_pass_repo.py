@@ -1,55 +1,355 @@
-import uuid
-from sqlalchemy import text
+from collections import Counter
+from sqlalchemy import Connection, bindparam, text
+from sqlalchemy.exc import IntegrityError
 from typing import Optional
-from app.db.session import engine
+from app.core.pass_codes import make_pass_code
+from app.db.event_repo import get_event_seats, lock_events, release_pass_seat, take_pass_seat, take_pass_seats
+from app.db.session import begin, connect, is_duplicate_key_error
 
 
-def create_event_pass(event_id: int, user_id: int, dependent_id: Optional[int]):
-    pass_code = str(uuid.uuid4())[:10]
+def create_event_pass(
+    event_id: int,
+    user_id: int,
+    dependent_id: Optional[int],
+    conn: Optional[Connection] = None,
+) -> dict:
+    """
+    Issue a pass if the event has a seat left, else put the holder on the
+    event's waitlist. Returns {"status": "created", "pass_code"} or
+    {"status": "waitlisted", "position"}.
+    """
+    with begin(conn) as conn:
+        serial = take_pass_seat(event_id, conn=conn)
+        if serial is None:
+            if get_event_seats(event_id, conn=conn) is None:
+                raise ValueError("Event not found")
+            if _get_pass_codes(conn, [event_id], [user_id], lock=True).get((event_id, user_id, dependent_id or 0)):
+                raise ValueError("Pass already exists")
+            _join_waitlist(conn, [(event_id, user_id, dependent_id)])
+            positions = _get_waitlist_positions(conn, [event_id], user_id)
+            return {"status": "waitlisted", "position": positions[(event_id, dependent_id or 0)]}
+
+        pass_code = make_pass_code(event_id, serial)
+
+        # One pass per event + user + dependent, enforced by the
+        # (event_id, user_id, dep_key) unique index rather than a prior SELECT.
+        # The seat taken above is given back when the caller rolls back.
+        try:
+            conn.execute(
+                text("""
+                    INSERT INTO event_passes (event_id, user_id, dependent_id, pass_code)
+                    VALUES (:event_id, :user_id, :dependent_id, :pass_code)
+                """),
+                {
+                    "event_id": event_id,
+                    "user_id": user_id,
+                    "dependent_id": dependent_id,
+                    "pass_code": pass_code,
+                },
+            )
+        except IntegrityError as e:
+            if not is_duplicate_key_error(e):
+                raise
+            raise ValueError("Pass already exists")
+
+    return {"status": "created", "pass_code": pass_code}
+
+
+def create_event_passes(
+    event_id: int,
+    holders: list[tuple[int, Optional[int]]],
+    conn: Optional[Connection] = None,
+) -> list[dict]:
+    """
+    Issue passes for many (user_id, dependent_id) holders of one event, e.g.
+    a club's whole roster. Holders that already have a pass keep it; those
+    beyond the event's capacity are waitlisted. Returns, per holder in
+    order, its status ("created", "existing" or "waitlisted") and pass_code.
+    """
+    holders = list(dict.fromkeys(holders))
+    if not holders:
+        return []
+
+    with begin(conn) as conn:
+        issued = _issue_passes(conn, [(event_id, u, d) for u, d in holders])
+    if issued is None:
+        raise ValueError("Event not found")
+
+    return [
+        {"user_id": u, "dependent_id": d, **issued[(event_id, u, d)]}
+        for u, d in holders
+    ]
+
+
+def create_passes_for_user(
+    user_id: int,
+    items: list[tuple[int, Optional[int]]],
+    conn: Optional[Connection] = None,
+) -> dict[tuple[int, Optional[int]], dict]:
+    """
+    Issue passes for one user's (event_id, dependent_id) items across any
+    number of events, e.g. a family signing up for a season. Membership
+    must have been checked by the caller. Returns (event_id, dependent_id) ->
+    {status, pass_code}, plus the waitlist position of waitlisted items;
+    items whose event no longer exists are left out.
+    """
+    items = list(dict.fromkeys(items))
+    if not items:
+        return {}
+
+    with begin(conn) as conn:
+        issued = _issue_passes(conn, [(e, user_id, d) for e, d in items])
+        if issued is None:
+            return {}
 
-    with engine.begin() as conn:
-        # Check for duplicate pass: event_id, user_id, and dependent_id must all match
-        # Handle NULL correctly: NULL = NULL only for self passes, non-NULL = non-NULL for dependent passes
-        existing = conn.execute(
+        waitlisted = [e for (e, _, _), r in issued.items() if r["status"] == "waitlisted"]
+        if waitlisted:
+            positions = _get_waitlist_positions(conn, list(set(waitlisted)), user_id)
+            for (e, _, d), result in issued.items():
+                if result["status"] == "waitlisted":
+                    result["position"] = positions[(e, d or 0)]
+
+    return {(e, d): result for (e, _, d), result in issued.items()}
+
+
+def cancel_event_pass(
+    event_id: int,
+    user_id: int,
+    dependent_id: Optional[int],
+    conn: Optional[Connection] = None,
+) -> dict:
+    """
+    Give up a pass that hasn't been checked in, or a place on the waitlist.
+    A freed seat goes to the head of the waitlist in the same transaction.
+    Returns what was cancelled ("pass" or "waitlist") and the promoted
+    holders' new passes.
+    """
+    key = {"event_id": event_id, "user_id": user_id, "dep_key": dependent_id or 0}
+    with begin(conn) as conn:
+        result = conn.execute(
             text("""
-                SELECT id FROM event_passes
+                DELETE FROM event_passes
                 WHERE event_id = :event_id
                   AND user_id = :user_id
-                  AND (
-                    (:dependent_id IS NULL AND dependent_id IS NULL)
-                    OR
-                    (:dependent_id IS NOT NULL AND dependent_id = :dependent_id)
-                  )
+                  AND dep_key = :dep_key
+                  AND checked_in_at IS NULL
             """),
-            {
-                "event_id": event_id,
-                "user_id": user_id,
-                "dependent_id": dependent_id,
-            },
-        ).fetchone()
+            key,
+        )
+        if result.rowcount:
+            release_pass_seat(event_id, conn=conn)
+            return {"cancelled": "pass", "promoted": _promote_waitlist(conn, event_id)}
 
-        if existing:
-            raise ValueError("Pass already exists")
+        result = conn.execute(
+            text("""
+                DELETE FROM event_waitlist
+                WHERE event_id = :event_id
+                  AND user_id = :user_id
+                  AND dep_key = :dep_key
+            """),
+            key,
+        )
+        if result.rowcount:
+            return {"cancelled": "waitlist", "promoted": []}
+
+    raise ValueError("No pass or waitlist entry to cancel")
+
+
+def _issue_passes(
+    conn: Connection,
+    items: list[tuple[int, int, Optional[int]]],
+) -> Optional[dict]:
+    """
+    Issue passes for distinct (event_id, user_id, dependent_id) items.
 
+    The events are locked first, so the holders' existing passes are read
+    with no other issuance in flight and seats are only taken for holders
+    that really are new. Seats and serials for them are taken with one
+    UPDATE over all their events, and the passes inserted with one
+    executemany, which PyMySQL rewrites into a multi-row INSERT. Items
+    beyond an event's capacity join its waitlist. Returns item ->
+    {status, pass_code}, without the items of events that don't exist, or
+    None if none exist.
+    """
+    event_ids = list({e for e, _, _ in items})
+    live = lock_events(event_ids, conn=conn)
+    if not live:
+        return None
+
+    user_ids = list({u for _, u, _ in items})
+    existing = _get_pass_codes(conn, event_ids, user_ids, lock=True)
+    new = [
+        item for item in items
+        if item[0] in live and (item[0], item[1], item[2] or 0) not in existing
+    ]
+
+    minted = {}
+    waitlisted = []
+    if new:
+        counts = Counter(event_id for event_id, _, _ in new)
+        seats = take_pass_seats(counts, conn=conn)
+        for item in new:
+            event_id = item[0]
+            serial, left = seats[event_id]
+            if left:
+                minted[item] = make_pass_code(event_id, serial)
+                seats[event_id] = (serial + 1, left - 1)
+            else:
+                waitlisted.append(item)
+
+    if minted:
+        # Writers that don't take the event lock first can still win a
+        # holder; their row is kept and the seat taken here given back
         conn.execute(
             text("""
                 INSERT INTO event_passes (event_id, user_id, dependent_id, pass_code)
                 VALUES (:event_id, :user_id, :dependent_id, :pass_code)
+                ON DUPLICATE KEY UPDATE id = id
             """),
-            {
-                "event_id": event_id,
-                "user_id": user_id,
-                "dependent_id": dependent_id,
-                "pass_code": pass_code,
-            },
+            [
+                {"event_id": e, "user_id": u, "dependent_id": d, "pass_code": code}
+                for (e, u, d), code in minted.items()
+            ],
         )
+        existing = _get_pass_codes(conn, event_ids, user_ids, lock=True)
+        lost = Counter(
+            e for (e, u, d), code in minted.items()
+            if existing.get((e, u, d or 0)) != code
+        )
+        for event_id, seats_lost in lost.items():
+            release_pass_seat(event_id, seats=seats_lost, conn=conn)
+    if waitlisted:
+        _join_waitlist(conn, waitlisted)
+
+    issued = {}
+    for item in items:
+        event_id, holder_id, dependent_id = item
+        if event_id not in live:
+            continue
+        pass_code = existing.get((event_id, holder_id, dependent_id or 0))
+        if pass_code is None:
+            status = "waitlisted"
+        elif minted.get(item) == pass_code:
+            status = "created"
+        else:
+            status = "existing"
+        issued[item] = {"status": status, "pass_code": pass_code}
+    return issued
+
+
+def _get_pass_codes(
+    conn: Connection,
+    event_ids: list[int],
+    user_ids: list[int],
+    lock: bool = False,
+) -> dict[tuple[int, int, int], str]:
+    """
+    (event_id, user_id, dep_key) -> pass_code of the users' passes for the
+    events, read through the (event_id, user_id, dep_key) unique index.
+    lock makes it a locking read, which sees rows committed after the
+    transaction's snapshot was taken.
+    """
+    query = """
+        SELECT event_id, user_id, dep_key, pass_code
+        FROM event_passes
+        WHERE event_id IN :event_ids
+          AND user_id IN :user_ids
+    """
+    if lock:
+        query += " FOR SHARE"
+
+    result = conn.execute(
+        text(query).bindparams(
+            bindparam("event_ids", expanding=True),
+            bindparam("user_ids", expanding=True),
+        ),
+        {"event_ids": event_ids, "user_ids": user_ids},
+    )
+    return {(row.event_id, row.user_id, row.dep_key): row.pass_code for row in result}
 
-    return {"pass_code": pass_code}
 
+def _join_waitlist(conn: Connection, items: list[tuple[int, int, Optional[int]]]):
+    # Joining again keeps the original place in line
+    conn.execute(
+        text("""
+            INSERT INTO event_waitlist (event_id, user_id, dependent_id)
+            VALUES (:event_id, :user_id, :dependent_id)
+            ON DUPLICATE KEY UPDATE id = id
+        """),
+        [{"event_id": e, "user_id": u, "dependent_id": d} for e, u, d in items],
+    )
 
-    
-def get_passes_for_user(user_id: int) -> list[dict]:
-    with engine.connect() as conn:
+
+def _get_waitlist_positions(
+    conn: Connection,
+    event_ids: list[int],
+    user_id: int,
+) -> dict[tuple[int, int], int]:
+    """
+    (event_id, dep_key) -> 1-based place in line of the user's waitlist entries.
+    """
+    result = conn.execute(
+        text("""
+            SELECT
+                w.event_id,
+                w.dep_key,
+                (
+                    SELECT COUNT(*)
+                    FROM event_waitlist ahead
+                    WHERE ahead.event_id = w.event_id
+                      AND ahead.id <= w.id
+                ) AS position
+            FROM event_waitlist w
+            WHERE w.event_id IN :event_ids
+              AND w.user_id = :user_id
+        """).bindparams(bindparam("event_ids", expanding=True)),
+        {"event_ids": event_ids, "user_id": user_id},
+    )
+    return {(row.event_id, row.dep_key): row.position for row in result}
+
+
+def _promote_waitlist(conn: Connection, event_id: int) -> list[dict]:
+    """
+    Issue passes to the head of the event's waitlist for its free seats.
+    The caller holds the event row lock; only the promoted holders' passes
+    are looked up.
+    """
+    seats = get_event_seats(event_id, conn=conn)
+    if seats is None:
+        return []
+    query = """
+        SELECT id, user_id, dependent_id
+        FROM event_waitlist
+        WHERE event_id = :event_id
+        ORDER BY id
+    """
+    params = {"event_id": event_id}
+    if seats["capacity"] is not None:
+        free = seats["capacity"] - seats["seats_taken"]
+        if free <= 0:
+            return []
+        query += " LIMIT :free"
+        params["free"] = free
+
+    entries = conn.execute(text(query + " FOR UPDATE"), params).fetchall()
+    if not entries:
+        return []
+
+    conn.execute(
+        text("DELETE FROM event_waitlist WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+        {"ids": [entry.id for entry in entries]},
+    )
+    items = [(event_id, entry.user_id, entry.dependent_id) for entry in entries]
+    issued = _issue_passes(conn, items) or {}
+    return [
+        {"user_id": u, "dependent_id": d, "pass_code": issued[(e, u, d)]["pass_code"]}
+        for e, u, d in items
+        if issued.get((e, u, d), {}).get("status") == "created"
+    ]
+
+
+def get_passes_for_user(user_id: int, conn: Optional[Connection] = None) -> list[dict]:
+    with connect(conn) as conn:
         result = conn.execute(
             text("""
                 SELECT
@@ -87,8 +387,28 @@ def get_passes_for_user(user_id: int) -> list[dict]:
 
         return passes
 
-def get_passes_for_user_event(event_id: int, user_id: int):
-    with engine.connect() as conn:
+
+def get_user_passes_version(user_id: int, conn: Optional[Connection] = None) -> dict:
+    """
+    Change stamp for get_passes_for_user. Covers the passes and the events
+    they are for, since event titles are part of the payload.
+    """
+    with connect(conn) as conn:
+        row = conn.execute(
+            text("""
+                SELECT
+                    COUNT(*) AS count,
+                    UNIX_TIMESTAMP(GREATEST(MAX(ep.updated_at), MAX(e.updated_at))) AS updated_at
+                FROM event_passes ep
+                JOIN events e ON e.id = ep.event_id
+                WHERE ep.user_id = :user_id
+            """),
+            {"user_id": user_id},
+        ).fetchone()
+        return dict(row._mapping)
+
+def get_passes_for_user_event(event_id: int, user_id: int, conn: Optional[Connection] = None):
+    with connect(conn) as conn:
         result = conn.execute(
             text("""
                 SELECT
@@ -107,31 +427,125 @@ def get_passes_for_user_event(event_id: int, user_id: int):
         return [row._mapping["dependent_id"] for row in result]
 
 
-def get_passes_for_club(club_id: int) -> list[dict]:
+def _club_passes_query(club_id: int, limit: Optional[int], after: Optional[list]):
+    keyset = ""
+    params = {"club_id": club_id}
+    if after is not None:
+        keyset = """
+                  AND (
+                    e.event_date < :after_date
+                    OR (e.event_date = :after_date AND ep.id < :after_id)
+                  )"""
+        params.update({"after_date": after[0], "after_id": after[1]})
+
+    page = ""
+    if limit is not None:
+        page = "LIMIT :limit"
+        params["limit"] = limit + 1
+
+    query = text(f"""
+        SELECT
+            ep.id,
+            ep.pass_code,
+            e.title AS event_title,
+            e.event_date,
+            u.phone_number AS user_phone,
+            d.name AS dependent_name,
+            d.relation AS dependent_relation
+        FROM event_passes ep
+        JOIN events e ON e.id = ep.event_id
+        JOIN users u ON u.id = ep.user_id
+        LEFT JOIN dependents d ON d.id = ep.dependent_id
+        WHERE e.club_id = :club_id{keyset}
+        ORDER BY e.event_date DESC, ep.id DESC
+        {page}
+    """)
+    return query, params
+
+
+def _club_pass_row(r) -> dict:
+    return {
+        "id": r["id"],
+        "pass_code": r["pass_code"],
+        "event_title": r["event_title"],
+        "event_date": r["event_date"],
+        "user_phone": r["user_phone"],
+        "member": (
+            "Self"
+            if r["dependent_name"] is None
+            else f'{r["dependent_name"]} ({r["dependent_relation"]})'
+        ),
+    }
+
+
+def get_passes_for_club(
+    club_id: int,
+    limit: Optional[int] = None,
+    after: Optional[list] = None,
+    conn: Optional[Connection] = None,
+) -> list[dict]:
     """
     Get all event passes for a club.
     Returns passes with event name, member info, and pass code.
+    With limit, returns at most limit + 1 passes after the (event_date, id) key in after.
     """
-    with engine.connect() as conn:
-        result = conn.execute(
-            text("""
-                SELECT
-                    ep.id,
-                    ep.pass_code,
-                    e.title AS event_title,
-                    e.event_date,
-                    u.phone_number AS user_phone,
-                    d.name AS dependent_name,
-                    d.relation AS dependent_relation
-                FROM event_passes ep
-                JOIN events e ON e.id = ep.event_id
-                JOIN users u ON u.id = ep.user_id
-                LEFT JOIN dependents d ON d.id = ep.dependent_id
-                WHERE e.club_id = :club_id
-                ORDER BY e.event_date DESC, ep.id DESC
-            """),
-            {"club_id": club_id},
-        )
+    query, params = _club_passes_query(club_id, limit, after)
+
+    with connect(conn) as conn:
+        result = conn.execute(query, params)
+        return [_club_pass_row(row._mapping) for row in result]
+
+
+def iter_passes_for_club(club_id: int, conn: Optional[Connection] = None):
+    """
+    Yield every pass of a club, in the same order and shape as
+    get_passes_for_club, from a server-side cursor.
+    """
+    query, params = _club_passes_query(club_id, None, None)
+
+    with connect(conn) as conn:
+        result = conn.execute(query, params, execution_options={"stream_results": True})
+        for row in result:
+            yield _club_pass_row(row._mapping)
+
+
+def get_passes_for_check_in(
+    event_id: int,
+    pass_codes: Optional[list[str]] = None,
+    conn: Optional[Connection] = None,
+) -> list[dict]:
+    """
+    Passes of an event with what the door needs to see, for the check-in
+    index. With pass_codes, only those passes.
+    """
+    code_filter = ""
+    params = {"event_id": event_id}
+    if pass_codes is not None:
+        code_filter = "AND ep.pass_code IN :pass_codes"
+        params["pass_codes"] = pass_codes
+
+    query = text(f"""
+        SELECT
+            ep.id,
+            ep.pass_code,
+            ep.user_id,
+            ep.dependent_id,
+            ep.checked_in_at,
+            u.full_name AS user_name,
+            u.phone_number AS user_phone,
+            d.name AS dependent_name,
+            d.relation AS dependent_relation
+        FROM event_passes ep
+        JOIN users u ON u.id = ep.user_id
+        LEFT JOIN dependents d ON d.id = ep.dependent_id
+        WHERE ep.event_id = :event_id
+          {code_filter}
+    """)
+    if pass_codes is not None:
+        query = query.bindparams(bindparam("pass_codes", expanding=True))
+
+    with connect(conn) as conn:
+        result = conn.execute(query, params)
 
         passes = []
         for row in result:
@@ -139,8 +553,10 @@ def get_passes_for_club(club_id: int) -> list[dict]:
             passes.append({
                 "id": r["id"],
                 "pass_code": r["pass_code"],
-                "event_title": r["event_title"],
-                "event_date": r["event_date"],
+                "user_id": r["user_id"],
+                "dependent_id": r["dependent_id"],
+                "checked_in_at": r["checked_in_at"],
+                "user_name": r["user_name"],
                 "user_phone": r["user_phone"],
                 "member": (
                     "Self"
@@ -148,5 +564,53 @@ def get_passes_for_club(club_id: int) -> list[dict]:
                     else f'{r["dependent_name"]} ({r["dependent_relation"]})'
                 ),
             })
-
         return passes
+
+
+def record_check_ins(scans: list[tuple[int, int]], conn: Optional[Connection] = None) -> dict[int, dict]:
+    """
+    Check in a batch of (pass_id, admin_user_id) scans.
+
+    A pass is only checked in while checked_in_at is NULL, so replays and
+    scans racing on other workers are harmless. Returns, per pass id, the
+    recorded checked_in_at and whether this batch set it ("first"); the
+    first scan of a pass listed twice in the batch wins.
+    """
+    by_admin = {}
+    for pass_id, admin_user_id in scans:
+        by_admin.setdefault(admin_user_id, []).append(pass_id)
+    pass_ids = list({pass_id for pass_id, _ in scans})
+
+    with begin(conn) as conn:
+        # One timestamp for the batch tells rows set here from earlier check-ins
+        now = conn.execute(text("SELECT NOW(6)")).scalar()
+
+        for admin_user_id, ids in by_admin.items():
+            conn.execute(
+                text("""
+                    UPDATE event_passes
+                    SET checked_in_at = :now,
+                        checked_in_by = :admin_user_id
+                    WHERE id IN :pass_ids
+                      AND checked_in_at IS NULL
+                """).bindparams(bindparam("pass_ids", expanding=True)),
+                {"now": now, "admin_user_id": admin_user_id, "pass_ids": ids},
+            )
+
+        result = conn.execute(
+            text("""
+                SELECT id, checked_in_at, checked_in_by
+                FROM event_passes
+                WHERE id IN :pass_ids
+            """).bindparams(bindparam("pass_ids", expanding=True)),
+            {"pass_ids": pass_ids},
+        )
+        return {
+            row.id: {
+                "checked_in_at": row.checked_in_at,
+                "checked_in_by": row.checked_in_by,
+                "first": row.checked_in_at == now,
+            }
+            for row in result
+        }
+
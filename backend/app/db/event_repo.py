@@ -1,6 +1,7 @@
-from sqlalchemy import text
+from sqlalchemy import Connection, bindparam, text
 from typing import Optional
-from app.db.session import engine
+from app.db.session import begin, connect
+from app.db.sync import changes_filter
 
 
 def create_event(
@@ -10,8 +11,10 @@ def create_event(
     event_date: str,
     location: Optional[str],
     requires_pass: bool,
+    capacity: Optional[int] = None,
+    conn: Optional[Connection] = None,
 ):
-    with engine.connect() as conn:
+    with begin(conn) as conn:
         conn.execute(
             text("""
                 INSERT INTO events (
@@ -20,7 +23,8 @@ def create_event(
                     description,
                     event_date,
                     location,
-                    requires_pass
+                    requires_pass,
+                    capacity
                 )
                 VALUES (
                     :club_id,
@@ -28,7 +32,8 @@ def create_event(
                     :description,
                     :event_date,
                     :location,
-                    :requires_pass
+                    :requires_pass,
+                    :capacity
                 )
             """),
             {
@@ -38,13 +43,13 @@ def create_event(
                 "event_date": event_date,
                 "location": location,
                 "requires_pass": requires_pass,
+                "capacity": capacity,
             },
         )
-        conn.commit()
 
 
-def get_events_for_club(club_id: int):
-    with engine.connect() as conn:
+def get_events_for_club(club_id: int, conn: Optional[Connection] = None):
+    with connect(conn) as conn:
         result = conn.execute(
             text("""
                 SELECT
@@ -53,11 +58,214 @@ def get_events_for_club(club_id: int):
                     description,
                     event_date,
                     location,
-                    requires_pass
+                    requires_pass,
+                    capacity
                 FROM events
                 WHERE club_id = :club_id
+                  AND deleted_at IS NULL
                 ORDER BY event_date ASC
             """),
             {"club_id": club_id},
         )
         return [dict(row._mapping) for row in result]
+
+
+def get_event_changes(
+    club_id: int,
+    after: Optional[list],
+    limit: int,
+    conn: Optional[Connection] = None,
+) -> list[dict]:
+    """
+    Up to limit + 1 events (deleted ones included, with deleted_at set)
+    changed after the (updated_at, id) key in after, oldest change first.
+    """
+    changed, params = changes_filter("e", after)
+    params.update({"club_id": club_id, "limit": limit + 1})
+
+    with connect(conn) as conn:
+        result = conn.execute(
+            text(f"""
+                SELECT
+                    e.id,
+                    e.title,
+                    e.description,
+                    e.event_date,
+                    e.location,
+                    e.requires_pass,
+                    e.capacity,
+                    e.updated_at,
+                    e.deleted_at
+                FROM events e
+                WHERE e.club_id = :club_id{changed}
+                ORDER BY e.updated_at, e.id
+                LIMIT :limit
+            """),
+            params,
+        )
+        return [dict(row._mapping) for row in result]
+
+
+def delete_event(club_id: int, event_id: int, conn: Optional[Connection] = None) -> bool:
+    """
+    Soft delete. Existing passes are kept; the event no longer shows in
+    lists and can't be attended. False if there was no such live event.
+    """
+    with begin(conn) as conn:
+        result = conn.execute(
+            text("""
+                UPDATE events
+                SET deleted_at = NOW(6)
+                WHERE id = :event_id
+                  AND club_id = :club_id
+                  AND deleted_at IS NULL
+            """),
+            {"event_id": event_id, "club_id": club_id},
+        )
+        return result.rowcount > 0
+
+
+def get_event_club_id(event_id: int, conn: Optional[Connection] = None) -> Optional[int]:
+    """
+    Club of a live event, or None.
+    """
+    with connect(conn) as conn:
+        return conn.execute(
+            text("""
+                SELECT club_id
+                FROM events
+                WHERE id = :event_id
+                  AND deleted_at IS NULL
+            """),
+            {"event_id": event_id},
+        ).scalar()
+
+
+def take_pass_seat(event_id: int, conn: Optional[Connection] = None) -> Optional[int]:
+    """
+    Take one seat of the event and reserve a pass serial for it with one
+    conditional UPDATE. Returns the serial, or None if the event is full or
+    not live. The event row stays locked until the caller's transaction
+    ends, so concurrent attendees can't overbook it.
+    """
+    with begin(conn) as conn:
+        result = conn.execute(
+            text("""
+                UPDATE events
+                SET seats_taken = seats_taken + 1,
+                    pass_seq = pass_seq + 1
+                WHERE id = :event_id
+                  AND deleted_at IS NULL
+                  AND (capacity IS NULL OR seats_taken < capacity)
+            """),
+            {"event_id": event_id},
+        )
+        if result.rowcount == 0:
+            return None
+        return conn.execute(
+            text("SELECT pass_seq FROM events WHERE id = :event_id"),
+            {"event_id": event_id},
+        ).scalar()
+
+
+def lock_events(event_ids: list[int], conn: Optional[Connection] = None) -> set[int]:
+    """
+    Lock the rows of the live events among event_ids until the caller's
+    transaction ends, which serializes pass issuance for them. Returns
+    the live event ids.
+    """
+    if not event_ids:
+        return set()
+
+    with begin(conn) as conn:
+        result = conn.execute(
+            text("""
+                SELECT id
+                FROM events
+                WHERE id IN :event_ids
+                  AND deleted_at IS NULL
+                ORDER BY id
+                FOR UPDATE
+            """).bindparams(bindparam("event_ids", expanding=True)),
+            {"event_ids": list(event_ids)},
+        )
+        return {row.id for row in result}
+
+
+def take_pass_seats(
+    counts: dict[int, int],
+    conn: Optional[Connection] = None,
+) -> dict[int, tuple[int, int]]:
+    """
+    Take up to counts[event_id] seats of each event, as many as are left,
+    and reserve a pass serial per seat taken. Returns event_id ->
+    (first serial, seats taken) for the live events among them.
+    """
+    if not counts:
+        return {}
+
+    with begin(conn) as conn:
+        result = conn.execute(
+            text("""
+                SELECT id, capacity, seats_taken, pass_seq
+                FROM events
+                WHERE id IN :event_ids
+                  AND deleted_at IS NULL
+                FOR UPDATE
+            """).bindparams(bindparam("event_ids", expanding=True)),
+            {"event_ids": list(counts)},
+        )
+        taken = {}
+        for row in result:
+            seats = counts[row.id]
+            if row.capacity is not None:
+                seats = max(0, min(seats, row.capacity - row.seats_taken))
+            taken[row.id] = (row.pass_seq + 1, seats)
+
+        params = {}
+        cases = []
+        for i, (event_id, (_, seats)) in enumerate(taken.items()):
+            if seats:
+                params[f"e{i}"] = event_id
+                params[f"c{i}"] = seats
+                cases.append(f"WHEN :e{i} THEN :c{i}")
+        if cases:
+            conn.execute(
+                text(f"""
+                    UPDATE events
+                    SET seats_taken = seats_taken + CASE id {" ".join(cases)} ELSE 0 END,
+                        pass_seq = pass_seq + CASE id {" ".join(cases)} ELSE 0 END
+                    WHERE id IN :event_ids
+                """).bindparams(bindparam("event_ids", expanding=True)),
+                {**params, "event_ids": [e for e, (_, seats) in taken.items() if seats]},
+            )
+        return taken
+
+
+def release_pass_seat(event_id: int, seats: int = 1, conn: Optional[Connection] = None):
+    with begin(conn) as conn:
+        conn.execute(
+            text("""
+                UPDATE events
+                SET seats_taken = GREATEST(seats_taken - :seats, 0)
+                WHERE id = :event_id
+            """),
+            {"event_id": event_id, "seats": seats},
+        )
+
+
+def get_event_seats(event_id: int, conn: Optional[Connection] = None) -> Optional[dict]:
+    """
+    capacity (None for unlimited) and seats_taken of a live event, or None.
+    """
+    with connect(conn) as conn:
+        row = conn.execute(
+            text("""
+                SELECT capacity, seats_taken
+                FROM events
+                WHERE id = :event_id
+                  AND deleted_at IS NULL
+            """),
+            {"event_id": event_id},
+        ).fetchone()
+        return dict(row._mapping) if row else None
@@ -0,0 +1,116 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy import Connection, bindparam, text
+
+from app.db.club_stats_repo import shift_member_counts
+from app.db.session import begin, connect
+
+
+def get_db_today(conn: Optional[Connection] = None) -> datetime.date:
+    """
+    Today by the database clock, the one the membership checks compare
+    expiry_date against (CURDATE()).
+    """
+    with connect(conn) as conn:
+        return conn.execute(text("SELECT CURDATE()")).scalar()
+
+
+def expire_memberships_batch(
+    today: datetime.date,
+    batch_size: int,
+    conn: Optional[Connection] = None,
+) -> list[dict]:
+    """
+    Mark up to batch_size active memberships whose expiry_date is before
+    today as 'expired', oldest expiry first, and shift the club counters.
+    Rows locked by another sweep are skipped, so sweeps on several workers
+    split the work instead of queueing. Returns the expired memberships.
+    """
+    with begin(conn) as conn:
+        rows = conn.execute(
+            text("""
+                SELECT id, user_id, club_id, expiry_date
+                FROM memberships
+                WHERE status = 'active'
+                  AND expiry_date < :today
+                ORDER BY expiry_date, id
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            """),
+            {"today": today, "batch_size": batch_size},
+        ).fetchall()
+        if not rows:
+            return []
+
+        conn.execute(
+            text("UPDATE memberships SET status = 'expired' WHERE id IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": [row.id for row in rows]},
+        )
+        shift_member_counts(conn, [
+            (row.club_id, ("active", row.expiry_date), ("expired", row.expiry_date))
+            for row in rows
+        ])
+
+    return [
+        {"membership_id": row.id, "user_id": row.user_id, "club_id": row.club_id}
+        for row in rows
+    ]
+
+
+def queue_renewal_reminders_batch(
+    today: datetime.date,
+    days_ahead: int,
+    after: Optional[tuple[datetime.date, int]],
+    batch_size: int,
+    conn: Optional[Connection] = None,
+) -> tuple[int, Optional[tuple[datetime.date, int]]]:
+    """
+    Queue a renewal reminder for up to batch_size active memberships
+    expiring between today and today + days_ahead, continuing after the
+    (expiry_date, id) returned by the previous batch. Memberships already
+    reminded about the same expiry date are skipped. Returns the number
+    queued and the position to continue from, None once the range is done.
+    """
+    until = today + datetime.timedelta(days=days_ahead)
+    after_date, after_id = after or (today, 0)
+
+    with begin(conn) as conn:
+        rows = conn.execute(
+            text("""
+                SELECT m.id, m.user_id, m.club_id, m.expiry_date
+                FROM memberships m
+                WHERE m.status = 'active'
+                  AND m.expiry_date BETWEEN :after_date AND :until
+                  AND (m.expiry_date > :after_date OR m.id > :after_id)
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM membership_reminders r
+                      WHERE r.membership_id = m.id
+                        AND r.expiry_date = m.expiry_date
+                  )
+                ORDER BY m.expiry_date, m.id
+                LIMIT :batch_size
+            """),
+            {"after_date": after_date, "after_id": after_id, "until": until, "batch_size": batch_size},
+        ).fetchall()
+        if not rows:
+            return 0, None
+
+        # A concurrent sweep may have queued some of them meanwhile
+        conn.execute(
+            text("""
+                INSERT INTO membership_reminders (membership_id, user_id, club_id, expiry_date)
+                VALUES (:membership_id, :user_id, :club_id, :expiry_date)
+                ON DUPLICATE KEY UPDATE id = id
+            """),
+            [
+                {"membership_id": row.id, "user_id": row.user_id, "club_id": row.club_id, "expiry_date": row.expiry_date}
+                for row in rows
+            ],
+        )
+
+    if len(rows) < batch_size:
+        return len(rows), None
+    return len(rows), (rows[-1].expiry_date, rows[-1].id)
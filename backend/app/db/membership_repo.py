@@ -1,14 +1,16 @@
 from typing import Optional
-from sqlalchemy import text
-from app.db.session import engine
+from sqlalchemy import Connection, bindparam, text
+from sqlalchemy.exc import IntegrityError
+from app.db.club_stats_repo import shift_member_counts
+from app.db.session import begin, connect, is_duplicate_key_error
 
 
-def get_all_clubs():
+def get_all_clubs(conn: Optional[Connection] = None):
     """
     Get all clubs in the system.
     Used for browsing clubs and requesting membership.
     """
-    with engine.connect() as conn:
+    with connect(conn) as conn:
         result = conn.execute(
             text("""
                 SELECT id AS club_id, name AS club_name
@@ -19,11 +21,11 @@ def get_all_clubs():
         return [dict(row._mapping) for row in result]
 
 
-def get_admin_clubs(user_id: int) -> list[dict]:
+def get_admin_clubs(user_id: int, conn: Optional[Connection] = None) -> list[dict]:
     """
     Get clubs where the user has admin or superadmin role.
     """
-    with engine.connect() as conn:
+    with connect(conn) as conn:
         result = conn.execute(
             text("""
                 SELECT DISTINCT
@@ -40,8 +42,8 @@ def get_admin_clubs(user_id: int) -> list[dict]:
         return [dict(row._mapping) for row in result]
 
 
-def get_clubs_for_user(user_id: int):
-    with engine.connect() as conn:
+def get_clubs_for_user(user_id: int, conn: Optional[Connection] = None):
+    with connect(conn) as conn:
         result = conn.execute(
             text(
                 """
@@ -98,18 +100,77 @@ def get_clubs_for_user(user_id: int):
         return list(clubs.values())
 
 
+def get_user_clubs_version(user_id: int, conn: Optional[Connection] = None) -> dict:
+    """
+    Change stamp for get_clubs_for_user: the user's membership count and
+    latest updated_at (epoch seconds). Any insert, update or delete moves it.
+    """
+    with connect(conn) as conn:
+        row = conn.execute(
+            text("""
+                SELECT
+                    COUNT(*) AS count,
+                    UNIX_TIMESTAMP(MAX(updated_at)) AS updated_at
+                FROM memberships
+                WHERE user_id = :user_id
+            """),
+            {"user_id": user_id},
+        ).fetchone()
+        return dict(row._mapping)
+
+
 # Membership validation for events - requires active status
+def get_active_club_ids_for_user(user_id: int, conn: Optional[Connection] = None) -> list[int]:
+    """
+    Clubs where the user or one of their dependents is an active, unexpired member.
+    """
+    with connect(conn) as conn:
+        result = conn.execute(
+            text("""
+                SELECT DISTINCT club_id
+                FROM memberships
+                WHERE user_id = :user_id
+                  AND status = 'active'
+                  AND (expiry_date IS NULL OR expiry_date >= CURDATE())
+            """),
+            {"user_id": user_id},
+        )
+        return [row.club_id for row in result]
+
+
+def get_event_roster(event_id: int, conn: Optional[Connection] = None) -> list[tuple[int, Optional[int]]]:
+    """
+    (user_id, dependent_id) of every active, unexpired membership in the event's club.
+    """
+    with connect(conn) as conn:
+        result = conn.execute(
+            text("""
+                SELECT m.user_id, m.dependent_id
+                FROM events e
+                JOIN memberships m ON m.club_id = e.club_id
+                WHERE e.id = :event_id
+                  AND m.status = 'active'
+                  AND (m.expiry_date IS NULL OR m.expiry_date >= CURDATE())
+                ORDER BY m.id
+            """),
+            {"event_id": event_id},
+        )
+        return [(row.user_id, row.dependent_id) for row in result]
+
+
 def is_user_member_of_event_club(
     user_id: int,
     event_id: int,
     dependent_id: Optional[int],
+    conn: Optional[Connection] = None,
 ) -> bool:
     """
     Check if user has active membership for the event's club.
-    Returns True only if membership status is 'active'.
+    Returns True only if membership status is 'active' and it hasn't
+    expired yet (the sweep may not have marked it 'expired' so far).
     Handles both self (dependent_id IS NULL) and dependent memberships.
     """
-    with engine.connect() as conn:
+    with connect(conn) as conn:
         result = conn.execute(
             text(
                 """
@@ -117,61 +178,104 @@ def is_user_member_of_event_club(
                 FROM events e
                 JOIN memberships m ON m.club_id = e.club_id
                 WHERE e.id = :event_id
+                  AND e.deleted_at IS NULL
                   AND m.user_id = :user_id
+                  AND m.dep_key = :dep_key
                   AND m.status = 'active'
-                  AND (
-                    (:dependent_id IS NULL AND m.dependent_id IS NULL)
-                    OR
-                    (:dependent_id IS NOT NULL AND m.dependent_id = :dependent_id)
-                  )
+                  AND (m.expiry_date IS NULL OR m.expiry_date >= CURDATE())
                 LIMIT 1
                 """
             ),
             {
                 "event_id": event_id,
                 "user_id": user_id,
-                "dependent_id": dependent_id,
+                "dep_key": dependent_id or 0,
             },
         ).fetchone()
 
         return result is not None
 
 
-def request_membership(
+def get_member_event_keys(
     user_id: int,
-    club_id: int,
-    dependent_id: Optional[int],
-) -> dict:
+    items: list[tuple[int, Optional[int]]],
+    conn: Optional[Connection] = None,
+) -> set[tuple[int, Optional[int]]]:
     """
-    Request membership for a user (self or dependent) to a club.
-    Creates a membership with status = 'pending'.
-    Prevents duplicate memberships for the same user + club + dependent.
+    The (event_id, dependent_id) items the user may get passes for: the
+    event is live and the user (or the dependent) is an active, unexpired
+    member of its club. Checked for all items with one query.
     """
-    with engine.begin() as conn:
-        # Check for existing membership (any status) for the same user + club + dependent
-        existing = conn.execute(
-            text("""
-                SELECT id FROM memberships
-                WHERE user_id = :user_id
-                  AND club_id = :club_id
-                  AND (
-                    (:dependent_id IS NULL AND dependent_id IS NULL)
-                    OR
-                    (:dependent_id IS NOT NULL AND dependent_id = :dependent_id)
-                  )
-                LIMIT 1
-            """),
+    if not items:
+        return set()
+
+    with connect(conn) as conn:
+        result = conn.execute(
+            text(
+                """
+                SELECT e.id AS event_id, m.dep_key
+                FROM events e
+                JOIN memberships m ON m.club_id = e.club_id
+                WHERE e.id IN :event_ids
+                  AND e.deleted_at IS NULL
+                  AND m.user_id = :user_id
+                  AND m.dep_key IN :dep_keys
+                  AND m.status = 'active'
+                  AND (m.expiry_date IS NULL OR m.expiry_date >= CURDATE())
+                """
+            ).bindparams(
+                bindparam("event_ids", expanding=True),
+                bindparam("dep_keys", expanding=True),
+            ),
             {
                 "user_id": user_id,
-                "club_id": club_id,
-                "dependent_id": dependent_id,
+                "event_ids": list({e for e, _ in items}),
+                "dep_keys": list({d or 0 for _, d in items}),
             },
-        ).fetchone()
+        )
+        allowed = {(row.event_id, row.dep_key) for row in result}
+
+    return {(e, d) for e, d in items if (e, d or 0) in allowed}
 
-        if existing:
-            raise ValueError("Membership request already exists for this club")
 
-        # Create new membership request with status = 'pending'
+def _get_membership_by_key(
+    conn: Connection,
+    user_id: int,
+    club_id: int,
+    dependent_id: Optional[int],
+):
+    """
+    The membership for user + club + dependent, found through the
+    (user_id, club_id, dep_key) unique index. dep_key is dependent_id with
+    NULL mapped to 0.
+    """
+    return conn.execute(
+        text("""
+            SELECT id, status FROM memberships
+            WHERE user_id = :user_id
+              AND club_id = :club_id
+              AND dep_key = :dep_key
+        """),
+        {
+            "user_id": user_id,
+            "club_id": club_id,
+            "dep_key": dependent_id or 0,
+        },
+    ).fetchone()
+
+
+def _insert_pending_membership(
+    conn: Connection,
+    user_id: int,
+    club_id: int,
+    dependent_id: Optional[int],
+) -> Optional[int]:
+    """
+    Insert a pending membership and return its id, or None if the member
+    already has one for this club. The unique index decides, so concurrent
+    requests can't both insert.
+    """
+    try:
         result = conn.execute(
             text("""
                 INSERT INTO memberships (user_id, club_id, dependent_id, status)
@@ -183,14 +287,40 @@ def request_membership(
                 "dependent_id": dependent_id,
             },
         )
+    except IntegrityError as e:
+        if not is_duplicate_key_error(e):
+            raise
+        return None
+
+    shift_member_counts(conn, [(club_id, None, ("pending", None))])
+    return result.lastrowid
+
 
-        return {"success": True, "membership_id": result.lastrowid}
+def request_membership(
+    user_id: int,
+    club_id: int,
+    dependent_id: Optional[int],
+    conn: Optional[Connection] = None,
+) -> dict:
+    """
+    Request membership for a user (self or dependent) to a club.
+    Creates a membership with status = 'pending'.
+    Prevents duplicate memberships for the same user + club + dependent.
+    """
+    with begin(conn) as conn:
+        membership_id = _insert_pending_membership(conn, user_id, club_id, dependent_id)
+
+        if membership_id is None:
+            raise ValueError("Membership request already exists for this club")
+
+        return {"success": True, "membership_id": membership_id}
 
 
 def request_memberships_batch(
     user_id: int,
     club_id: int,
     dependent_ids: list[Optional[int]],
+    conn: Optional[Connection] = None,
 ) -> dict:
     """
     Request memberships for multiple members (self + dependents) in one request.
@@ -201,55 +331,272 @@ def request_memberships_batch(
     created_ids = []
     skipped = []
 
-    with engine.begin() as conn:
+    with begin(conn) as conn:
         for dependent_id in dependent_ids:
-            # Check for existing membership (any status) for the same user + club + dependent
-            existing = conn.execute(
-                text("""
-                    SELECT id, status FROM memberships
-                    WHERE user_id = :user_id
-                      AND club_id = :club_id
-                      AND (
-                        (:dependent_id IS NULL AND dependent_id IS NULL)
-                        OR
-                        (:dependent_id IS NOT NULL AND dependent_id = :dependent_id)
-                      )
-                    LIMIT 1
-                """),
-                {
-                    "user_id": user_id,
-                    "club_id": club_id,
-                    "dependent_id": dependent_id,
-                },
-            ).fetchone()
-
-            if existing:
-                # Skip if membership already exists
-                r = existing._mapping
-                skipped.append({
-                    "dependent_id": dependent_id,
-                    "membership_id": r["id"],
-                    "status": r["status"],
-                })
-                continue
+            membership_id = _insert_pending_membership(conn, user_id, club_id, dependent_id)
 
-            # Create new membership request with status = 'pending'
-            result = conn.execute(
-                text("""
-                    INSERT INTO memberships (user_id, club_id, dependent_id, status)
-                    VALUES (:user_id, :club_id, :dependent_id, 'pending')
-                """),
-                {
-                    "user_id": user_id,
-                    "club_id": club_id,
-                    "dependent_id": dependent_id,
-                },
-            )
+            if membership_id is not None:
+                created_ids.append(membership_id)
+                continue
 
-            created_ids.append(result.lastrowid)
+            # Skip if membership already exists (any status)
+            existing = _get_membership_by_key(conn, user_id, club_id, dependent_id)
+            r = existing._mapping
+            skipped.append({
+                "dependent_id": dependent_id,
+                "membership_id": r["id"],
+                "status": r["status"],
+            })
 
     return {
         "success": True,
         "created": created_ids,
         "skipped": skipped,
     }
+
+
+def get_pending_members_for_club(
+    club_id: int,
+    limit: Optional[int] = None,
+    after: Optional[list] = None,
+    conn: Optional[Connection] = None,
+) -> list[dict]:
+    """
+    Pending memberships of a club ordered by membership id.
+    With limit, returns at most limit + 1 rows after the [membership_id] key in after.
+    """
+    keyset = ""
+    params = {"club_id": club_id}
+    if after is not None:
+        keyset = "\n                  AND m.id > :after_id"
+        params["after_id"] = after[0]
+
+    page = ""
+    if limit is not None:
+        page = "LIMIT :limit"
+        params["limit"] = limit + 1
+
+    with connect(conn) as conn:
+        result = conn.execute(
+            text(
+                f"""
+                SELECT
+                    m.id AS membership_id,
+                    u.phone_number AS phone,
+                    d.name AS dependent_name,
+                    d.relation AS relation
+                FROM memberships m
+                JOIN users u ON u.id = m.user_id
+                LEFT JOIN dependents d ON d.id = m.dependent_id
+                WHERE m.club_id = :club_id
+                  AND m.status = 'pending'{keyset}
+                ORDER BY m.id
+                {page}
+                """
+            ),
+            params,
+        )
+
+        return [dict(row._mapping) for row in result]
+
+
+def approve_membership(membership_id: int, conn: Optional[Connection] = None) -> Optional[dict]:
+    """
+    Returns the membership's user_id and club_id, or None if it doesn't exist.
+    """
+    with begin(conn) as conn:
+        membership = _lock_membership(conn, membership_id)
+        if membership is None:
+            return None
+        conn.execute(
+            text(
+                """
+                UPDATE memberships
+                SET status = 'active'
+                WHERE id = :id
+                """
+            ),
+            {"id": membership_id},
+        )
+        _shift_status(conn, membership, "active")
+        return {"user_id": membership.user_id, "club_id": membership.club_id}
+
+
+def reject_membership(membership_id: int, reason: str, conn: Optional[Connection] = None) -> Optional[dict]:
+    """
+    Returns the membership's user_id and club_id, or None if it doesn't exist.
+    """
+    with begin(conn) as conn:
+        membership = _lock_membership(conn, membership_id)
+        if membership is None:
+            return None
+        conn.execute(
+            text(
+                """
+                UPDATE memberships
+                SET status = 'rejected',
+                    rejection_reason = :reason
+                WHERE id = :id
+                """
+            ),
+            {
+                "id": membership_id,
+                "reason": reason,
+            },
+        )
+        _shift_status(conn, membership, "rejected")
+        return {"user_id": membership.user_id, "club_id": membership.club_id}
+
+
+def decide_memberships(
+    club_id: int,
+    approve_ids: list[int],
+    rejections: dict[int, str],
+    conn: Optional[Connection] = None,
+) -> tuple[dict[int, str], list[dict]]:
+    """
+    Approve and reject many memberships of one club: one UPDATE for the
+    approvals and one for the rejections, whatever their number.
+
+    Returns the outcome per id ("approved", "rejected", "unchanged" for an
+    approval of an already active membership, or "not_found" for ids that
+    don't exist or belong to another club), and the changed memberships'
+    membership_id, user_id, club_id and new status.
+    """
+    ids = list(approve_ids) + list(rejections)
+    if not ids:
+        return {}, []
+
+    with begin(conn) as conn:
+        result = conn.execute(
+            text("""
+                SELECT id, user_id, club_id, status, expiry_date
+                FROM memberships
+                WHERE id IN :ids
+                  AND club_id = :club_id
+                FOR UPDATE
+            """).bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids, "club_id": club_id},
+        )
+        memberships = {row.id: row for row in result}
+
+        outcomes = {i: "not_found" for i in ids if i not in memberships}
+        approve = []
+        for membership_id in approve_ids:
+            if membership_id not in memberships:
+                continue
+            if memberships[membership_id].status == "active":
+                outcomes[membership_id] = "unchanged"
+            else:
+                outcomes[membership_id] = "approved"
+                approve.append(membership_id)
+        reject = {i: reason for i, reason in rejections.items() if i in memberships}
+        for membership_id in reject:
+            outcomes[membership_id] = "rejected"
+
+        if approve:
+            conn.execute(
+                text("""
+                    UPDATE memberships
+                    SET status = 'active'
+                    WHERE id IN :ids
+                """).bindparams(bindparam("ids", expanding=True)),
+                {"ids": approve},
+            )
+
+        if reject:
+            params = {}
+            cases = []
+            for i, (membership_id, reason) in enumerate(reject.items()):
+                params[f"m{i}"] = membership_id
+                params[f"r{i}"] = reason
+                cases.append(f"WHEN :m{i} THEN :r{i}")
+            conn.execute(
+                text(f"""
+                    UPDATE memberships
+                    SET status = 'rejected',
+                        rejection_reason = CASE id {" ".join(cases)} END
+                    WHERE id IN :ids
+                """).bindparams(bindparam("ids", expanding=True)),
+                {**params, "ids": list(reject)},
+            )
+
+        changed = [(i, "active") for i in approve] + [(i, "rejected") for i in reject]
+        shift_member_counts(conn, [
+            (
+                club_id,
+                (memberships[i].status, memberships[i].expiry_date),
+                (status, memberships[i].expiry_date),
+            )
+            for i, status in changed
+        ])
+
+    return outcomes, [
+        {
+            "membership_id": i,
+            "user_id": memberships[i].user_id,
+            "club_id": club_id,
+            "status": status,
+        }
+        for i, status in changed
+        if memberships[i].status != status
+    ]
+
+
+def _lock_membership(conn: Connection, membership_id: int):
+    # Locked so the club counters see the status this change replaces
+    return conn.execute(
+        text("""
+            SELECT user_id, club_id, status, expiry_date
+            FROM memberships
+            WHERE id = :id
+            FOR UPDATE
+        """),
+        {"id": membership_id},
+    ).fetchone()
+
+
+def _shift_status(conn: Connection, membership, status: str):
+    shift_member_counts(conn, [(
+        membership.club_id,
+        (membership.status, membership.expiry_date),
+        (status, membership.expiry_date),
+    )])
+
+
+def get_admin_role(user_id: int, club_id: Optional[int], conn: Optional[Connection] = None) -> Optional[str]:
+    """
+    Get the user's admin role ('superadmin' or 'admin') for a club,
+    or for any club when club_id is None. Returns None if the user is not an admin.
+    """
+    # Separate queries so each one can use its own index
+    if club_id is None:
+        query = """
+            SELECT role
+            FROM memberships
+            WHERE user_id = :user_id
+              AND role IN ('admin', 'superadmin')
+            ORDER BY role = 'superadmin' DESC
+            LIMIT 1
+        """
+    else:
+        query = """
+            SELECT role
+            FROM memberships
+            WHERE user_id = :user_id
+              AND club_id = :club_id
+              AND role IN ('admin', 'superadmin')
+            ORDER BY role = 'superadmin' DESC
+            LIMIT 1
+        """
+
+    with connect(conn) as conn:
+        result = conn.execute(
+            text(query),
+            {
+                "user_id": user_id,
+                "club_id": club_id,
+            },
+        ).fetchone()
+
+        return result._mapping["role"] if result else None
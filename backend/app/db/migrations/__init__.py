@@ -0,0 +1,157 @@
+"""
+Versioned schema migrations.
+
+Each migration is a module in this package named v<NNN>_<name>.py with a
+DESCRIPTION string and an upgrade(conn) function. Applied versions are
+recorded in the schema_migrations table; `python -m scripts.migrate`
+applies the pending ones in version order.
+
+MySQL commits DDL implicitly, so a migration that fails halfway can't be
+rolled back. Write each step to be safe to re-run (check before you ALTER)
+so the migration can simply be applied again once the cause is fixed.
+"""
+import importlib
+import pkgutil
+import time
+from typing import Optional
+
+from sqlalchemy import Connection, text
+
+from app.db.session import begin, connect
+
+
+def _ensure_migrations_table(conn: Connection):
+    conn.execute(
+        text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(128) NOT NULL,
+                applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    )
+
+
+def load_migrations() -> list[tuple[int, str, object]]:
+    """
+    (version, name, module) for every migration in the package, by version.
+    """
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        if not info.name.startswith("v"):
+            continue
+        version, _, name = info.name[1:].partition("_")
+        if not version.isdigit():
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        migrations.append((int(version), name, module))
+
+    migrations.sort(key=lambda m: m[0])
+    return migrations
+
+
+def get_applied_versions(conn: Optional[Connection] = None) -> set[int]:
+    with begin(conn) as conn:
+        _ensure_migrations_table(conn)
+        result = conn.execute(text("SELECT version FROM schema_migrations"))
+        return {row._mapping["version"] for row in result}
+
+
+def get_pending_migrations(conn: Optional[Connection] = None) -> list[tuple[int, str, object]]:
+    applied = get_applied_versions(conn)
+    return [m for m in load_migrations() if m[0] not in applied]
+
+
+def apply_migrations(target: Optional[int] = None, log=print) -> list[int]:
+    """
+    Apply pending migrations up to target (all of them by default).
+    Each migration runs on its own connection and is recorded once it
+    completes. Returns the versions applied.
+    """
+    applied = []
+    for version, name, module in get_pending_migrations():
+        if target is not None and version > target:
+            break
+
+        log(f"[MIGRATE] v{version:03d} {name}: {module.DESCRIPTION}")
+        started = time.perf_counter()
+        with begin() as conn:
+            module.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                {"version": version, "name": name},
+            )
+        log(f"[MIGRATE] v{version:03d} done in {time.perf_counter() - started:.1f}s")
+        applied.append(version)
+
+    return applied
+
+
+def column_exists(conn: Connection, table: str, column: str) -> bool:
+    return conn.execute(
+        text("""
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_schema = DATABASE()
+              AND table_name = :table
+              AND column_name = :column
+        """),
+        {"table": table, "column": column},
+    ).fetchone() is not None
+
+
+def index_exists(conn: Connection, table: str, index: str) -> bool:
+    return conn.execute(
+        text("""
+            SELECT 1
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE()
+              AND table_name = :table
+              AND index_name = :index
+            LIMIT 1
+        """),
+        {"table": table, "index": index},
+    ).fetchone() is not None
+
+
+def index_covers(conn: Connection, table: str, columns: list[str]) -> bool:
+    """
+    True if some index on table starts with columns, in that order,
+    so adding another index on them would be redundant.
+    """
+    result = conn.execute(
+        text("""
+            SELECT index_name AS index_name, column_name AS column_name
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE()
+              AND table_name = :table
+            ORDER BY index_name, seq_in_index
+        """),
+        {"table": table},
+    )
+    indexes = {}
+    for row in result:
+        r = row._mapping
+        # column_name is NULL for functional key parts
+        indexes.setdefault(r["index_name"], []).append((r["column_name"] or "").lower())
+
+    wanted = [c.lower() for c in columns]
+    return any(cols[: len(wanted)] == wanted for cols in indexes.values())
+
+
+def check_no_duplicates(conn: Connection, table: str, columns: str):
+    duplicates = conn.execute(
+        text(f"""
+            SELECT COUNT(*) FROM (
+                SELECT 1
+                FROM {table}
+                GROUP BY {columns}
+                HAVING COUNT(*) > 1
+            ) d
+        """)
+    ).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{table} has {duplicates} groups of duplicate rows on ({columns}). "
+            f"Merge or delete them, then run the migration again."
+        )
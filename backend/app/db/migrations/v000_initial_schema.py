@@ -0,0 +1,93 @@
+from sqlalchemy import Connection, text
+
+DESCRIPTION = "baseline tables, as used by the repos"
+
+# Version 0 so it runs first on an empty database. On a database created
+# before migrations existed every statement is a no-op.
+_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        phone_number VARCHAR(15) NOT NULL,
+        full_name VARCHAR(255) NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_users_phone_number (phone_number)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS clubs (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dependents (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        relation VARCHAR(64) NOT NULL,
+        date_of_birth DATE NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_dependents_user FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS memberships (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        club_id INT NOT NULL,
+        dependent_id INT NULL,
+        status ENUM('pending', 'active', 'rejected', 'expired') NOT NULL DEFAULT 'pending',
+        role VARCHAR(32) NOT NULL DEFAULT 'member',
+        rejection_reason TEXT NULL,
+        expiry_date DATE NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_memberships_user FOREIGN KEY (user_id) REFERENCES users (id),
+        CONSTRAINT fk_memberships_club FOREIGN KEY (club_id) REFERENCES clubs (id),
+        CONSTRAINT fk_memberships_dependent FOREIGN KEY (dependent_id) REFERENCES dependents (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        club_id INT NOT NULL,
+        title VARCHAR(255) NOT NULL,
+        description TEXT NULL,
+        event_date DATETIME NOT NULL,
+        location VARCHAR(255) NULL,
+        requires_pass BOOLEAN NOT NULL DEFAULT FALSE,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_events_club FOREIGN KEY (club_id) REFERENCES clubs (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS event_passes (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        event_id INT NOT NULL,
+        user_id INT NOT NULL,
+        dependent_id INT NULL,
+        pass_code VARCHAR(64) NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_event_passes_pass_code (pass_code),
+        CONSTRAINT fk_event_passes_event FOREIGN KEY (event_id) REFERENCES events (id),
+        CONSTRAINT fk_event_passes_user FOREIGN KEY (user_id) REFERENCES users (id),
+        CONSTRAINT fk_event_passes_dependent FOREIGN KEY (dependent_id) REFERENCES dependents (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS announcements (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        club_id INT NOT NULL,
+        title VARCHAR(255) NULL,
+        message TEXT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_announcements_club FOREIGN KEY (club_id) REFERENCES clubs (id)
+    )
+    """,
+]
+
+
+def upgrade(conn: Connection):
+    for ddl in _TABLES:
+        conn.execute(text(ddl))
@@ -0,0 +1,28 @@
+from sqlalchemy import Connection, text
+
+from app.db.migrations import check_no_duplicates, column_exists, index_exists
+
+DESCRIPTION = "dep_key columns and unique indexes for memberships and event passes"
+
+# dep_key is dependent_id with NULL (the account holder) mapped to 0, so one
+# unique index covers self and dependent rows alike. It is VIRTUAL: adding it
+# doesn't rebuild the table, and the unique index stores the values.
+_DEDUPE_KEYS = [
+    ("memberships", "uq_memberships_user_club_dep", "user_id, club_id, dep_key"),
+    ("event_passes", "uq_event_passes_event_user_dep", "event_id, user_id, dep_key"),
+]
+
+
+def upgrade(conn: Connection):
+    for table, index, columns in _DEDUPE_KEYS:
+        if not column_exists(conn, table, "dep_key"):
+            conn.execute(
+                text(f"""
+                    ALTER TABLE {table}
+                    ADD COLUMN dep_key INT AS (IFNULL(dependent_id, 0)) VIRTUAL NOT NULL
+                """)
+            )
+
+        if not index_exists(conn, table, index):
+            check_no_duplicates(conn, table, columns)
+            conn.execute(text(f"ALTER TABLE {table} ADD UNIQUE KEY {index} ({columns})"))
@@ -0,0 +1,34 @@
+from sqlalchemy import Connection, text
+
+from app.db.migrations import index_covers
+
+DESCRIPTION = "indexes for the hot read paths"
+
+# (table, index name, columns, the queries it serves).
+# An index is skipped when an existing one already starts with its columns,
+# e.g. event_passes (event_id, user_id) is the prefix of the v001 unique key.
+_INDEXES = [
+    ("memberships", "idx_memberships_club_status", ["club_id", "status"],
+     "pending members (ORDER BY id comes from the primary key in the index)"),
+    ("memberships", "idx_memberships_user_role", ["user_id", "role"],
+     "get_admin_clubs, get_admin_role, get_clubs_for_user"),
+    ("event_passes", "idx_event_passes_event_user", ["event_id", "user_id"],
+     "get_passes_for_user_event"),
+    ("event_passes", "idx_event_passes_user", ["user_id"],
+     "get_passes_for_user"),
+    ("events", "idx_events_club_date", ["club_id", "event_date"],
+     "get_events_for_club, get_passes_for_club"),
+    ("announcements", "idx_announcements_club_created", ["club_id", "created_at"],
+     "get_announcements_for_club"),
+    ("users", "uq_users_phone_number", ["phone_number"],
+     "login and bulk upload lookups by phone"),
+]
+
+
+def upgrade(conn: Connection):
+    for table, index, columns, _ in _INDEXES:
+        if index_covers(conn, table, columns):
+            continue
+
+        kind = "UNIQUE KEY" if index.startswith("uq_") else "KEY"
+        conn.execute(text(f"ALTER TABLE {table} ADD {kind} {index} ({', '.join(columns)})"))
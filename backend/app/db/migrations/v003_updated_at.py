@@ -0,0 +1,32 @@
+from sqlalchemy import Connection, text
+
+from app.db.migrations import column_exists, index_covers
+
+DESCRIPTION = "updated_at change stamps for member-facing lists"
+
+# MySQL maintains updated_at on every INSERT and UPDATE, whichever code path
+# (API, bulk upload, manual SQL) made the change. Microsecond precision so
+# writes within the same second still move the stamp.
+_TABLES = ["memberships", "events", "event_passes", "announcements"]
+
+# (table, index, columns): per-club change scans read only the index
+_INDEXES = [
+    ("events", "idx_events_club_updated", ["club_id", "updated_at"]),
+    ("announcements", "idx_announcements_club_updated", ["club_id", "updated_at"]),
+]
+
+
+def upgrade(conn: Connection):
+    for table in _TABLES:
+        if not column_exists(conn, table, "updated_at"):
+            conn.execute(
+                text(f"""
+                    ALTER TABLE {table}
+                    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+                        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+                """)
+            )
+
+    for table, index, columns in _INDEXES:
+        if not index_covers(conn, table, columns):
+            conn.execute(text(f"ALTER TABLE {table} ADD KEY {index} ({', '.join(columns)})"))
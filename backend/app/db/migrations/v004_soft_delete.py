@@ -0,0 +1,15 @@
+from sqlalchemy import Connection, text
+
+from app.db.migrations import column_exists
+
+DESCRIPTION = "deleted_at on announcements and events, for sync tombstones"
+
+# Deleting sets deleted_at instead of removing the row, so the delete moves
+# updated_at and reaches clients through the ?since= sync endpoints
+_TABLES = ["announcements", "events"]
+
+
+def upgrade(conn: Connection):
+    for table in _TABLES:
+        if not column_exists(conn, table, "deleted_at"):
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN deleted_at TIMESTAMP(6) NULL"))
@@ -0,0 +1,21 @@
+from sqlalchemy import Connection, text
+
+from app.db.migrations import column_exists, index_covers
+
+DESCRIPTION = "check-in state on event_passes and lookup by (event_id, pass_code)"
+
+# checked_in_at is only ever set while NULL, so a replayed scan is a no-op
+_COLUMNS = [
+    ("checked_in_at", "TIMESTAMP(6) NULL"),
+    ("checked_in_by", "INT NULL"),
+]
+
+
+def upgrade(conn: Connection):
+    for column, definition in _COLUMNS:
+        if not column_exists(conn, "event_passes", column):
+            conn.execute(text(f"ALTER TABLE event_passes ADD COLUMN {column} {definition}"))
+
+    # Scans of codes the check-in index doesn't know yet
+    if not index_covers(conn, "event_passes", ["event_id", "pass_code"]):
+        conn.execute(text("ALTER TABLE event_passes ADD KEY idx_event_passes_event_code (event_id, pass_code)"))
@@ -0,0 +1,26 @@
+from sqlalchemy import Connection, text
+
+from app.db.migrations import check_no_duplicates, column_exists, index_exists
+
+DESCRIPTION = "per-event pass sequence and unique pass codes per event"
+
+# Pass codes are minted from events.pass_seq (app/core/pass_codes.py).
+# Legacy uuid-based codes have a different shape, so serials start at 1
+# without colliding with them. Codes are only unique per event: the
+# v000 table-wide unique key would reject a code another event minted.
+
+
+def upgrade(conn: Connection):
+    if not column_exists(conn, "events", "pass_seq"):
+        conn.execute(text("ALTER TABLE events ADD COLUMN pass_seq INT NOT NULL DEFAULT 0"))
+
+    if not index_exists(conn, "event_passes", "uq_event_passes_event_code"):
+        check_no_duplicates(conn, "event_passes", "event_id, pass_code")
+        conn.execute(text("ALTER TABLE event_passes ADD UNIQUE KEY uq_event_passes_event_code (event_id, pass_code)"))
+
+    # The unique key serves the check-in lookups the v005 index was added for
+    if index_exists(conn, "event_passes", "idx_event_passes_event_code"):
+        conn.execute(text("ALTER TABLE event_passes DROP KEY idx_event_passes_event_code"))
+
+    if index_exists(conn, "event_passes", "uq_event_passes_pass_code"):
+        conn.execute(text("ALTER TABLE event_passes DROP KEY uq_event_passes_pass_code"))
@@ -0,0 +1,47 @@
+from sqlalchemy import Connection, text
+
+from app.db.migrations import column_exists
+
+DESCRIPTION = "event capacity, taken seat counter and FIFO waitlist"
+
+# events.seats_taken counts the event's passes. It lives on the event row
+# next to pass_seq, which every pass already updates, so capping attendance
+# adds no row lock of its own. capacity NULL means unlimited.
+_COLUMNS = [
+    ("capacity", "INT NULL"),
+    ("seats_taken", "INT NOT NULL DEFAULT 0"),
+]
+
+
+def upgrade(conn: Connection):
+    for column, definition in _COLUMNS:
+        if not column_exists(conn, "events", column):
+            conn.execute(text(f"ALTER TABLE events ADD COLUMN {column} {definition}"))
+
+    conn.execute(
+        text("""
+            UPDATE events e
+            SET e.seats_taken = (
+                SELECT COUNT(*) FROM event_passes p WHERE p.event_id = e.id
+            )
+        """)
+    )
+
+    # Promoted in id order when a seat frees up
+    conn.execute(
+        text("""
+            CREATE TABLE IF NOT EXISTS event_waitlist (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                event_id INT NOT NULL,
+                user_id INT NOT NULL,
+                dependent_id INT NULL,
+                dep_key INT AS (IFNULL(dependent_id, 0)) VIRTUAL NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE KEY uq_event_waitlist_event_user_dep (event_id, user_id, dep_key),
+                KEY idx_event_waitlist_event (event_id, id),
+                CONSTRAINT fk_event_waitlist_event FOREIGN KEY (event_id) REFERENCES events (id),
+                CONSTRAINT fk_event_waitlist_user FOREIGN KEY (user_id) REFERENCES users (id),
+                CONSTRAINT fk_event_waitlist_dependent FOREIGN KEY (dependent_id) REFERENCES dependents (id)
+            )
+        """)
+    )
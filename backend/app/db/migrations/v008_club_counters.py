@@ -0,0 +1,43 @@
+from sqlalchemy import Connection, text
+
+DESCRIPTION = "materialized per-club counters for the admin dashboard"
+
+# One row per (club, counter), kept up to date by the membership write paths
+# (app/db/club_stats_repo.py):
+#   members:<status>   memberships of the club in that status
+#   expiry:<YYYY-MM-DD> active memberships expiring that day
+# Passes per event are events.seats_taken (migration v007).
+
+
+def upgrade(conn: Connection):
+    conn.execute(
+        text("""
+            CREATE TABLE IF NOT EXISTS club_counters (
+                club_id INT NOT NULL,
+                counter VARCHAR(32) NOT NULL,
+                value INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (club_id, counter),
+                CONSTRAINT fk_club_counters_club FOREIGN KEY (club_id) REFERENCES clubs (id)
+            )
+        """)
+    )
+
+    conn.execute(text("DELETE FROM club_counters"))
+    conn.execute(
+        text("""
+            INSERT INTO club_counters (club_id, counter, value)
+            SELECT club_id, CONCAT('members:', status), COUNT(*)
+            FROM memberships
+            GROUP BY club_id, status
+        """)
+    )
+    conn.execute(
+        text("""
+            INSERT INTO club_counters (club_id, counter, value)
+            SELECT club_id, CONCAT('expiry:', expiry_date), COUNT(*)
+            FROM memberships
+            WHERE status = 'active'
+              AND expiry_date IS NOT NULL
+            GROUP BY club_id, expiry_date
+        """)
+    )
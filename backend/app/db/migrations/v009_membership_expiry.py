@@ -0,0 +1,31 @@
+from sqlalchemy import Connection, text
+
+from app.db.migrations import index_covers
+
+DESCRIPTION = "expiry sweep index and renewal reminder queue"
+
+
+def upgrade(conn: Connection):
+    # The sweep reads status = 'active' AND expiry_date < today in
+    # (expiry_date, id) order; InnoDB appends the primary key to the index
+    if not index_covers(conn, "memberships", ["status", "expiry_date"]):
+        conn.execute(text("ALTER TABLE memberships ADD KEY idx_memberships_status_expiry (status, expiry_date)"))
+
+    # One reminder per membership and expiry date, so a renewed membership
+    # is reminded again about its new date. Unsent rows are the queue.
+    conn.execute(
+        text("""
+            CREATE TABLE IF NOT EXISTS membership_reminders (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                membership_id INT NOT NULL,
+                user_id INT NOT NULL,
+                club_id INT NOT NULL,
+                expiry_date DATE NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                sent_at DATETIME NULL,
+                UNIQUE KEY uq_membership_reminders_membership_expiry (membership_id, expiry_date),
+                KEY idx_membership_reminders_sent (sent_at, id),
+                CONSTRAINT fk_membership_reminders_membership FOREIGN KEY (membership_id) REFERENCES memberships (id)
+            )
+        """)
+    )
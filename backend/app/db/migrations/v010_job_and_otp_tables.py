@@ -0,0 +1,58 @@
+from sqlalchemy import Connection, text
+
+DESCRIPTION = "bulk upload job tables and the shared OTP store, formerly created on startup"
+
+# Databases that ran the old startup DDL already have these tables;
+# CREATE TABLE IF NOT EXISTS leaves them as they are.
+
+
+def upgrade(conn: Connection):
+    # Resumable bulk upload jobs (app/services/bulk_upload_jobs.py)
+    conn.execute(
+        text("""
+            CREATE TABLE IF NOT EXISTS bulk_upload_jobs (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                club_id INT NOT NULL,
+                created_by INT NOT NULL,
+                status VARCHAR(16) NOT NULL DEFAULT 'queued',
+                file_path VARCHAR(512) NOT NULL,
+                last_row INT NOT NULL DEFAULT 1,
+                rows_processed INT NOT NULL DEFAULT 0,
+                created_count INT NOT NULL DEFAULT 0,
+                skipped_count INT NOT NULL DEFAULT 0,
+                error_count INT NOT NULL DEFAULT 0,
+                owner VARCHAR(128) NULL,
+                last_error TEXT NULL,
+                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                started_at DATETIME NULL,
+                heartbeat_at DATETIME NULL,
+                finished_at DATETIME NULL,
+                KEY idx_bulk_upload_jobs_club (club_id, id),
+                KEY idx_bulk_upload_jobs_status (status, heartbeat_at)
+            )
+        """)
+    )
+    conn.execute(
+        text("""
+            CREATE TABLE IF NOT EXISTS bulk_upload_job_errors (
+                job_id BIGINT NOT NULL,
+                row_num INT NOT NULL,
+                phone VARCHAR(32) NOT NULL,
+                error TEXT NOT NULL,
+                PRIMARY KEY (job_id, row_num)
+            )
+        """)
+    )
+
+    # OTP_STORE=db (app/services/otp_store.py DatabaseOTPStore)
+    conn.execute(
+        text("""
+            CREATE TABLE IF NOT EXISTS otp_codes (
+                phone VARCHAR(15) PRIMARY KEY,
+                otp_hash CHAR(64) NOT NULL,
+                expires_at DOUBLE NOT NULL,
+                attempts INT NOT NULL DEFAULT 0,
+                KEY idx_otp_codes_expires_at (expires_at)
+            )
+        """)
+    )
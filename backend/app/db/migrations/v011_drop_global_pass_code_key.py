@@ -0,0 +1,14 @@
+from sqlalchemy import Connection, text
+
+from app.db.migrations import index_exists
+
+DESCRIPTION = "drop the table-wide pass_code unique key"
+
+# v006 now drops it too; this covers databases that applied v006 before.
+# Pass codes are unique per event (uq_event_passes_event_code), and two
+# events may mint the same code.
+
+
+def upgrade(conn: Connection):
+    if index_exists(conn, "event_passes", "uq_event_passes_pass_code"):
+        conn.execute(text("ALTER TABLE event_passes DROP KEY uq_event_passes_pass_code"))
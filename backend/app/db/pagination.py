@@ -0,0 +1,46 @@
+import base64
+import json
+from typing import Optional
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Opaque cursor for the sort key of the last row on a page.
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """
+    Decode a cursor made by encode_cursor. Raises ValueError if it isn't
+    one, or doesn't hold size sort key values.
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def clamp_page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def build_page(rows: list, limit: int, sort_key) -> dict:
+    """
+    Turn limit + 1 fetched rows into a page. next_cursor is None on the last page.
+    """
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(sort_key(items[-1])) if has_more else None,
+    }
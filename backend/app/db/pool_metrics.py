@@ -0,0 +1,106 @@
+import os
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import Counter, Histogram
+
+# Set while a checkout is inside _do_get. A ContextVar rather than a
+# thread-local: async checkouts share the event loop thread, each in its own greenlet.
+_in_get = ContextVar("pool_in_get", default=False)
+
+
+class CheckoutTimings:
+    """
+    Checkout counters and timings of one pool class. Kept on the class so the
+    numbers survive engine.dispose() / pool.recreate().
+    """
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.wait = Histogram()
+        self.checkouts = Counter()
+        self.timeouts = Counter()
+
+
+class _InstrumentedPool:
+    """
+    Records checkout timings on the pool class's CheckoutTimings.
+
+    - wait: time spent getting a connection out of the pool, including
+      blocking on a full pool and opening a new connection
+    - latency: full checkout as seen by the caller, wait plus pre-ping
+    """
+
+    timings: CheckoutTimings
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.timings.latency.observe((time.perf_counter() - started) * 1000)
+            self.timings.checkouts.inc()
+
+    def _do_get(self):
+        # QueuePool._do_get calls itself while waiting for overflow, time the outer call only
+        if _in_get.get():
+            return super()._do_get()
+
+        token = _in_get.set(True)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timings.timeouts.inc()
+            raise
+        finally:
+            _in_get.reset(token)
+            self.timings.wait.observe((time.perf_counter() - started) * 1000)
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    timings = CheckoutTimings()
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    """
+    The async engine's pool (DB_ASYNC), timed separately from the sync one.
+    """
+
+    timings = CheckoutTimings()
+
+
+def get_pool_metrics(engine) -> dict:
+    """
+    Pool state and checkout timings for this worker process.
+    Takes a sync Engine or an AsyncEngine.
+    """
+    pool = getattr(engine, "sync_engine", engine).pool
+    metrics = {
+        "pid": os.getpid(),
+        "pool_class": type(pool).__name__,
+    }
+
+    timings = getattr(pool, "timings", None)
+    if timings is not None:
+        metrics.update({
+            "checkouts": timings.checkouts.value,
+            "checkout_timeouts": timings.timeouts.value,
+            "checkout_wait": timings.wait.snapshot(),
+            "checkout_latency": timings.latency.snapshot(),
+        })
+
+    if isinstance(pool, QueuePool):
+        metrics.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+
+    return metrics
@@ -0,0 +1,61 @@
+import os
+from typing import Optional
+
+from app.db.pagination import encode_cursor
+
+# Rows written in the last SYNC_SETTLE_SECONDS are held back from sync pages.
+# updated_at is set when a statement runs but the row becomes visible at
+# commit, so a transaction committing late could otherwise land behind a
+# cursor that a client already moved past, and never be synced.
+SYNC_SETTLE_SECONDS = int(os.getenv("SYNC_SETTLE_SECONDS", "2"))
+
+
+def changes_filter(alias: str, after: Optional[list]) -> tuple[str, dict]:
+    """
+    WHERE fragment and params for rows changed after the (updated_at, id)
+    key in after. Without after (first sync) only live rows are returned.
+    """
+    params = {"settle_seconds": SYNC_SETTLE_SECONDS}
+    clause = f"""
+                  AND {alias}.updated_at < NOW(6) - INTERVAL :settle_seconds SECOND"""
+    if after is None:
+        clause += f"""
+                  AND {alias}.deleted_at IS NULL"""
+    else:
+        clause += f"""
+                  AND (
+                    {alias}.updated_at > :after_updated_at
+                    OR ({alias}.updated_at = :after_updated_at AND {alias}.id > :after_id)
+                  )"""
+        params.update({"after_updated_at": after[0], "after_id": after[1]})
+    return clause, params
+
+
+def build_changes(rows: list[dict], limit: int, since: Optional[str]) -> dict:
+    """
+    Turn limit + 1 rows ordered by (updated_at, id) into a sync page:
+    changed rows, ids of deleted rows, and the cursor to send as ?since=
+    next time. The cursor is returned even on the last page; has_more
+    tells the client to fetch again straight away.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    changes = []
+    deleted = []
+    for r in rows:
+        if r["deleted_at"] is not None:
+            deleted.append(r["id"])
+        else:
+            changes.append({k: v for k, v in r.items() if k != "deleted_at"})
+
+    cursor = since
+    if rows:
+        cursor = encode_cursor([rows[-1]["updated_at"], rows[-1]["id"]])
+
+    return {
+        "changes": changes,
+        "deleted": deleted,
+        "cursor": cursor,
+        "has_more": has_more,
+    }
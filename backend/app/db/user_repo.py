@@ -1,10 +1,10 @@
 from typing import Optional
-from sqlalchemy import text
-from app.db.session import engine
+from sqlalchemy import Connection, text
+from app.db.session import begin, connect
 
 
-def get_user_by_phone(phone: str):
-    with engine.connect() as conn:
+def get_user_by_phone(phone: str, conn: Optional[Connection] = None):
+    with connect(conn) as conn:
         result = conn.execute(
             text("SELECT id, phone_number, full_name FROM users WHERE phone_number = :phone"),
             {"phone": phone},
@@ -12,11 +12,11 @@ def get_user_by_phone(phone: str):
         return result.fetchone()
 
 
-def update_user_name_if_null(user_id: int, name: str):
+def update_user_name_if_null(user_id: int, name: str, conn: Optional[Connection] = None):
     """
     Update user name only if it is currently null.
     """
-    with engine.begin() as conn:
+    with begin(conn) as conn:
         conn.execute(
             text("""
                 UPDATE users
@@ -31,11 +31,11 @@ def update_user_name_if_null(user_id: int, name: str):
         )
 
 
-def create_user(phone: str, name: Optional[str] = None):
+def create_user(phone: str, name: Optional[str] = None, conn: Optional[Connection] = None):
     """
     Create a new user. Optionally set name if provided.
     """
-    with engine.begin() as conn:
+    with begin(conn) as conn:
         if name:
             result = conn.execute(
                 text(
@@ -1,7 +1,10 @@
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
 from app.db.session import engine
+from app.db.async_session import async_engine
 from sqlalchemy import text
+from app.core.rate_limit import RateLimitMiddleware
 from app.routers import auth
 from app.routers import clubs
 from app.routers import announcements
@@ -13,6 +16,12 @@ from app.routers import event_passes
 from app.routers import admin_club_members
 from app.routers import admin_clubs
 from app.routers import admin_bulk_upload
+from app.routers import admin_check_in
+from app.routers import metrics
+from app.routers import stream
+from app.db.migrations import get_pending_migrations
+from app.services.bulk_upload_jobs import start_bulk_upload_job_monitor, stop_bulk_upload_job_monitor
+from app.services.membership_expiry import start_expiry_scheduler, stop_expiry_scheduler
 from dotenv import load_dotenv
 import os
 load_dotenv()
@@ -20,7 +29,34 @@ print(os.getenv("TEST_OTP_MODE"))
 print(os.getenv("TEST_OTP_CODE"))
 
 
-app = FastAPI(title="Club Vision API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Migrations are applied by `python -m scripts.migrate`, not on startup
+    try:
+        pending = get_pending_migrations()
+        if pending:
+            versions = ", ".join(f"v{version:03d}" for version, _, _ in pending)
+            print(f"[STARTUP] Pending schema migrations: {versions}. Run python -m scripts.migrate")
+    except Exception as e:
+        print(f"[STARTUP] Could not check schema migrations: {e}")
+    # Picks up bulk upload jobs left unfinished by a stopped worker, now and
+    # periodically, and renews the leases of the jobs this worker runs
+    start_bulk_upload_job_monitor()
+    # Off unless MEMBERSHIP_EXPIRY_INTERVAL_SECONDS is set
+    start_expiry_scheduler()
+    yield
+    stop_expiry_scheduler()
+    stop_bulk_upload_job_monitor()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(title="Club Vision API", lifespan=lifespan)
+
+app.add_middleware(
+    RateLimitMiddleware,
+    rules={("POST", "/auth/request-otp"): auth.otp_ip_limiter},
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -50,4 +86,7 @@ app.include_router(events.router)
 app.include_router(event_passes.router)
 app.include_router(admin_club_members.router)
 app.include_router(admin_clubs.router)
-app.include_router(admin_bulk_upload.router)
\ No newline at end of file
+app.include_router(admin_bulk_upload.router)
+app.include_router(admin_check_in.router)
+app.include_router(metrics.router)
+app.include_router(stream.router)
\ No newline at end of file
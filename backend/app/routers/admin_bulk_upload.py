@@ -1,6 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from app.auth.admin_dependencies import get_club_admin
-from app.db.bulk_upload_repo import process_bulk_upload
+from app.db.async_session import RequestDB, request_db, run_db
+from starlette.concurrency import run_in_threadpool
+from app.db.bulk_upload_repo import process_bulk_upload_file
+from app.db.bulk_upload_job_repo import get_bulk_upload_job
+from app.services.bulk_upload_jobs import submit_bulk_upload_job
 
 router = APIRouter(prefix="/admin", tags=["Admin Bulk Upload"])
 
@@ -9,7 +13,9 @@ router = APIRouter(prefix="/admin", tags=["Admin Bulk Upload"])
 async def bulk_upload_members(
     club_id: int,
     file: UploadFile = File(...),
+    background: bool = False,
     admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
 ):
     """
     Bulk upload members for a club via CSV file.
@@ -23,6 +29,12 @@ async def bulk_upload_members(
     Creates users, dependents, and memberships with status='active'.
     For SELF rows: Updates user name if provided and user.name is null.
     Skips duplicates safely.
+    
+    With ?background=true the file is queued as a job and the response is
+    {"job_id": ...} right away. Poll GET /admin/clubs/{club_id}/bulk-upload/{job_id}.
+    
+    Rows are committed chunk by chunk, so a decode error part way through
+    the file leaves earlier chunks in place.
     """
     # Validate file type
     if not file.filename.endswith('.csv'):
@@ -31,24 +43,53 @@ async def bulk_upload_members(
             detail="File must be a CSV file"
         )
     
-    # Read file content
+    # The import commits chunk by chunk on its own connections,
+    # don't hold the request connection from the admin check meanwhile
+    await db.release()
+
+    if background:
+        await file.seek(0)
+        job_id = await run_in_threadpool(
+            submit_bulk_upload_job,
+            club_id=club_id,
+            admin_user_id=admin_user_id,
+            binary_file=file.file,
+        )
+        return {"job_id": job_id, "status": "queued"}
+
+    # Stream the upload on a worker thread so the event loop keeps serving
+    # other requests. The file is decoded incrementally and processed in chunks.
     try:
-        content = await file.read()
-        # Decode with UTF-8, handling BOM if present
-        csv_content = content.decode('utf-8-sig')  # utf-8-sig automatically strips BOM
-    except Exception as e:
+        await file.seek(0)
+        result = await run_in_threadpool(
+            process_bulk_upload_file,
+            club_id=club_id,
+            binary_file=file.file,
+        )
+        return result
+    except UnicodeDecodeError as e:
         raise HTTPException(
             status_code=400,
             detail=f"Failed to read file: {str(e)}"
         )
-    
-    # Process bulk upload
-    try:
-        result = process_bulk_upload(club_id=club_id, csv_content=csv_content)
-        return result
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to process bulk upload: {str(e)}"
         )
 
+
+@router.get("/clubs/{club_id}/bulk-upload/{job_id}")
+async def get_bulk_upload_job_status(
+    club_id: int,
+    job_id: int,
+    admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
+):
+    """
+    Progress of a background bulk upload: rows processed, throughput and errors so far.
+    """
+    job = await run_db(get_bulk_upload_job, club_id=club_id, job_id=job_id, db=db)
+    if not job:
+        raise HTTPException(status_code=404, detail="Bulk upload job not found")
+    return job
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.auth.admin_dependencies import get_event_admin
+from app.services.check_in import CHECK_IN_MAX_BATCH, check_in_passes
+
+router = APIRouter(prefix="/admin")
+
+
+@router.post("/events/{event_id}/check-in")
+async def check_in(
+    event_id: int,
+    payload: dict,
+    admin_user_id: int = Depends(get_event_admin),
+):
+    """
+    Check in one scanned pass. Scanning the same pass again is safe and
+    answers "already_checked_in" with the original time.
+    """
+    pass_code = payload.get("pass_code")
+    if not isinstance(pass_code, str) or not pass_code.strip():
+        raise HTTPException(status_code=400, detail="pass_code is required")
+
+    results = await check_in_passes(event_id, [pass_code], admin_user_id)
+    return results[0]
+
+
+@router.post("/events/{event_id}/check-in/batch")
+async def check_in_batch(
+    event_id: int,
+    payload: dict,
+    admin_user_id: int = Depends(get_event_admin),
+):
+    """
+    Upload of scans collected offline: one result per code, in order.
+    """
+    pass_codes = payload.get("pass_codes")
+    if not isinstance(pass_codes, list) or not all(isinstance(c, str) for c in pass_codes):
+        raise HTTPException(status_code=400, detail="pass_codes must be a list of strings")
+    if len(pass_codes) > CHECK_IN_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {CHECK_IN_MAX_BATCH} pass codes per batch")
+
+    return {"results": await check_in_passes(event_id, pass_codes, admin_user_id)}
@@ -1,14 +1,65 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.core.auth import get_current_user_id
 from app.auth.admin_dependencies import get_club_admin
-from app.db.admin_members_repo import get_all_members_for_club
+from app.db.async_session import RequestDB, request_db, run_db
+from app.core.export import export_response
+from app.db.admin_members_repo import get_all_members_for_club, iter_members_for_club
+from app.db.pagination import DEFAULT_PAGE_SIZE, build_page, clamp_page_size, decode_cursor
 
 router = APIRouter(prefix="/admin", tags=["Admin Members"])
 
 
 @router.get("/clubs/{club_id}/members")
-def list_club_members(
+async def list_club_members(
     club_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    all_rows: bool = Query(False, alias="all"),
     admin_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
 ):
-    return get_all_members_for_club(club_id)
+    """
+    Club members ordered by phone, one page at a time.
+    ?all=true returns the full list without paging.
+    """
+    if all_rows:
+        return await run_db(get_all_members_for_club, club_id, db=db)
+
+    try:
+        after = decode_cursor(cursor, 2)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    limit = clamp_page_size(limit)
+    rows = await run_db(get_all_members_for_club, club_id, limit=limit, after=after, db=db)
+    return build_page(rows, limit, lambda r: [r["phone"], r["membership_id"]])
+
+
+MEMBER_EXPORT_FIELDS = [
+    "membership_id",
+    "phone",
+    "member_type",
+    "name",
+    "relation",
+    "status",
+    "rejection_reason",
+]
+
+
+@router.get("/clubs/{club_id}/members/export")
+async def export_club_members(
+    club_id: int,
+    export_format: str = Query("csv", alias="format"),
+    admin_id: int = Depends(get_club_admin),
+):
+    """
+    Every member of the club as a CSV or NDJSON download, streamed from
+    the database as it is read.
+    """
+    return export_response(
+        iter_members_for_club(club_id),
+        MEMBER_EXPORT_FIELDS,
+        export_format,
+        f"club-{club_id}-members",
+    )
@@ -1,16 +1,33 @@
-from fastapi import APIRouter, Depends
-from app.auth.admin_dependencies import get_admin_user
+from fastapi import APIRouter, Depends, Query
+from app.auth.admin_dependencies import get_admin_user, get_club_admin
+from app.db.async_session import RequestDB, request_db, run_db
+from app.db.club_stats_repo import get_club_stats
 from app.db.membership_repo import get_admin_clubs
 
 router = APIRouter(prefix="/admin", tags=["Admin Clubs"])
 
 
 @router.get("/my-clubs")
-def get_my_clubs(
+async def get_my_clubs(
     admin_user_id: int = Depends(get_admin_user),
+    db: RequestDB = request_db,
 ):
     """
     Get clubs where the authenticated admin user has admin or superadmin role.
     """
-    return get_admin_clubs(admin_user_id)
+    return await run_db(get_admin_clubs, admin_user_id, db=db)
 
+
+@router.get("/clubs/{club_id}/stats")
+async def get_club_dashboard_stats(
+    club_id: int,
+    expiring_days: int = Query(30, ge=0, le=366),
+    admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
+):
+    """
+    Dashboard counts for a club: members by status, active members whose
+    membership expires within expiring_days, and passes per event. Served
+    from the club_counters table rather than counting member lists.
+    """
+    return await run_db(get_club_stats, club_id, expiring_days, db=db)
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
 from typing import Optional
 from app.auth.admin_dependencies import get_club_admin
-from app.db.event_repo import create_event
+from app.db.async_session import RequestDB, request_db, run_db
+from app.db.event_repo import create_event, delete_event
+from app.services.catalog_cache import invalidate_club_events
 
 router = APIRouter(prefix="/admin")
 
@@ -13,21 +15,41 @@ class CreateEventRequest(BaseModel):
     event_date: str  # ISO string
     location: Optional[str] = None
     requires_pass: bool = True
+    capacity: Optional[int] = Field(None, ge=1)  # None for unlimited
 
 
 @router.post("/clubs/{club_id}/events")
-def create_club_event(
+async def create_club_event(
     club_id: int,
     payload: CreateEventRequest,
     admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
 ):
-    create_event(
+    await run_db(
+        create_event,
         club_id=club_id,
         title=payload.title,
         description=payload.description,
         event_date=payload.event_date,
         location=payload.location,
         requires_pass=payload.requires_pass,
+        capacity=payload.capacity,
+        db=db,
     )
+    db.after_commit(invalidate_club_events, club_id)
+
+    return {"status": "ok"}
+
+
+@router.delete("/clubs/{club_id}/events/{event_id}")
+async def delete_club_event(
+    club_id: int,
+    event_id: int,
+    admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
+):
+    if not await run_db(delete_event, club_id, event_id, db=db):
+        raise HTTPException(status_code=404, detail="Event not found")
+    db.after_commit(invalidate_club_events, club_id)
 
     return {"status": "ok"}
@@ -1,84 +1,144 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import text
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.auth.admin_dependencies import get_admin_user, get_club_admin
-from app.db.session import engine
+from app.auth.role_cache import invalidate_admin_roles
+from app.db.async_session import RequestDB, request_db, run_db
+from app.db.membership_repo import (
+    approve_membership,
+    decide_memberships,
+    get_pending_members_for_club,
+    reject_membership,
+)
+from app.db.pagination import DEFAULT_PAGE_SIZE, build_page, clamp_page_size, decode_cursor
+from app.services.push_notifications import publish_membership_status
 
 router = APIRouter(prefix="/admin")
 
+# Decisions per POST /admin/clubs/{club_id}/memberships/bulk-decision
+MAX_BULK_DECISIONS = 1000
+
 
 @router.get("/clubs/{club_id}/pending-members")
-def get_pending_members(
+async def get_pending_members(
     club_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    all_rows: bool = Query(False, alias="all"),
     admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
 ):
-    with engine.connect() as conn:
-        result = conn.execute(
-            text(
-                """
-                SELECT
-                    m.id AS membership_id,
-                    u.phone_number AS phone,
-                    d.name AS dependent_name,
-                    d.relation AS relation
-                FROM memberships m
-                JOIN users u ON u.id = m.user_id
-                LEFT JOIN dependents d ON d.id = m.dependent_id
-                WHERE m.club_id = :club_id
-                  AND m.status = 'pending'
-                """
-            ),
-            {"club_id": club_id},
-        )
-
-        return [dict(row._mapping) for row in result]
+    """
+    Pending members, oldest request first, one page at a time.
+    ?all=true returns the full list without paging.
+    """
+    if all_rows:
+        return await run_db(get_pending_members_for_club, club_id, db=db)
+
+    try:
+        after = decode_cursor(cursor, 1)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    limit = clamp_page_size(limit)
+    rows = await run_db(get_pending_members_for_club, club_id, limit=limit, after=after, db=db)
+    return build_page(rows, limit, lambda r: [r["membership_id"]])
 
 
 @router.post("/memberships/{membership_id}/approve")
-def approve_member(
+async def approve_member(
     membership_id: int,
     admin_user_id: int = Depends(get_admin_user),
+    db: RequestDB = request_db,
 ):
-    with engine.begin() as conn:
-        conn.execute(
-            text(
-                """
-                UPDATE memberships
-                SET status = 'active'
-                WHERE id = :id
-                """
-            ),
-            {"id": membership_id},
-        )
+    membership = await run_db(approve_membership, membership_id, db=db)
+    if membership:
+        db.after_commit(invalidate_admin_roles, **membership)
+        db.after_commit(publish_membership_status, membership["user_id"], membership["club_id"], membership_id, "active")
 
     return {"success": True}
 
 @router.post("/memberships/{membership_id}/reject")
-def reject_member(
+async def reject_member(
     membership_id: int,
     payload: dict,
     admin_user_id: int = Depends(get_admin_user),
+    db: RequestDB = request_db,
 ):
     reason = payload.get("reason")
 
     if not reason:
         return {"error": "Rejection reason is required"}
 
-    with engine.begin() as conn:
-        conn.execute(
-            text(
-                """
-                UPDATE memberships
-                SET status = 'rejected',
-                    rejection_reason = :reason
-                WHERE id = :id
-                """
-            ),
-            {
-                "id": membership_id,
-                "reason": reason,
-            },
-        )
+    membership = await run_db(reject_membership, membership_id, reason, db=db)
+    if membership:
+        db.after_commit(invalidate_admin_roles, **membership)
+        db.after_commit(publish_membership_status, membership["user_id"], membership["club_id"], membership_id, "rejected")
 
     return {"success": True}
 
+
+def _parse_decisions(payload: dict) -> tuple[list[int], dict[int, str]]:
+    decisions = payload.get("decisions")
+    if not isinstance(decisions, list) or not decisions:
+        raise ValueError("decisions must be a non-empty list")
+    if len(decisions) > MAX_BULK_DECISIONS:
+        raise ValueError(f"At most {MAX_BULK_DECISIONS} decisions per request")
+
+    approve_ids = []
+    rejections = {}
+    seen = set()
+    for item in decisions:
+        if not isinstance(item, dict) or type(item.get("membership_id")) is not int:
+            raise ValueError("Each decision needs an integer membership_id")
+        membership_id = item["membership_id"]
+        if membership_id in seen:
+            raise ValueError(f"Membership {membership_id} appears more than once")
+        seen.add(membership_id)
+
+        decision = item.get("decision")
+        if decision == "approve":
+            approve_ids.append(membership_id)
+        elif decision == "reject":
+            reason = item.get("reason")
+            if not isinstance(reason, str) or not reason.strip():
+                raise ValueError(f"Rejection reason is required (membership {membership_id})")
+            rejections[membership_id] = reason.strip()
+        else:
+            raise ValueError("decision must be 'approve' or 'reject'")
+    return approve_ids, rejections
+
+
+@router.post("/clubs/{club_id}/memberships/bulk-decision")
+async def bulk_decide_members(
+    club_id: int,
+    payload: dict,
+    admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
+):
+    """
+    Approve or reject many memberships of the club at once.
+    Payload: {"decisions": [{"membership_id", "decision": "approve" | "reject", "reason"}]},
+    a reason being required for rejections. Returns an outcome per id, in
+    order: "approved", "rejected", "unchanged" or "not_found" (no such
+    membership in this club).
+    """
+    try:
+        approve_ids, rejections = _parse_decisions(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    outcomes, changed = await run_db(decide_memberships, club_id, approve_ids, rejections, db=db)
+    for m in changed:
+        db.after_commit(invalidate_admin_roles, user_id=m["user_id"], club_id=club_id)
+        db.after_commit(publish_membership_status, m["user_id"], club_id, m["membership_id"], m["status"])
+
+    results = [
+        {"membership_id": item["membership_id"], "outcome": outcomes[item["membership_id"]]}
+        for item in payload["decisions"]
+    ]
+    summary = {}
+    for result in results:
+        summary[result["outcome"]] = summary.get(result["outcome"], 0) + 1
+    return {"results": results, "summary": summary}
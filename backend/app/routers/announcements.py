@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import text
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
 
 from app.core.auth import get_current_user_id
+from app.core.conditional import conditional_response, make_etag
 from app.auth.admin_dependencies import get_admin_user, get_club_admin
-from app.db.session import engine
-from app.db.announcement_repo import get_announcements_for_club
+from app.db.async_session import RequestDB, request_db, run_db
+from app.db.announcement_repo import create_announcement as insert_announcement
+from app.db.announcement_repo import delete_announcement as soft_delete_announcement
+from app.db.announcement_repo import get_announcement_changes
+from app.db.announcement_repo import get_announcements_for_club, get_announcements_version
+from app.db.pagination import DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor
+from app.db.sync import build_changes
+from app.services.push_notifications import publish_announcement
 
 router = APIRouter()
 
@@ -13,36 +21,79 @@ router = APIRouter()
 # MEMBER: Read announcements
 # ------------------------
 @router.get("/clubs/{club_id}/announcements")
-def club_announcements(
+async def club_announcements(
+    club_id: int,
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
+):
+    version = await run_db(get_announcements_version, club_id, db=db)
+    return await conditional_response(
+        request,
+        make_etag("announcements", club_id, version["count"], version["updated_at"]),
+        lambda: run_db(get_announcements_for_club, club_id, db=db),
+        last_modified=version["updated_at"],
+    )
+
+
+@router.get("/clubs/{club_id}/announcements/sync")
+async def sync_club_announcements(
     club_id: int,
+    since: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
     user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
 ):
-    return get_announcements_for_club(club_id)
+    """
+    Announcements changed since the cursor from the previous sync, plus ids
+    of deleted ones. Without since, every live announcement. Keep the
+    returned cursor for next time; fetch again while has_more is true.
+    """
+    try:
+        after = decode_cursor(since, 2)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    limit = clamp_page_size(limit)
+    rows = await run_db(get_announcement_changes, club_id, after, limit, db=db)
+    return build_changes(rows, limit, since)
 
 
 # ------------------------
 # ADMIN: Create announcement
 # ------------------------
 @router.post("/clubs/{club_id}/announcements")
-def create_announcement(
+async def create_announcement(
     club_id: int,
     payload: dict,
     admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
 ):
-    with engine.begin() as conn:
-        conn.execute(
-            text(
-                """
-                INSERT INTO announcements (club_id, title, message)
-                VALUES (:club_id, :title, :message)
-                """
-            ),
-            {
-                "club_id": club_id,
-                "title": payload.get("title"),
-                "message": payload.get("message"),
-            },
-        )
+    title = payload.get("title")
+    message = payload.get("message")
+    announcement_id = await run_db(
+        insert_announcement,
+        club_id=club_id,
+        title=title,
+        message=message,
+        db=db,
+    )
+    db.after_commit(publish_announcement, club_id, announcement_id, title, message)
 
     return {"success": True}
 
+
+# ------------------------
+# ADMIN: Delete announcement
+# ------------------------
+@router.delete("/clubs/{club_id}/announcements/{announcement_id}")
+async def delete_announcement(
+    club_id: int,
+    announcement_id: int,
+    admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
+):
+    if not await run_db(soft_delete_announcement, club_id, announcement_id, db=db):
+        raise HTTPException(status_code=404, detail="Announcement not found")
+
+    return {"success": True}
@@ -1,13 +1,44 @@
 import os
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.core.auth import get_token_claims
+from app.core.tokens import issue_token
+from app.core.metrics import Counter
+from app.core.rate_limit import TokenBucketLimiter, too_many_requests
 from app.schemas.auth import OTPRequest
-from app.services.otp_service import generate_otp
+from app.services.otp_service import OTP_EXPIRY_SECONDS, generate_otp, get_resend_wait
 from app.schemas.auth import OTPVerifyRequest
 from app.services.otp_service import verify_otp
 from app.db.user_repo import get_user_by_phone, create_user
+from app.db.membership_repo import get_admin_clubs
+from app.db.async_session import RequestDB, request_db, run_db
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Per client IP, applied by RateLimitMiddleware in main.py
+otp_ip_limiter = TokenBucketLimiter(
+    "otp_ip",
+    capacity=int(os.getenv("OTP_IP_BURST", "20")),
+    refill_per_second=int(os.getenv("OTP_IP_PER_MINUTE", "20")) / 60,
+)
+
+# Per phone number, applied in request_otp once coalescing is ruled out
+otp_phone_limiter = TokenBucketLimiter(
+    "otp_phone",
+    capacity=int(os.getenv("OTP_PHONE_BURST", "3")),
+    refill_per_second=int(os.getenv("OTP_PHONE_PER_MINUTE", "1")) / 60,
+)
+
+otp_requests_coalesced = Counter()
+
+
+def get_otp_rate_limit_stats() -> dict:
+    return {
+        "ip": otp_ip_limiter.stats(),
+        "phone": otp_phone_limiter.stats(),
+        "coalesced": otp_requests_coalesced.value,
+    }
+
 
 def _get_test_otp_mode() -> bool:
     """TEMPORARY: Beta test OTP bypass - remove after beta period"""
@@ -26,14 +57,33 @@ def request_otp(payload: OTPRequest):
     if not phone.isdigit():
         raise HTTPException(status_code=400, detail="Invalid phone number")
 
+    # Repeat taps and retries inside the resend window get the outstanding code
+    resend_wait = get_resend_wait(phone)
+    if resend_wait:
+        otp_requests_coalesced.inc()
+        resend_after, expires_in = resend_wait
+        return {
+            "message": "OTP already sent",
+            "resend_after": resend_after,
+            "expires_in": expires_in,
+        }
+
+    retry_after = otp_phone_limiter.acquire(phone)
+    if retry_after:
+        return too_many_requests(retry_after, "Too many OTP requests for this phone number")
+
     generate_otp(phone)
 
     return {
-        "message": "OTP sent successfully"
+        "message": "OTP sent successfully",
+        "expires_in": OTP_EXPIRY_SECONDS,
     }
 
 @router.post("/verify-otp")
-def verify_otp_and_login(payload: OTPVerifyRequest):
+async def verify_otp_and_login(
+    payload: OTPVerifyRequest,
+    db: RequestDB = request_db,
+):
     phone = payload.phone.strip()
     otp = payload.otp.strip()
 
@@ -46,22 +96,46 @@ def verify_otp_and_login(payload: OTPVerifyRequest):
         otp_valid = True
     else:
         # Normal OTP verification flow
-        otp_valid = verify_otp(phone, otp)
+        otp_valid = await run_in_threadpool(verify_otp, phone, otp)
 
     if not otp_valid:
         raise HTTPException(status_code=400, detail="Invalid or expired OTP")
 
-    user = get_user_by_phone(phone)
+    user = await run_db(get_user_by_phone, phone, db=db)
 
     if user:
         user_id = user.id
     else:
-        user_id = create_user(phone)
-
-    # TEMP auth token (we’ll replace with JWT later)
-    token = f"user-{user_id}"
+        user_id = await run_db(create_user, phone, db=db)
+
+    return await _issue_token_response(user_id, db)
+
+
+@router.post("/refresh")
+async def refresh_token(
+    claims: dict = Depends(get_token_claims),
+    db: RequestDB = request_db,
+):
+    """
+    Issue a new token with admin roles re-read from memberships.
+    Clients call this after a role change. Legacy "user-{id}" tokens prove
+    nothing about the caller, so they can't be swapped for a signed token;
+    those clients have to log in again.
+    """
+    if claims.get("legacy"):
+        raise HTTPException(status_code=401, detail="Legacy tokens can't be refreshed, log in again")
+    return await _issue_token_response(claims["sub"], db)
+
+
+async def _issue_token_response(user_id: int, db: RequestDB) -> dict:
+    admin_clubs = await run_db(get_admin_clubs, user_id, db=db)
+    token, expires_at = issue_token(
+        user_id,
+        [club["club_id"] for club in admin_clubs],
+    )
 
     return {
         "token": token,
-        "user_id": user_id
+        "user_id": user_id,
+        "expires_at": expires_at,
     }
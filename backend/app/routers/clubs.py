@@ -1,31 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import Optional
 from app.core.auth import get_current_user_id
-from app.db.membership_repo import get_clubs_for_user, request_membership, request_memberships_batch, get_all_clubs
+from app.core.conditional import conditional_response, make_etag
+from app.db.async_session import RequestDB, request_db, run_db
+from app.db.membership_repo import get_clubs_for_user, get_user_clubs_version, request_membership, request_memberships_batch
+from app.services.catalog_cache import get_all_clubs_cached
 
 router = APIRouter(prefix="/me", tags=["me"])
 
 
 @router.get("/clubs")
-def my_clubs(user_id: int = Depends(get_current_user_id)):
-    clubs = get_clubs_for_user(user_id)
-    return clubs
+async def my_clubs(
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
+):
+    version = await run_db(get_user_clubs_version, user_id, db=db)
+    return await conditional_response(
+        request,
+        make_etag("me/clubs", user_id, version["count"], version["updated_at"]),
+        lambda: run_db(get_clubs_for_user, user_id, db=db),
+        last_modified=version["updated_at"],
+    )
 
 
 @router.get("/clubs/all")
-def all_clubs(user_id: int = Depends(get_current_user_id)):
+async def all_clubs(
+    user_id: int = Depends(get_current_user_id),
+):
     """
     Get all clubs in the system.
     Returns clubs the user can browse and request membership for.
     """
-    return get_all_clubs()
+    return await get_all_clubs_cached()
 
 
 @router.post("/clubs/{club_id}/request-membership")
-def request_club_membership(
+async def request_club_membership(
     club_id: int,
     payload: dict,
     user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
 ):
     """
     Request membership for a club.
@@ -65,10 +80,12 @@ def request_club_membership(
                 detail="At least one member must be selected"
             )
         
-        return request_memberships_batch(
+        return await run_db(
+            request_memberships_batch,
             user_id=user_id,
             club_id=club_id,
             dependent_ids=dependent_ids,
+            db=db,
         )
     
     # Legacy single-member format (backward compatibility)
@@ -84,10 +101,12 @@ def request_club_membership(
             )
     
     try:
-        return request_membership(
+        return await run_db(
+            request_membership,
             user_id=user_id,
             club_id=club_id,
             dependent_id=dependent_id,
+            db=db,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
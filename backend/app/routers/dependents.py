@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import Optional
 
 from app.core.auth import get_current_user_id
+from app.db.async_session import RequestDB, request_db, run_db
 from app.db.dependents_repo import create_dependent, get_dependents_for_user
 
 router = APIRouter()
@@ -15,21 +16,25 @@ class DependentCreateRequest(BaseModel):
 
 
 @router.get("/me/dependents")
-def list_dependents(
+async def list_dependents(
     user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
 ):
-    return get_dependents_for_user(user_id)
+    return await run_db(get_dependents_for_user, user_id, db=db)
 
 
 @router.post("/me/dependents")
-def add_dependent(
+async def add_dependent(
     payload: DependentCreateRequest,
     user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
 ):
-    create_dependent(
+    await run_db(
+        create_dependent,
         user_id=user_id,
         name=payload.name,
         relation=payload.relation,
         date_of_birth=payload.date_of_birth,
+        db=db,
     )
     return {"status": "ok"}
@@ -1,42 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from app.core.auth import get_current_user_id
-from app.auth.admin_dependencies import get_admin_user, get_club_admin
-from app.db.event_pass_repo import get_passes_for_user
-from app.db.event_pass_repo import create_event_pass
+from app.core.conditional import conditional_response, make_etag
+from app.auth.admin_dependencies import get_admin_user, get_club_admin, get_event_admin
+from app.db.async_session import RequestDB, request_db, run_db
+from app.db.event_pass_repo import get_passes_for_user, get_user_passes_version
+from app.db.event_pass_repo import cancel_event_pass, create_event_pass, create_event_passes, create_passes_for_user
 from app.db.event_pass_repo import get_passes_for_user_event
-from app.db.event_pass_repo import get_passes_for_club
-from app.db.membership_repo import is_user_member_of_event_club
+from app.db.event_pass_repo import get_passes_for_club, iter_passes_for_club
+from app.db.membership_repo import get_event_roster, get_member_event_keys, is_user_member_of_event_club
+from app.core.export import export_response
+from app.db.pagination import DEFAULT_PAGE_SIZE, build_page, clamp_page_size, decode_cursor
+from app.services.check_in import invalidate_pass_index, note_pass_created
+from app.services.push_notifications import publish_pass
 router = APIRouter()
 
+# Items per POST /me/passes/batch
+MAX_PASS_BATCH = 200
+
 @router.get("/me/passes")
-def my_event_passes(
+async def my_event_passes(
+    request: Request,
     user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
 ):
-    return get_passes_for_user(user_id)
+    version = await run_db(get_user_passes_version, user_id, db=db)
+    return await conditional_response(
+        request,
+        make_etag("me/passes", user_id, version["count"], version["updated_at"]),
+        lambda: run_db(get_passes_for_user, user_id, db=db),
+        last_modified=version["updated_at"],
+    )
 
 @router.get("/events/{event_id}/passes/me")
-def my_passes_for_event(
+async def my_passes_for_event(
     event_id: int,
     user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
 ):
-    return get_passes_for_user_event(
+    return await run_db(
+        get_passes_for_user_event,
         event_id=event_id,
         user_id=user_id,
+        db=db,
     )
 
 @router.post("/events/{event_id}/passes")
-def generate_event_pass(
+async def generate_event_pass(
     event_id: int,
     payload: dict,
+    response: Response,
     user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
 ):
     dependent_id = payload.get("dependent_id")
     
     # Validate active membership before creating pass
-    if not is_user_member_of_event_club(
+    if not await run_db(
+        is_user_member_of_event_club,
         user_id=user_id,
         event_id=event_id,
         dependent_id=dependent_id,
+        db=db,
     ):
         raise HTTPException(
             status_code=403,
@@ -44,17 +69,180 @@ def generate_event_pass(
         )
     
     try:
-        return create_event_pass(event_id, user_id, dependent_id)
+        created = await run_db(create_event_pass, event_id, user_id, dependent_id, db=db)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    # Full event: the member is on the waitlist instead
+    if created["status"] == "waitlisted":
+        response.status_code = 202
+        return created
+
+    db.after_commit(note_pass_created, event_id, created["pass_code"])
+    db.after_commit(publish_pass, user_id, event_id, dependent_id, created["pass_code"])
+    return created
+
+
+@router.delete("/events/{event_id}/passes/me")
+async def cancel_my_event_pass(
+    event_id: int,
+    dependent_id: Optional[int] = None,
+    user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
+):
+    """
+    Give up a pass (not yet checked in) or a place on the event's waitlist.
+    The freed seat goes to the first member on the waitlist.
+    """
+    try:
+        cancelled = await run_db(cancel_event_pass, event_id, user_id, dependent_id, db=db)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    for p in cancelled["promoted"]:
+        db.after_commit(note_pass_created, event_id, p["pass_code"])
+        db.after_commit(publish_pass, p["user_id"], event_id, p["dependent_id"], p["pass_code"])
+
+    return {"cancelled": cancelled["cancelled"], "promoted": len(cancelled["promoted"])}
+
+
+def _parse_pass_items(payload: dict) -> list[tuple[int, Optional[int]]]:
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        raise ValueError("items must be a non-empty list")
+    if len(items) > MAX_PASS_BATCH:
+        raise ValueError(f"At most {MAX_PASS_BATCH} items per request")
+
+    parsed = []
+    for item in items:
+        event_id = item.get("event_id") if isinstance(item, dict) else None
+        dependent_id = item.get("dependent_id") if isinstance(item, dict) else None
+        if type(event_id) is not int or (dependent_id is not None and type(dependent_id) is not int):
+            raise ValueError("Each item needs an integer event_id and an optional integer dependent_id")
+        parsed.append((event_id, dependent_id))
+    return parsed
+
+
+@router.post("/me/passes/batch")
+async def generate_event_passes(
+    payload: dict,
+    user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
+):
+    """
+    Generate passes for many (event_id, dependent_id) items at once, e.g. a
+    family attending a season of events. Status per item, in order:
+    "created", "existing" (the pass was already there), "waitlisted" (the
+    event is full; with the place in line as position) or "not_member"
+    (no active membership for the event's club, or no such event).
+    """
+    try:
+        items = _parse_pass_items(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    allowed = await run_db(get_member_event_keys, user_id, items, db=db)
+    issued = await run_db(
+        create_passes_for_user,
+        user_id,
+        [item for item in items if item in allowed],
+        db=db,
+    )
+
+    results = []
+    reported = set()
+    for event_id, dependent_id in items:
+        result = {"event_id": event_id, "dependent_id": dependent_id}
+        issued_pass = issued.get((event_id, dependent_id))
+        if issued_pass is None:
+            result.update({"status": "not_member", "pass_code": None})
+        else:
+            result.update(issued_pass)
+            # An item repeated in the batch is created once
+            if issued_pass["status"] == "created":
+                if (event_id, dependent_id) in reported:
+                    result["status"] = "existing"
+                else:
+                    reported.add((event_id, dependent_id))
+                    db.after_commit(note_pass_created, event_id, issued_pass["pass_code"])
+                    db.after_commit(publish_pass, user_id, event_id, dependent_id, issued_pass["pass_code"])
+        results.append(result)
+
+    return {"results": results}
+
 
 @router.get("/admin/clubs/{club_id}/passes")
-def get_club_passes(
+async def get_club_passes(
     club_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    all_rows: bool = Query(False, alias="all"),
     admin_user_id: int = Depends(get_club_admin),
+    db: RequestDB = request_db,
 ):
     """
-    Admin endpoint to get all event passes for a club.
+    Admin endpoint to get the event passes for a club, latest events first,
+    one page at a time. ?all=true returns every pass without paging.
     """
-    return get_passes_for_club(club_id)
\ No newline at end of file
+    if all_rows:
+        return await run_db(get_passes_for_club, club_id, db=db)
+
+    try:
+        after = decode_cursor(cursor, 2)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    limit = clamp_page_size(limit)
+    rows = await run_db(get_passes_for_club, club_id, limit=limit, after=after, db=db)
+    return build_page(rows, limit, lambda r: [r["event_date"], r["id"]])
+
+
+@router.post("/admin/events/{event_id}/passes/roster")
+async def issue_roster_passes(
+    event_id: int,
+    admin_user_id: int = Depends(get_event_admin),
+    db: RequestDB = request_db,
+):
+    """
+    Admin endpoint to issue a pass to every active member (and member
+    dependent) of the event's club who doesn't have one yet. Once the
+    event is full the rest are waitlisted.
+    """
+    roster = await run_db(get_event_roster, event_id, db=db)
+    try:
+        passes = await run_db(create_event_passes, event_id, roster, db=db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    created = [p for p in passes if p["status"] == "created"]
+    if created:
+        db.after_commit(invalidate_pass_index, event_id)
+        for p in created:
+            db.after_commit(publish_pass, p["user_id"], event_id, p["dependent_id"], p["pass_code"])
+
+    return {
+        "issued": len(created),
+        "existing": sum(p["status"] == "existing" for p in passes),
+        "waitlisted": sum(p["status"] == "waitlisted" for p in passes),
+    }
+
+
+PASS_EXPORT_FIELDS = ["id", "pass_code", "event_title", "event_date", "user_phone", "member"]
+
+
+@router.get("/admin/clubs/{club_id}/passes/export")
+async def export_club_passes(
+    club_id: int,
+    export_format: str = Query("csv", alias="format"),
+    admin_user_id: int = Depends(get_club_admin),
+):
+    """
+    Admin endpoint to download every event pass of a club as CSV or NDJSON,
+    streamed from the database as it is read.
+    """
+    return export_response(
+        iter_passes_for_club(club_id),
+        PASS_EXPORT_FIELDS,
+        export_format,
+        f"club-{club_id}-passes",
+    )
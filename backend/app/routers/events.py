@@ -1,35 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from typing import Optional
 from app.core.auth import get_current_user_id
-from app.db.event_repo import get_events_for_club
+from app.core.conditional import conditional_response
+from app.db.async_session import RequestDB, request_db, run_db
 from app.db.event_pass_repo import create_event_pass
+from app.db.event_repo import get_event_changes
+from app.db.pagination import DEFAULT_PAGE_SIZE, clamp_page_size, decode_cursor
+from app.db.sync import build_changes
 from app.db.membership_repo import is_user_member_of_event_club
+from app.services.catalog_cache import get_events_for_club_cached
+from app.services.check_in import note_pass_created
+from app.services.push_notifications import publish_pass
 
 router = APIRouter()
 
 
 # ✅ EXISTING — List events for a club
 @router.get("/clubs/{club_id}/events")
-def list_club_events(
+async def list_club_events(
     club_id: int,
+    request: Request,
     user_id: int = Depends(get_current_user_id),
 ):
-    return get_events_for_club(club_id)
+    events, etag = await get_events_for_club_cached(club_id)
+    return await conditional_response(request, etag, lambda: events)
+
+
+@router.get("/clubs/{club_id}/events/sync")
+async def sync_club_events(
+    club_id: int,
+    since: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
+):
+    """
+    Events changed since the cursor from the previous sync, plus ids of
+    deleted ones. Same contract as /clubs/{club_id}/announcements/sync.
+    """
+    try:
+        after = decode_cursor(since, 2)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    limit = clamp_page_size(limit)
+    rows = await run_db(get_event_changes, club_id, after, limit, db=db)
+    return build_changes(rows, limit, since)
 
 
 # ✅ NEW — Attend event (auto-generate pass)
 @router.post("/events/{event_id}/attend")
-def attend_event(
+async def attend_event(
     event_id: int,
     payload: dict,
+    response: Response,
     user_id: int = Depends(get_current_user_id),
+    db: RequestDB = request_db,
 ):
     dependent_id = payload.get("dependent_id")
 
     # 1️⃣ Validate membership (self or dependent)
-    if not is_user_member_of_event_club(
+    if not await run_db(
+        is_user_member_of_event_club,
         user_id=user_id,
         event_id=event_id,
         dependent_id=dependent_id,
+        db=db,
     ):
         raise HTTPException(
             status_code=403,
@@ -38,10 +74,21 @@ def attend_event(
 
     # 2️⃣ Create pass
     try:
-        return create_event_pass(
+        created = await run_db(
+            create_event_pass,
             event_id=event_id,
             user_id=user_id,
             dependent_id=dependent_id,
+            db=db,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+    # Full event: the member is on the waitlist instead
+    if created["status"] == "waitlisted":
+        response.status_code = 202
+        return created
+
+    db.after_commit(note_pass_created, event_id, created["pass_code"])
+    db.after_commit(publish_pass, user_id, event_id, dependent_id, created["pass_code"])
+    return created
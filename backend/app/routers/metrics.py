@@ -0,0 +1,77 @@
+import hmac
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from app.db.session import engine
+from app.db.async_session import async_engine
+from app.db.pool_metrics import get_pool_metrics
+from app.auth.role_cache import get_role_cache_stats
+from app.services.catalog_cache import get_catalog_cache_stats
+from app.services.check_in import get_check_in_stats
+from app.routers.auth import get_otp_rate_limit_stats
+from app.services.push_notifications import get_push_stats
+
+# Bearer token for metrics scrapers. The endpoints expose pool, cache and
+# traffic internals, so without a token they don't exist (404).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = (authorization or "").removeprefix("Bearer ")
+    if not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_metrics_token)])
+
+
+@router.get("/db-pool")
+def db_pool_metrics():
+    """
+    Connection pool state and checkout timings for the worker that serves the request.
+    Each gunicorn worker has its own pool, so scrape repeatedly and group by pid.
+    With DB_ASYNC, requests use the async engine's pool, reported under "async".
+    """
+    metrics = get_pool_metrics(engine)
+    if async_engine is not None:
+        metrics["async"] = get_pool_metrics(async_engine)
+    return metrics
+
+
+@router.get("/caches")
+def cache_metrics():
+    """
+    Size and hit/miss counters of this worker's in-process caches.
+    """
+    return {
+        "admin_roles": get_role_cache_stats(),
+        "catalog": get_catalog_cache_stats(),
+    }
+
+
+@router.get("/rate-limits")
+def rate_limit_metrics():
+    """
+    Allowed and throttled counts of this worker's rate limiters.
+    """
+    return {
+        "request_otp": get_otp_rate_limit_stats(),
+    }
+
+
+@router.get("/check-in")
+def check_in_metrics():
+    """
+    Pass index hit ratio and check-in write batching for this worker.
+    """
+    return get_check_in_stats()
+
+
+@router.get("/push")
+def push_metrics():
+    """
+    Connected push subscribers and fan-out counters for this worker.
+    """
+    return get_push_stats()
@@ -0,0 +1,56 @@
+import os
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.core.auth import get_current_user_id
+from app.db.async_session import run_db
+from app.db.membership_repo import get_active_club_ids_for_user
+from app.services.push_notifications import club_topic, get_push_hub, user_topic
+
+# Client reconnect delay after the stream drops
+PUSH_RETRY_MS = int(os.getenv("PUSH_RETRY_MS", "5000"))
+
+router = APIRouter()
+
+
+@router.get("/me/stream")
+async def push_stream(user_id: int = Depends(get_current_user_id)):
+    """
+    Server-sent events for the user: new announcements in their clubs,
+    membership approvals/rejections/expiries and new passes.
+
+    Messages only say what changed. A client that (re)connects should
+    refresh with the ?since= sync and ETag list endpoints first, then rely
+    on the stream instead of polling.
+    """
+    club_ids = await run_db(get_active_club_ids_for_user, user_id)
+    topics = [user_topic(user_id)] + [club_topic(c) for c in club_ids]
+    hub = get_push_hub()
+
+    async def frames():
+        # Subscribed inside the generator so the finally below always runs
+        subscription = hub.subscribe(topics)
+        try:
+            yield f"retry: {PUSH_RETRY_MS}\n\n".encode()
+            while not (subscription.closed and subscription.queue.empty()):
+                message = await subscription.get()
+                if message.event == "membership":
+                    club_id = message.data["club_id"]
+                    # Approved into a new club: start receiving its announcements
+                    if message.data["status"] == "active":
+                        hub.add_topics(subscription, [club_topic(club_id)])
+                    # Rejected or expired: stop, unless another of the user's
+                    # memberships there (self or a dependent) is still active
+                    elif club_topic(club_id) in subscription.topics:
+                        if club_id not in await run_db(get_active_club_ids_for_user, user_id):
+                            hub.remove_topics(subscription, [club_topic(club_id)])
+                yield message.frame
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
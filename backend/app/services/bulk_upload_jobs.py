@@ -0,0 +1,225 @@
+import csv
+import io
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Optional
+
+from app.db.bulk_upload_repo import parse_bulk_upload_rows, process_bulk_upload_rows
+from app.db.bulk_upload_job_repo import (
+    claim_bulk_upload_job,
+    create_bulk_upload_job,
+    finish_bulk_upload_job,
+    get_resumable_bulk_upload_job_ids,
+    record_bulk_upload_progress,
+    renew_bulk_upload_job_lease,
+)
+
+logger = logging.getLogger(__name__)
+
+# Uploaded CSVs are kept here until their job finishes.
+# Must be shared between gunicorn workers (and hosts) for resume to work.
+JOB_DIR = os.getenv(
+    "BULK_UPLOAD_JOB_DIR",
+    os.path.join(tempfile.gettempdir(), "clubvision-bulk-upload"),
+)
+
+# Jobs processed concurrently per worker process
+JOB_WORKERS = int(os.getenv("BULK_UPLOAD_JOB_WORKERS", "2"))
+
+# A running job whose heartbeat is older than this can be taken over
+JOB_LEASE_SECONDS = int(os.getenv("BULK_UPLOAD_JOB_LEASE_SECONDS", "120"))
+
+# Leases of running jobs are renewed this often, whatever the chunk progress
+JOB_HEARTBEAT_SECONDS = float(os.getenv("BULK_UPLOAD_JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 4)))
+
+# Queued jobs and expired leases are looked for this often, so a job whose
+# worker died is picked up without waiting for a restart
+JOB_SCAN_SECONDS = float(os.getenv("BULK_UPLOAD_JOB_SCAN_SECONDS", str(JOB_LEASE_SECONDS)))
+
+_owner = f"{socket.gethostname()}:{os.getpid()}"
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="bulk-upload")
+
+# Jobs submitted to this process's executor and not finished yet
+_local_jobs: set[int] = set()
+# Running jobs -> set when their lease was lost to another worker
+_running: dict[int, threading.Event] = {}
+_lock = threading.Lock()
+
+_stop = threading.Event()
+_monitor: Optional[threading.Thread] = None
+
+
+class _LeaseLost(Exception):
+    pass
+
+
+def submit_bulk_upload_job(club_id: int, admin_user_id: int, binary_file: BinaryIO) -> int:
+    """
+    Save the upload to JOB_DIR, record the job and queue it.
+    Blocking, meant to run on a worker thread.
+    """
+    os.makedirs(JOB_DIR, exist_ok=True)
+    file_path = os.path.join(JOB_DIR, f"{uuid.uuid4().hex}.csv")
+    with open(file_path, "wb") as out:
+        shutil.copyfileobj(binary_file, out)
+
+    job_id = create_bulk_upload_job(club_id, admin_user_id, file_path)
+    _submit(job_id)
+    return job_id
+
+
+def resume_bulk_upload_jobs():
+    """
+    Queue jobs that are waiting or were left unfinished by a stopped worker.
+    Claiming is atomic so only one worker resumes each job.
+    """
+    for job_id in get_resumable_bulk_upload_job_ids(JOB_LEASE_SECONDS):
+        _submit(job_id)
+
+
+def start_bulk_upload_job_monitor():
+    """
+    Resume unfinished jobs now, then keep renewing the leases of this
+    worker's running jobs and re-scanning for expired ones in a background
+    thread. Called from the app lifespan.
+    """
+    global _monitor
+    if _monitor is not None:
+        return
+
+    _stop.clear()
+    _monitor = threading.Thread(target=_run_monitor, name="bulk-upload-monitor", daemon=True)
+    _monitor.start()
+
+
+def stop_bulk_upload_job_monitor():
+    global _monitor
+    if _monitor is None:
+        return
+    _stop.set()
+    _monitor.join(timeout=10)
+    _monitor = None
+
+
+def _run_monitor():
+    next_scan_at = 0.0
+    while not _stop.is_set():
+        _renew_leases()
+        if time.monotonic() >= next_scan_at:
+            next_scan_at = time.monotonic() + JOB_SCAN_SECONDS
+            try:
+                resume_bulk_upload_jobs()
+            except Exception:
+                logger.exception("Could not scan for resumable bulk upload jobs")
+        _stop.wait(JOB_HEARTBEAT_SECONDS)
+
+
+def _renew_leases():
+    with _lock:
+        running = list(_running.items())
+    for job_id, lost in running:
+        try:
+            if not renew_bulk_upload_job_lease(job_id, _owner):
+                lost.set()
+        except Exception:
+            # Try again next round; the lease outlives a few missed heartbeats
+            logger.warning("Could not renew lease of bulk upload job %s", job_id, exc_info=True)
+
+
+def _submit(job_id: int):
+    with _lock:
+        if job_id in _local_jobs:
+            return
+        _local_jobs.add(job_id)
+    _executor.submit(_run_job, job_id)
+
+
+def _run_job(job_id: int):
+    try:
+        job = claim_bulk_upload_job(job_id, _owner, JOB_LEASE_SECONDS)
+        if job:
+            _run_claimed_job(job)
+    finally:
+        with _lock:
+            _local_jobs.discard(job_id)
+
+
+def _run_claimed_job(job: dict):
+    job_id = job["id"]
+    lost = threading.Event()
+    with _lock:
+        _running[job_id] = lost
+
+    try:
+        _process_job_file(job, lost)
+    except _LeaseLost:
+        logger.warning("Bulk upload job %s was taken over by another worker", job_id)
+        return
+    except Exception as e:
+        logger.exception("Bulk upload job %s failed", job_id)
+        finish_bulk_upload_job(job_id, _owner, "failed", str(e))
+        return
+    finally:
+        with _lock:
+            _running.pop(job_id, None)
+
+    if not finish_bulk_upload_job(job_id, _owner, "completed"):
+        return
+    try:
+        os.remove(job["file_path"])
+    except OSError:
+        pass
+
+
+def _process_job_file(job: dict, lost: threading.Event):
+    created = []
+    skipped = []
+    errors = []
+
+    def flush(last_row: int):
+        # Commit progress and drop the chunk's results so memory stays flat.
+        # The last chunk can be followed by rows that failed validation.
+        last_row = max([last_row] + [e["row"] for e in errors])
+        # Stop rather than double-process rows another worker now owns
+        if lost.is_set() or not record_bulk_upload_progress(
+            job["id"],
+            _owner,
+            last_row,
+            created=len(created),
+            skipped=len(skipped),
+            errors=sorted(errors, key=lambda e: e["row"]),
+        ):
+            raise _LeaseLost()
+        created.clear()
+        skipped.clear()
+        errors.clear()
+
+    with open(job["file_path"], "rb") as binary_file:
+        text_file = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+        csv_reader = csv.DictReader(text_file)
+
+        if not csv_reader.fieldnames:
+            errors.append({"row": 1, "phone": "", "error": "CSV file has no headers"})
+            flush(1)
+            return
+
+        process_bulk_upload_rows(
+            job["club_id"],
+            # Rows up to last_row were committed before a restart
+            parse_bulk_upload_rows(csv_reader, errors, skip_through=job["last_row"]),
+            created,
+            skipped,
+            errors,
+            on_chunk=flush,
+        )
+
+        # Trailing rows that failed validation after the last chunk
+        if errors:
+            flush(max(e["row"] for e in errors))
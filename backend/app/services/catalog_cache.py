@@ -0,0 +1,66 @@
+import os
+
+from app.core.cache import ReadThroughCache
+from app.core.conditional import make_etag
+from app.db.async_session import run_db
+from app.db.event_repo import get_events_for_club
+from app.db.membership_repo import get_all_clubs
+
+# The club list only changes when a club is added by hand
+CLUBS_CACHE_TTL_SECONDS = float(os.getenv("CLUBS_CACHE_TTL_SECONDS", "300"))
+
+# Event lists are invalidated by create_event and delete_event; the TTL bounds staleness
+# from writes made outside the API
+EVENTS_CACHE_TTL_SECONDS = float(os.getenv("EVENTS_CACHE_TTL_SECONDS", "60"))
+EVENTS_CACHE_MAX_ENTRIES = int(os.getenv("EVENTS_CACHE_MAX_ENTRIES", "5000"))
+
+_catalog = ReadThroughCache(
+    "catalog",
+    max_entries=EVENTS_CACHE_MAX_ENTRIES + 1,
+    ttl_seconds=EVENTS_CACHE_TTL_SECONDS,
+)
+
+_ALL_CLUBS_KEY = "clubs"
+
+
+def _events_key(club_id: int) -> str:
+    return f"events:{club_id}"
+
+
+async def get_all_clubs_cached() -> list[dict]:
+    """
+    Cached get_all_clubs. Loads run on their own connection, since one load
+    serves every request waiting on the key.
+    """
+    return await _catalog.get(
+        _ALL_CLUBS_KEY,
+        lambda: run_db(get_all_clubs),
+        ttl_seconds=CLUBS_CACHE_TTL_SECONDS,
+    )
+
+
+async def _load_club_events(club_id: int) -> tuple[list[dict], str]:
+    events = await run_db(get_events_for_club, club_id)
+    return events, make_etag("events", club_id, events)
+
+
+async def get_events_for_club_cached(club_id: int) -> tuple[list[dict], str]:
+    """
+    Cached get_events_for_club, with an ETag of the list computed once
+    per load, so conditional requests are answered without the database.
+    """
+    return await _catalog.get(
+        _events_key(club_id),
+        lambda: _load_club_events(club_id),
+    )
+
+
+def invalidate_club_events(club_id: int):
+    """
+    Call once a write to the club's events has committed.
+    """
+    _catalog.invalidate(_events_key(club_id))
+
+
+def get_catalog_cache_stats() -> dict:
+    return _catalog.stats()
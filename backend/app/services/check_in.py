@@ -0,0 +1,225 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Optional
+
+from app.core.cache import ReadThroughCache, publish_invalidation, subscribe_invalidations
+from app.core.metrics import Counter, Histogram
+from app.core.pass_codes import is_legacy_pass_code, normalize_pass_code, verify_pass_code
+from app.db.async_session import run_db
+from app.db.event_pass_repo import get_passes_for_check_in, record_check_ins
+
+# An event's passes stay indexed while it is being scanned; TTL bounds
+# how long check-ins made by other workers can go unseen (the write is
+# still idempotent, the scan just reports "already_checked_in" late)
+PASS_INDEX_TTL_SECONDS = float(os.getenv("PASS_INDEX_TTL_SECONDS", "3600"))
+PASS_INDEX_MAX_EVENTS = int(os.getenv("PASS_INDEX_MAX_EVENTS", "100"))
+
+# Unknown codes remembered per event so repeated bad scans skip the database
+PASS_INDEX_MAX_MISSING = int(os.getenv("PASS_INDEX_MAX_MISSING", "10000"))
+
+# Scans per check-in write; also the limit of the batch endpoint
+CHECK_IN_MAX_BATCH = int(os.getenv("CHECK_IN_MAX_BATCH", "1000"))
+
+
+class EventPassIndex:
+    """
+    pass_code -> pass of one event, plus codes known not to exist.
+    """
+
+    def __init__(self, passes: list[dict]):
+        self.by_code = {p["pass_code"]: p for p in passes}
+        self.missing = set()
+
+    def remember_missing(self, codes):
+        if len(self.missing) + len(codes) > PASS_INDEX_MAX_MISSING:
+            self.missing.clear()
+        self.missing.update(codes)
+
+
+_indexes = ReadThroughCache(
+    "pass_index",
+    max_entries=PASS_INDEX_MAX_EVENTS,
+    ttl_seconds=PASS_INDEX_TTL_SECONDS,
+)
+
+def _index_key(event_id: int) -> str:
+    return f"event:{event_id}"
+
+
+def _on_pass_created(message: dict):
+    # Tells every worker's index that a code now exists
+    if message.get("cache") != "pass_codes":
+        return
+    index = _indexes.peek(_index_key(message["event_id"]))
+    if index is not None:
+        index.missing.discard(message["pass_code"])
+
+
+subscribe_invalidations(_on_pass_created)
+
+
+def note_pass_created(event_id: int, pass_code: str):
+    """
+    Call once a new pass has committed.
+    """
+    publish_invalidation({"cache": "pass_codes", "event_id": event_id, "pass_code": pass_code})
+
+
+def invalidate_pass_index(event_id: int):
+    """
+    Call once many passes of the event have committed, e.g. a roster issue:
+    the index is reloaded instead of looking the new codes up one by one.
+    """
+    _indexes.invalidate(_index_key(event_id))
+
+
+async def _load_index(event_id: int) -> EventPassIndex:
+    return EventPassIndex(await run_db(get_passes_for_check_in, event_id))
+
+
+async def _get_index(event_id: int) -> EventPassIndex:
+    return await _indexes.get(_index_key(event_id), lambda: _load_index(event_id))
+
+
+class CheckInWriter:
+    """
+    Group commit for check-ins. Scans that arrive while a write is in
+    flight are queued and written together by the next one, so a busy gate
+    costs one UPDATE per batch instead of one per scan. Every caller still
+    gets its answer only after its check-in has committed.
+    """
+
+    def __init__(self, max_batch: int):
+        self.max_batch = max_batch
+        self._pending = deque()  # (scans, future)
+        self._task = None
+        self.writes = Counter()
+        self.scans = Counter()
+        self.write_ms = Histogram()
+
+    async def write(self, scans: list[tuple[int, int]]) -> list[Optional[dict]]:
+        """
+        Record (pass_id, admin_user_id) scans. Returns, in order, the pass's
+        checked_in_at and whether this scan was the one that set it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((scans, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return await future
+
+    async def _run(self):
+        while self._pending:
+            calls = [self._pending.popleft()]
+            size = len(calls[0][0])
+            while self._pending and size + len(self._pending[0][0]) <= self.max_batch:
+                calls.append(self._pending.popleft())
+                size += len(calls[-1][0])
+
+            started = time.perf_counter()
+            try:
+                records = await run_db(record_check_ins, [scan for scans, _ in calls for scan in scans])
+            except Exception as e:
+                for _, future in calls:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.write_ms.observe((time.perf_counter() - started) * 1000)
+            self.writes.inc()
+            self.scans.inc(size)
+
+            # A pass scanned more than once in the batch: the first scan wins
+            seen = set()
+            for scans, future in calls:
+                results = []
+                for pass_id, _ in scans:
+                    record = records.get(pass_id)
+                    if record is not None:
+                        record = dict(record, first=record["first"] and pass_id not in seen)
+                        seen.add(pass_id)
+                    results.append(record)
+                if not future.done():
+                    future.set_result(results)
+
+    def stats(self) -> dict:
+        return {
+            "writes": self.writes.value,
+            "scans": self.scans.value,
+            "write_ms": self.write_ms.snapshot(),
+        }
+
+
+_writer = CheckInWriter(CHECK_IN_MAX_BATCH)
+
+
+def _scan_result(pass_code: str, status: str, entry: Optional[dict] = None) -> dict:
+    result = {"pass_code": pass_code, "status": status}
+    if entry is not None:
+        result.update({
+            "pass_id": entry["id"],
+            "user_name": entry["user_name"],
+            "user_phone": entry["user_phone"],
+            "member": entry["member"],
+            "checked_in_at": entry["checked_in_at"],
+        })
+    return result
+
+
+async def check_in_passes(event_id: int, pass_codes: list[str], admin_user_id: int) -> list[dict]:
+    """
+    Check in scanned codes at an event's door, answered from the event's
+    pass index. Status per code: "checked_in", "already_checked_in",
+    "not_found", or "invalid" for codes that fail the pass code check
+    (mistyped, made up or for another event), which are rejected without
+    touching the index or the database.
+    """
+    codes = [normalize_pass_code(code) for code in pass_codes]
+    valid = [is_legacy_pass_code(c) or verify_pass_code(event_id, c) is not None for c in codes]
+
+    index = await _get_index(event_id) if any(valid) else None
+
+    # Codes created after the index was loaded: one query for all of them
+    unknown = list({
+        c for c, ok in zip(codes, valid)
+        if ok and c not in index.by_code and c not in index.missing
+    })
+    if unknown:
+        found = await run_db(get_passes_for_check_in, event_id, unknown)
+        for entry in found:
+            index.by_code[entry["pass_code"]] = entry
+        index.remember_missing([c for c in unknown if c not in index.by_code])
+
+    results = [None] * len(codes)
+    to_write = []
+    for position, code in enumerate(codes):
+        if not valid[position]:
+            results[position] = _scan_result(code, "invalid")
+            continue
+        entry = index.by_code.get(code)
+        if entry is None:
+            results[position] = _scan_result(code, "not_found")
+        elif entry["checked_in_at"] is not None:
+            results[position] = _scan_result(code, "already_checked_in", entry)
+        else:
+            to_write.append((position, entry))
+
+    if to_write:
+        records = await _writer.write([(entry["id"], admin_user_id) for _, entry in to_write])
+        for (position, entry), record in zip(to_write, records):
+            if record is None:
+                results[position] = _scan_result(entry["pass_code"], "not_found")
+                continue
+            entry["checked_in_at"] = record["checked_in_at"]
+            status = "checked_in" if record["first"] else "already_checked_in"
+            results[position] = _scan_result(entry["pass_code"], status, entry)
+
+    return results
+
+
+def get_check_in_stats() -> dict:
+    return {
+        "pass_index": _indexes.stats(),
+        "writer": _writer.stats(),
+    }
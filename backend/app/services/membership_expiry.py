@@ -0,0 +1,96 @@
+import datetime
+import os
+import threading
+from typing import Optional
+
+from app.db.membership_expiry_repo import (
+    expire_memberships_batch,
+    get_db_today,
+    queue_renewal_reminders_batch,
+)
+from app.services.push_notifications import publish_membership_status
+
+# Seconds between in-process sweeps; 0 leaves the sweep to the CLI
+# (python -m scripts.expire_memberships), e.g. from cron
+MEMBERSHIP_EXPIRY_INTERVAL_SECONDS = float(os.getenv("MEMBERSHIP_EXPIRY_INTERVAL_SECONDS", "0"))
+
+# Memberships expired (or reminders queued) per transaction
+MEMBERSHIP_EXPIRY_BATCH_SIZE = int(os.getenv("MEMBERSHIP_EXPIRY_BATCH_SIZE", "500"))
+
+# Queue renewal reminders this many days before expiry; 0 disables them
+MEMBERSHIP_REMINDER_DAYS = int(os.getenv("MEMBERSHIP_REMINDER_DAYS", "0"))
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def run_expiry_sweep(
+    today: Optional[datetime.date] = None,
+    batch_size: int = MEMBERSHIP_EXPIRY_BATCH_SIZE,
+    reminder_days: int = MEMBERSHIP_REMINDER_DAYS,
+    stop: Optional[threading.Event] = None,
+) -> dict:
+    """
+    Expire every active membership whose expiry_date has passed, one
+    committed batch at a time, then queue renewal reminders for those
+    expiring within reminder_days. Members are told about the new status
+    after each batch commits. Safe to run on several workers at once.
+    today defaults to the database's date, which the membership checks use.
+    """
+    today = today or get_db_today()
+    expired = 0
+    reminders = 0
+
+    while not (stop and stop.is_set()):
+        batch = expire_memberships_batch(today, batch_size)
+        for m in batch:
+            publish_membership_status(m["user_id"], m["club_id"], m["membership_id"], "expired")
+        expired += len(batch)
+        if len(batch) < batch_size:
+            break
+
+    if reminder_days > 0:
+        after = None
+        while not (stop and stop.is_set()):
+            queued, after = queue_renewal_reminders_batch(today, reminder_days, after, batch_size)
+            reminders += queued
+            if after is None:
+                break
+
+    return {"expired": expired, "reminders_queued": reminders}
+
+
+def start_expiry_scheduler():
+    """
+    Start the in-process sweep thread if MEMBERSHIP_EXPIRY_INTERVAL_SECONDS is set.
+    """
+    global _thread
+    if MEMBERSHIP_EXPIRY_INTERVAL_SECONDS <= 0 or _thread is not None:
+        return
+
+    _stop.clear()
+    _thread = threading.Thread(target=_run_scheduler, name="membership-expiry", daemon=True)
+    _thread.start()
+
+
+def stop_expiry_scheduler():
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join(timeout=10)
+    _thread = None
+
+
+def _run_scheduler():
+    while not _stop.is_set():
+        try:
+            result = run_expiry_sweep(stop=_stop)
+            if result["expired"] or result["reminders_queued"]:
+                print(
+                    f"[EXPIRY] Expired {result['expired']} memberships, "
+                    f"queued {result['reminders_queued']} renewal reminders"
+                )
+        except Exception as e:
+            print(f"[EXPIRY] Sweep failed: {e}")
+        _stop.wait(MEMBERSHIP_EXPIRY_INTERVAL_SECONDS)
@@ -1,33 +1,69 @@
+import math
+import os
 import random
 import time
+from typing import Optional
 
-# In-memory store (SAFE for now)
-_otp_store = {}
+from app.core.dev_keys import dev_key
+from app.services.otp_store import DatabaseOTPStore, InMemoryOTPStore, OTPStore
 
 OTP_EXPIRY_SECONDS = 300  # 5 minutes
 
+# Repeat requests within this window reuse the outstanding code
+OTP_RESEND_SECONDS = int(os.getenv("OTP_RESEND_SECONDS", "30"))
+
+# Wrong guesses allowed before a code is dropped
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+
+# "memory": per worker, fine for a single process.
+# "db": otp_codes table, needed when gunicorn runs several workers.
+OTP_STORE = os.getenv("OTP_STORE", "memory").lower()
+
+# Keys the code hashes in the otp_codes table; must be the same on every worker
+OTP_HASH_KEY = os.getenv("OTP_HASH_KEY", "")
+
+
+def _create_store() -> OTPStore:
+    if OTP_STORE == "db":
+        # Fails closed: with a known key the HMAC is no better than a bare hash
+        hash_key = OTP_HASH_KEY or dev_key("OTP_HASH_KEY")
+        return DatabaseOTPStore(hash_key.encode(), max_attempts=OTP_MAX_ATTEMPTS)
+    return InMemoryOTPStore(
+        max_entries=int(os.getenv("OTP_MAX_ENTRIES", "1000000")),
+        max_attempts=OTP_MAX_ATTEMPTS,
+    )
+
+
+_otp_store = _create_store()
+
 
 def generate_otp(phone: str) -> str:
     otp = str(random.randint(100000, 999999))
-    _otp_store[phone] = {
-        "otp": otp,
-        "expires_at": time.time() + OTP_EXPIRY_SECONDS,
-    }
+    _otp_store.put(phone, otp, OTP_EXPIRY_SECONDS)
     print(f"[OTP DEBUG] Phone: {phone}, OTP: {otp}")
     return otp
 
 
-def verify_otp(phone: str, otp: str) -> bool:
-    record = _otp_store.get(phone)
-    if not record:
-        return False
+def get_resend_wait(phone: str) -> Optional[tuple[int, int]]:
+    """
+    If a code was issued to phone less than OTP_RESEND_SECONDS ago, return
+    (seconds until a new one may be sent, seconds the current one stays valid).
+    Otherwise None.
+    """
+    expires_at = _otp_store.get_expires_at(phone)
+    if expires_at is None:
+        return None
 
-    if time.time() > record["expires_at"]:
-        del _otp_store[phone]
-        return False
+    now = time.time()
+    issued_at = expires_at - OTP_EXPIRY_SECONDS
+    if now - issued_at >= OTP_RESEND_SECONDS:
+        return None
 
-    if record["otp"] != otp:
-        return False
+    return (
+        math.ceil(issued_at + OTP_RESEND_SECONDS - now),
+        math.ceil(expires_at - now),
+    )
 
-    del _otp_store[phone]
-    return True
+
+def verify_otp(phone: str, otp: str) -> bool:
+    return _otp_store.verify(phone, otp)
@@ -0,0 +1,227 @@
+import hashlib
+import heapq
+import hmac
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+
+class OTPStore(ABC):
+    """
+    Where outstanding OTPs live between /auth/request-otp and /auth/verify-otp.
+    """
+
+    @abstractmethod
+    def put(self, phone: str, otp: str, ttl_seconds: float):
+        ...
+
+    @abstractmethod
+    def get_expires_at(self, phone: str) -> Optional[float]:
+        """
+        Expiry (epoch seconds) of the phone's outstanding code, or None.
+        """
+
+    @abstractmethod
+    def verify(self, phone: str, otp: str) -> bool:
+        """
+        Check a code. A correct code is consumed. Every attempt counts against
+        the code, which is dropped after max_attempts wrong guesses.
+        """
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """
+        Drop expired codes, returns how many were removed.
+        """
+
+
+class InMemoryOTPStore(OTPStore):
+    """
+    Per-process store bounded to max_entries.
+
+    Codes are in a dict keyed by phone, with a min-heap of expiries next to it.
+    put() and verify() sweep expired codes from the top of the heap, so
+    memory is reclaimed for phones that never verify. When the store is full,
+    the code closest to expiry is evicted. All operations are O(log n) amortized.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000, max_attempts: int = 5):
+        self.max_entries = max_entries
+        self.max_attempts = max_attempts
+        self._codes = {}  # phone -> [otp, expires_at, attempts]
+        self._heap = []  # (expires_at, phone), may hold stale entries for overwritten codes
+        self._lock = threading.Lock()
+
+    def put(self, phone: str, otp: str, ttl_seconds: float):
+        now = time.time()
+        expires_at = now + ttl_seconds
+        with self._lock:
+            self._sweep_locked(now)
+            if phone not in self._codes:
+                while len(self._codes) >= self.max_entries:
+                    self._evict_soonest_locked()
+            self._codes[phone] = [otp, expires_at, 0]
+            heapq.heappush(self._heap, (expires_at, phone))
+            # Overwrites leave stale heap entries behind, rebuild before they pile up
+            if len(self._heap) > 2 * len(self._codes) + 1024:
+                self._heap = [(record[1], p) for p, record in self._codes.items()]
+                heapq.heapify(self._heap)
+
+    def get_expires_at(self, phone: str) -> Optional[float]:
+        with self._lock:
+            record = self._codes.get(phone)
+            if not record or record[1] <= time.time():
+                return None
+            return record[1]
+
+    def verify(self, phone: str, otp: str) -> bool:
+        now = time.time()
+        with self._lock:
+            self._sweep_locked(now)
+            record = self._codes.get(phone)
+            if not record or record[1] <= now:
+                return False
+
+            if record[0] == otp:
+                del self._codes[phone]
+                return True
+
+            record[2] += 1
+            if record[2] >= self.max_attempts:
+                del self._codes[phone]
+            return False
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep_locked(time.time())
+
+    def __len__(self):
+        return len(self._codes)
+
+    def _sweep_locked(self, now: float) -> int:
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, phone = heapq.heappop(self._heap)
+            record = self._codes.get(phone)
+            # Skip heap entries of codes that were overwritten or already used
+            if record and record[1] == expires_at:
+                del self._codes[phone]
+                removed += 1
+        return removed
+
+    def _evict_soonest_locked(self):
+        while self._heap:
+            expires_at, phone = heapq.heappop(self._heap)
+            record = self._codes.get(phone)
+            if record and record[1] == expires_at:
+                del self._codes[phone]
+                return
+
+
+class DatabaseOTPStore(OTPStore):
+    """
+    Store shared by every gunicorn worker, backed by the otp_codes table.
+    Codes are kept as HMAC-SHA256 under hash_key: a plain hash of a 6-digit
+    code is reversed by trying all 10^6 of them, so a leaked table would
+    expose every live code. Expired rows are deleted in bounded batches, at
+    most once per sweep_interval_seconds.
+    """
+
+    def __init__(
+        self,
+        hash_key: bytes,
+        max_attempts: int = 5,
+        sweep_interval_seconds: float = 60,
+        sweep_batch_size: int = 1000,
+    ):
+        self._hash_key = hash_key
+        self.max_attempts = max_attempts
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.sweep_batch_size = sweep_batch_size
+        self._next_sweep_at = 0.0
+
+    def _hash(self, phone: str, otp: str) -> str:
+        return hmac.new(self._hash_key, f"{phone}:{otp}".encode(), hashlib.sha256).hexdigest()
+
+    def put(self, phone: str, otp: str, ttl_seconds: float):
+        now = time.time()
+        with engine.begin() as conn:
+            conn.execute(
+                text("""
+                    INSERT INTO otp_codes (phone, otp_hash, expires_at, attempts)
+                    VALUES (:phone, :otp_hash, :expires_at, 0)
+                    ON DUPLICATE KEY UPDATE
+                        otp_hash = VALUES(otp_hash),
+                        expires_at = VALUES(expires_at),
+                        attempts = 0
+                """),
+                {
+                    "phone": phone,
+                    "otp_hash": self._hash(phone, otp),
+                    "expires_at": now + ttl_seconds,
+                },
+            )
+
+        if now >= self._next_sweep_at:
+            self._next_sweep_at = now + self.sweep_interval_seconds
+            self.sweep()
+
+    def get_expires_at(self, phone: str) -> Optional[float]:
+        with engine.connect() as conn:
+            row = conn.execute(
+                text("""
+                    SELECT expires_at
+                    FROM otp_codes
+                    WHERE phone = :phone
+                      AND expires_at > :now
+                """),
+                {"phone": phone, "now": time.time()},
+            ).fetchone()
+            return row._mapping["expires_at"] if row else None
+
+    def verify(self, phone: str, otp: str) -> bool:
+        with engine.begin() as conn:
+            # Consume the code only if it matches; rowcount makes concurrent verifies race-free
+            deleted = conn.execute(
+                text("""
+                    DELETE FROM otp_codes
+                    WHERE phone = :phone
+                      AND otp_hash = :otp_hash
+                      AND expires_at > :now
+                      AND attempts < :max_attempts
+                """),
+                {
+                    "phone": phone,
+                    "otp_hash": self._hash(phone, otp),
+                    "now": time.time(),
+                    "max_attempts": self.max_attempts,
+                },
+            ).rowcount
+            if deleted:
+                return True
+
+            conn.execute(
+                text("""
+                    UPDATE otp_codes
+                    SET attempts = attempts + 1
+                    WHERE phone = :phone
+                """),
+                {"phone": phone},
+            )
+            return False
+
+    def sweep(self) -> int:
+        with engine.begin() as conn:
+            return conn.execute(
+                text("""
+                    DELETE FROM otp_codes
+                    WHERE expires_at <= :now
+                    LIMIT :limit
+                """),
+                {"now": time.time(), "limit": self.sweep_batch_size},
+            ).rowcount
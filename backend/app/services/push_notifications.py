@@ -0,0 +1,64 @@
+import os
+from typing import Optional
+
+from app.core.push import PushBroker, PushHub
+
+# Messages a connected client may fall behind by before it is disconnected
+PUSH_QUEUE_SIZE = int(os.getenv("PUSH_QUEUE_SIZE", "100"))
+
+# Interval of keepalive comments on idle streams
+PUSH_KEEPALIVE_SECONDS = float(os.getenv("PUSH_KEEPALIVE_SECONDS", "15"))
+
+_hub = PushHub(queue_size=PUSH_QUEUE_SIZE, keepalive_seconds=PUSH_KEEPALIVE_SECONDS)
+
+
+def club_topic(club_id: int) -> str:
+    return f"club:{club_id}"
+
+
+def user_topic(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def get_push_hub() -> PushHub:
+    return _hub
+
+
+def set_push_broker(broker: PushBroker):
+    """
+    Install a shared broker (e.g. Redis pub/sub). Until then a push only
+    reaches clients connected to the worker that made the write.
+    Call it at startup, before requests are served.
+    """
+    _hub.set_broker(broker)
+
+
+# The publish_* functions are meant for db.after_commit, so clients are
+# never told about a write they can't read yet.
+
+def publish_announcement(club_id: int, announcement_id: int, title: Optional[str], message: Optional[str]):
+    _hub.publish(
+        [club_topic(club_id)],
+        "announcement",
+        {"club_id": club_id, "id": announcement_id, "title": title, "message": message},
+    )
+
+
+def publish_membership_status(user_id: int, club_id: int, membership_id: int, status: str):
+    _hub.publish(
+        [user_topic(user_id)],
+        "membership",
+        {"club_id": club_id, "membership_id": membership_id, "status": status},
+    )
+
+
+def publish_pass(user_id: int, event_id: int, dependent_id: Optional[int], pass_code: str):
+    _hub.publish(
+        [user_topic(user_id)],
+        "pass",
+        {"event_id": event_id, "dependent_id": dependent_id, "pass_code": pass_code},
+    )
+
+
+def get_push_stats() -> dict:
+    return _hub.stats()
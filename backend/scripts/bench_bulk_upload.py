@@ -0,0 +1,52 @@
+"""
+Benchmark process_bulk_upload against the configured database.
+
+Usage (from backend/):
+    python -m scripts.bench_bulk_upload --club-id 1 --sizes 1000 10000 100000
+
+Every run uses fresh random phone numbers, so all rows are inserts.
+Run it against a scratch database: the generated users and memberships are not cleaned up.
+"""
+import argparse
+import random
+import time
+
+from app.db.bulk_upload_repo import process_bulk_upload
+
+
+def build_csv(rows: int) -> str:
+    prefix = random.randint(6, 9)
+    start = random.randint(0, 10**8)
+    lines = ["phone,name,relation,membership_expiry"]
+    for i in range(rows):
+        phone = f"{prefix}{(start + i) % 10**9:09d}"
+        if i % 3 == 2:
+            lines.append(f"{phone},Child {i},son,2030-12-31")
+        else:
+            lines.append(f"{phone},Member {i},,2030-12-31")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk upload throughput")
+    parser.add_argument("--club-id", type=int, required=True)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        csv_content = build_csv(size)
+        started = time.perf_counter()
+        result = process_bulk_upload(club_id=args.club_id, csv_content=csv_content)
+        elapsed = time.perf_counter() - started
+        summary = result["summary"]
+        print(
+            f"rows={size:>7} "
+            f"created={summary['created']:>7} "
+            f"errors={summary['errors']:>5} "
+            f"seconds={elapsed:8.2f} "
+            f"rows/sec={size / elapsed:10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Contention benchmark for event capacity: many members attend one event
+with few seats at the same moment, then some pass holders cancel.
+
+Creates a club, --attendees members and an event with --capacity seats,
+and runs create_event_pass (what POST /events/{id}/attend calls) for every
+member from --workers threads released together. Checks that the event
+was not overbooked, that everyone else was waitlisted, and that
+cancellations promote the waitlist in FIFO order. Exits 1 on a failed check.
+
+Usage (from backend/, after python -m scripts.migrate):
+    python -m scripts.bench_event_capacity --attendees 1000 --capacity 100 --workers 40
+
+Run it against a scratch database: the generated rows are not cleaned up.
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import bindparam, text
+
+from app.db.event_pass_repo import cancel_event_pass, create_event_pass
+from app.db.session import DB_MAX_OVERFLOW, DB_POOL_SIZE, engine
+
+
+def setup(attendees: int, capacity: int) -> tuple[int, list[int]]:
+    prefix = random.randint(6, 9)
+    start = random.randint(0, 10**8)
+    with engine.begin() as conn:
+        club_id = conn.execute(
+            text("INSERT INTO clubs (name) VALUES (:name)"),
+            {"name": f"Capacity bench {start}"},
+        ).lastrowid
+        event_id = conn.execute(
+            text("""
+                INSERT INTO events (club_id, title, event_date, requires_pass, capacity)
+                VALUES (:club_id, 'Capacity bench', '2030-01-01', 1, :capacity)
+            """),
+            {"club_id": club_id, "capacity": capacity},
+        ).lastrowid
+
+        phones = [f"{prefix}{(start + i) % 10**9:09d}" for i in range(attendees)]
+        conn.execute(
+            text("INSERT INTO users (phone_number) VALUES (:phone)"),
+            [{"phone": phone} for phone in phones],
+        )
+        by_phone = {
+            row.phone_number: row.id
+            for row in conn.execute(
+                text("SELECT id, phone_number FROM users WHERE phone_number IN :phones")
+                .bindparams(bindparam("phones", expanding=True)),
+                {"phones": phones},
+            )
+        }
+        user_ids = [by_phone[phone] for phone in phones]
+        conn.execute(
+            text("""
+                INSERT INTO memberships (user_id, club_id, status, role)
+                VALUES (:user_id, :club_id, 'active', 'member')
+            """),
+            [{"user_id": user_id, "club_id": club_id} for user_id in user_ids],
+        )
+    return event_id, user_ids
+
+
+def run_concurrently(fn, args: list, workers: int) -> tuple[list, list[float], float]:
+    """
+    Call fn(*a) for every a in args from workers threads that all start at
+    the same moment. Returns results (or exceptions), per-call latencies in
+    ms and the wall time in seconds.
+    """
+    barrier = threading.Barrier(workers + 1)
+    results = [None] * len(args)
+    latencies = [0.0] * len(args)
+
+    def call(position):
+        started = time.perf_counter()
+        try:
+            results[position] = fn(*args[position])
+        except Exception as e:
+            results[position] = e
+        latencies[position] = (time.perf_counter() - started) * 1000
+
+    def worker(positions):
+        barrier.wait()
+        for position in positions:
+            call(position)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for w in range(workers):
+            pool.submit(worker, range(w, len(args), workers))
+        barrier.wait()
+        started = time.perf_counter()
+    return results, latencies, time.perf_counter() - started
+
+
+def summary(values: list[float]) -> str:
+    ordered = sorted(values)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"median {statistics.median(values):7.2f} ms  p99 {p99:7.2f} ms  max {max(values):7.2f} ms"
+
+
+def event_state(event_id: int) -> dict:
+    with engine.connect() as conn:
+        return {
+            "seats_taken": conn.execute(
+                text("SELECT seats_taken FROM events WHERE id = :event_id"),
+                {"event_id": event_id},
+            ).scalar(),
+            "holders": [
+                row.user_id
+                for row in conn.execute(
+                    text("SELECT user_id FROM event_passes WHERE event_id = :event_id"),
+                    {"event_id": event_id},
+                )
+            ],
+            "distinct_codes": conn.execute(
+                text("SELECT COUNT(DISTINCT pass_code) FROM event_passes WHERE event_id = :event_id"),
+                {"event_id": event_id},
+            ).scalar(),
+            "waitlist": [
+                row.user_id
+                for row in conn.execute(
+                    text("SELECT user_id FROM event_waitlist WHERE event_id = :event_id ORDER BY id"),
+                    {"event_id": event_id},
+                )
+            ],
+        }
+
+
+def check(failures: list, label: str, ok: bool):
+    print(f"  {'ok  ' if ok else 'FAIL'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event seat allocation under contention")
+    parser.add_argument("--attendees", type=int, default=1000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--cancel", type=int, default=20, help="pass holders who cancel afterwards")
+    parser.add_argument("--workers", type=int, default=DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    args = parser.parse_args()
+
+    event_id, user_ids = setup(args.attendees, args.capacity)
+    print(f"event {event_id}: {args.attendees} attendees, {args.capacity} seats, {args.workers} workers")
+
+    results, latencies, elapsed = run_concurrently(
+        create_event_pass,
+        [(event_id, user_id, None) for user_id in user_ids],
+        args.workers,
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    created = [u for u, r in zip(user_ids, results) if isinstance(r, dict) and r["status"] == "created"]
+    waitlisted = [u for u, r in zip(user_ids, results) if isinstance(r, dict) and r["status"] == "waitlisted"]
+    print(f"attend: {elapsed:.2f}s  {len(results) / elapsed:,.0f} attends/sec  {summary(latencies)}")
+    print(f"  created {len(created)}  waitlisted {len(waitlisted)}  errors {len(errors)}")
+    for e in errors[:5]:
+        print(f"  error: {e!r}")
+
+    seats = min(args.capacity, args.attendees)
+    state = event_state(event_id)
+    failures = []
+    check(failures, "no errors", not errors)
+    check(failures, f"{seats} passes issued", len(created) == seats == len(state["holders"]))
+    check(failures, "seats_taken matches the passes", state["seats_taken"] == len(state["holders"]))
+    check(failures, "pass codes are distinct", state["distinct_codes"] == len(state["holders"]))
+    check(failures, "everyone else is waitlisted", sorted(waitlisted) == sorted(state["waitlist"]))
+
+    cancelling = random.sample(created, min(args.cancel, len(created)))
+    expected = state["waitlist"][:len(cancelling)]
+    results, latencies, elapsed = run_concurrently(
+        cancel_event_pass,
+        [(event_id, user_id, None) for user_id in cancelling],
+        args.workers,
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    promoted = [p["user_id"] for r in results if isinstance(r, dict) for p in r["promoted"]]
+    if cancelling:
+        print(f"cancel: {elapsed:.2f}s  {len(results) / elapsed:,.0f} cancels/sec  {summary(latencies)}")
+    print(f"  cancelled {len(cancelling)}  promoted {len(promoted)}  errors {len(errors)}")
+
+    after = event_state(event_id)
+    check(failures, "no cancel errors", not errors)
+    check(failures, "promotions fill the freed seats", len(after["holders"]) == seats == after["seats_taken"])
+    check(failures, "waitlist promoted in FIFO order", sorted(promoted) == sorted(expected))
+    check(failures, "promoted members left the waitlist", after["waitlist"] == state["waitlist"][len(promoted):])
+
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
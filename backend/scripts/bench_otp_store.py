@@ -0,0 +1,52 @@
+"""
+Benchmark InMemoryOTPStore with a large number of outstanding codes.
+
+Usage (from backend/):
+    python -m scripts.bench_otp_store --codes 1000000
+"""
+import argparse
+import random
+import resource
+import time
+
+from app.services.otp_store import InMemoryOTPStore
+
+
+def timed(label: str, count: int, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {count:>9} ops  {elapsed:7.2f}s  {count / elapsed:12.0f} ops/sec  {elapsed / count * 1e6:7.2f} us/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory OTP store")
+    parser.add_argument("--codes", type=int, default=1_000_000)
+    parser.add_argument("--ops", type=int, default=200_000)
+    args = parser.parse_args()
+
+    store = InMemoryOTPStore(max_entries=args.codes)
+    phones = [f"9{i:09d}" for i in range(args.codes)]
+
+    timed("fill (put)", args.codes, lambda: [store.put(p, "123456", 300) for p in phones])
+    max_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"outstanding codes: {len(store)}  process max RSS: {max_rss_mib:.0f} MiB")
+
+    sample = random.sample(phones, args.ops)
+    timed("put at capacity (overwrite)", args.ops, lambda: [store.put(p, "654321", 300) for p in sample])
+    timed("verify wrong code", args.ops, lambda: [store.verify(p, "000000") for p in sample])
+    timed("verify right code", args.ops, lambda: [store.verify(p, "654321") for p in sample])
+
+    new_phones = [f"8{i:09d}" for i in range(args.ops)]
+    timed("put new at capacity (evict)", args.ops, lambda: [store.put(p, "111111", 300) for p in new_phones])
+
+    # Sweep as if every code in a full store had expired
+    expiring = InMemoryOTPStore(max_entries=args.codes)
+    for p in phones:
+        expiring.put(p, "123456", 300)
+    timed("sweep expired", args.codes, lambda: expiring._sweep_locked(time.time() + 301))
+    print(f"left after sweep: {len(expiring)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark PushHub fan-out to a large number of connected subscribers.
+
+Every subscriber listens to one shared club topic and its own user topic,
+and is drained by its own task, as /me/stream does per connection.
+Reports how long a club-wide message takes to reach the last subscriber.
+
+Usage (from backend/):
+    python -m scripts.bench_push_fanout --subscribers 10000 --messages 200
+"""
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+
+from app.core.push import PushHub
+
+
+async def run(subscribers: int, messages: int, queue_size: int):
+    hub = PushHub(queue_size=queue_size, keepalive_seconds=None)
+
+    started = time.perf_counter()
+    subscriptions = [hub.subscribe(["club:1", f"user:{i}"]) for i in range(subscribers)]
+    elapsed = time.perf_counter() - started
+    print(f"subscribe {subscribers} clients: {elapsed * 1000:.1f} ms  {hub.stats()['topics']} topics")
+
+    received = 0
+    all_received = asyncio.Event()
+
+    async def reader(subscription):
+        nonlocal received
+        while True:
+            message = await subscription.get()
+            if message.event == "stop":
+                return
+            received += 1
+            if received == subscribers:
+                all_received.set()
+
+    readers = [asyncio.ensure_future(reader(s)) for s in subscriptions]
+    await asyncio.sleep(0)
+
+    publish_ms = []
+    delivery_ms = []
+    for i in range(messages):
+        received = 0
+        all_received.clear()
+        started = time.perf_counter()
+        hub.publish(["club:1"], "announcement", {"club_id": 1, "id": i, "title": "Bench", "message": "x" * 200})
+        published = time.perf_counter()
+        await all_received.wait()
+        done = time.perf_counter()
+        publish_ms.append((published - started) * 1000)
+        delivery_ms.append((done - started) * 1000)
+
+    # One user-topic message: only its owner should wake up
+    received = 0
+    started = time.perf_counter()
+    hub.publish([f"user:{subscribers // 2}"], "pass", {"event_id": 1, "pass_code": "BENCH"})
+    await asyncio.sleep(0)
+    single_ms = (time.perf_counter() - started) * 1000
+
+    hub.publish(["club:1"], "stop", {})
+    await asyncio.gather(*readers)
+    for subscription in subscriptions:
+        hub.unsubscribe(subscription)
+
+    def summary(values):
+        ordered = sorted(values)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return f"median {statistics.median(values):8.2f} ms  p99 {p99:8.2f} ms  max {max(values):8.2f} ms"
+
+    print(f"club message, publish (enqueue to all):  {summary(publish_ms)}")
+    print(f"club message, until last reader woke:    {summary(delivery_ms)}")
+    print(f"deliveries/sec: {subscribers * messages / (sum(delivery_ms) / 1000):,.0f}")
+    print(f"user message to 1 of {subscribers}: {single_ms:.3f} ms, received by {received}")
+    max_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"process max RSS: {max_rss_mib:.0f} MiB  final stats: {hub.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark push fan-out")
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--queue-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.subscribers, args.messages, args.queue_size))
+
+
+if __name__ == "__main__":
+    main()
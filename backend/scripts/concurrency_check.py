@@ -0,0 +1,112 @@
+"""
+Hammer the dedupe paths of a running API from many threads at once and
+check that no duplicate rows were created.
+
+Every thread sends the same request at the same moment (a barrier releases
+them together), so without the unique indexes from migration v001 the
+SELECT-then-INSERT race lets several of them insert.
+
+Usage (from backend/, with the same DATABASE_URL as the server):
+    python -m scripts.migrate
+    uvicorn app.main:app --port 8000
+    python -m scripts.concurrency_check --token user-5 --club-id 1 --event-id 3 --threads 50 --rounds 20
+
+The user must be an active member of the event's club (for attend) and
+should have no pending request for --club-id yet, or every request is a
+duplicate and the membership check proves nothing. Each round uses a
+different dependent id from --dependent-ids (None is the user themselves).
+"""
+import argparse
+import http.client
+import json
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+
+def fire(base_url: str, path: str, token: str, payload: dict, threads: int) -> Counter:
+    url = urlparse(base_url)
+    barrier = threading.Barrier(threads)
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def worker():
+        conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        body = json.dumps(payload)
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        barrier.wait()
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except Exception as e:
+            status = type(e).__name__
+        finally:
+            conn.close()
+        with lock:
+            statuses[status] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return statuses
+
+
+def count_duplicates(table: str, columns: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            text(f"""
+                SELECT COUNT(*) FROM (
+                    SELECT 1
+                    FROM {table}
+                    GROUP BY {columns}
+                    HAVING COUNT(*) > 1
+                ) d
+            """)
+        ).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check membership and pass dedupe under concurrency")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", required=True, help="e.g. user-5")
+    parser.add_argument("--club-id", type=int, required=True)
+    parser.add_argument("--event-id", type=int, required=True)
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument(
+        "--dependent-ids",
+        default="None",
+        help="comma separated, cycled through per round, e.g. None,12,13",
+    )
+    args = parser.parse_args()
+
+    dependent_ids = [None if d.strip() == "None" else int(d) for d in args.dependent_ids.split(",")]
+
+    for path, name in [
+        (f"/me/clubs/{args.club_id}/request-membership", "request-membership"),
+        (f"/events/{args.event_id}/attend", "attend"),
+    ]:
+        totals = Counter()
+        for i in range(args.rounds):
+            payload = {"dependent_id": dependent_ids[i % len(dependent_ids)]}
+            totals.update(fire(args.base_url, path, args.token, payload, args.threads))
+        print(f"{name}: {args.rounds} rounds x {args.threads} threads, statuses {dict(totals)}")
+
+    membership_dupes = count_duplicates("memberships", "user_id, club_id, IFNULL(dependent_id, 0)")
+    pass_dupes = count_duplicates("event_passes", "event_id, user_id, IFNULL(dependent_id, 0)")
+    print(f"duplicate membership groups: {membership_dupes}")
+    print(f"duplicate event pass groups: {pass_dupes}")
+    if membership_dupes or pass_dupes:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Expire memberships whose expiry_date has passed and, with --remind-days,
+queue renewal reminders for those expiring soon.
+
+The same sweep runs in-process when MEMBERSHIP_EXPIRY_INTERVAL_SECONDS is
+set; use this from cron instead when it isn't. Each batch commits on its
+own, so an interrupted run simply continues next time.
+
+Usage (from backend/):
+    python -m scripts.expire_memberships
+    python -m scripts.expire_memberships --remind-days 14 --batch-size 1000
+    python -m scripts.expire_memberships --today 2030-01-01   # pretend it's that day
+"""
+import argparse
+import datetime
+
+from app.services.membership_expiry import (
+    MEMBERSHIP_EXPIRY_BATCH_SIZE,
+    MEMBERSHIP_REMINDER_DAYS,
+    run_expiry_sweep,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expire memberships and queue renewal reminders")
+    parser.add_argument("--batch-size", type=int, default=MEMBERSHIP_EXPIRY_BATCH_SIZE)
+    parser.add_argument("--remind-days", type=int, default=MEMBERSHIP_REMINDER_DAYS)
+    parser.add_argument("--today", type=datetime.date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    result = run_expiry_sweep(today=args.today, batch_size=args.batch_size, reminder_days=args.remind_days)
+    print(f"[EXPIRY] Expired {result['expired']} memberships")
+    if args.remind_days > 0:
+        print(f"[EXPIRY] Queued {result['reminders_queued']} renewal reminders")
+
+
+if __name__ == "__main__":
+    main()
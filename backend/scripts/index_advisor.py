@@ -0,0 +1,270 @@
+"""
+Run EXPLAIN on every SQL statement in app/db/*.py and flag plans that
+scan a whole table, read a whole index, or sort/group through a temporary
+table or filesort.
+
+Statements are collected from the text(...) calls in each module. Bind
+parameters are replaced by sample literals; dynamic pieces of f-string
+queries (keyset clauses, LIMIT) are dropped, so the base query is checked.
+DDL and plain INSERT ... VALUES statements are skipped.
+
+MySQL picks full scans on tiny tables no matter which indexes exist, so
+run it against a database with realistic row counts. --seed fills an
+empty database with synthetic data first:
+
+Usage (from backend/):
+    DATABASE_URL=mysql+pymysql://.../clubvision_explain python -m scripts.migrate
+    DATABASE_URL=mysql+pymysql://.../clubvision_explain python -m scripts.index_advisor --seed
+    python -m scripts.index_advisor --verbose     # also print plans that look fine
+
+Exits with status 1 if any statement was flagged.
+"""
+import argparse
+import ast
+import glob
+import os
+import random
+import re
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from app.db.migrations import get_pending_migrations
+from app.db.session import engine
+
+DB_DIR = os.path.join(os.path.dirname(__file__), "..", "app", "db")
+
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+
+_STRING_PARAMS = ("reason", "name", "relation", "title", "message", "description",
+                  "location", "code", "hash", "owner", "path", "error", "role")
+
+
+def collect_statements() -> list[tuple[str, int, str, str]]:
+    """
+    (file, line, function, sql) for every text(...) literal in app/db/*.py.
+    """
+    statements = []
+    for path in sorted(glob.glob(os.path.join(DB_DIR, "*.py"))):
+        with open(path) as f:
+            tree = ast.parse(f.read(), filename=path)
+        rel = os.path.relpath(path, os.path.join(DB_DIR, "..", ".."))
+        _collect(tree, rel, "<module>", statements)
+
+    return sorted(statements, key=lambda s: (s[0], s[1]))
+
+
+def _collect(node, path: str, function: str, statements: list):
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            _collect(child, path, child.name, statements)
+            continue
+        if isinstance(child, ast.Call) and child.args and _is_text_call(child):
+            sql = _literal_sql(child.args[0])
+            if sql:
+                statements.append((path, child.lineno, function, sql))
+        _collect(child, path, function, statements)
+
+
+def _is_text_call(node: ast.Call) -> bool:
+    func = node.func
+    return (isinstance(func, ast.Name) and func.id == "text") or (
+        isinstance(func, ast.Attribute) and func.attr == "text"
+    )
+
+
+def _literal_sql(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(
+            part.value for part in node.values
+            if isinstance(part, ast.Constant) and isinstance(part.value, str)
+        )
+    return None
+
+
+def _sample_value(name: str) -> str:
+    name = name.lower()
+    if "phone" in name:
+        return "'9000000001'"
+    if "date" in name:
+        return "'2026-01-01'"
+    if name == "status":
+        return "'active'"
+    if any(s in name for s in _STRING_PARAMS):
+        return "'x'"
+    return "1"
+
+
+def bind_samples(sql: str) -> str:
+    # Expanding IN parameters need parentheses around the sample
+    sql = re.sub(r"\bIN\s+:(\w+)", lambda m: f"IN ({_sample_value(m.group(1))})", sql, flags=re.I)
+    return re.sub(r"(?<![:\w]):(\w+)", lambda m: _sample_value(m.group(1)), sql)
+
+
+def explain(conn, sql: str) -> list[dict]:
+    rows = conn.exec_driver_sql("EXPLAIN " + bind_samples(sql)).mappings().all()
+    return [{k.lower(): v for k, v in row.items()} for row in rows]
+
+
+def problems(plan: list[dict], min_rows: int) -> list[str]:
+    found = []
+    for step in plan:
+        table = step.get("table") or "?"
+        extra = step.get("extra") or ""
+        rows = step.get("rows") or 0
+        # Small row estimates are cheap whatever the plan
+        if rows < min_rows:
+            continue
+        if step.get("type") == "ALL":
+            found.append(f"full table scan of {table} (~{rows} rows)")
+        if step.get("type") == "index":
+            found.append(f"full index scan of {table} (~{rows} rows)")
+        if "Using filesort" in extra:
+            found.append(f"filesort on {table} (~{rows} rows)")
+        if "Using temporary" in extra:
+            found.append(f"temporary table for {table} (~{rows} rows)")
+    return found
+
+
+def seed(users: int):
+    """
+    Fill an empty database with synthetic clubs, users, memberships,
+    events, passes and announcements, then ANALYZE the tables.
+    """
+    rng = random.Random(42)
+    clubs = max(10, users // 400)
+
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT COUNT(*) FROM users")).scalar():
+            raise SystemExit("--seed only runs on an empty database (users has rows)")
+
+        def insert(sql, rows):
+            for i in range(0, len(rows), 1000):
+                conn.execute(text(sql), rows[i:i + 1000])
+
+        insert("INSERT INTO clubs (id, name) VALUES (:id, :name)",
+               [{"id": c, "name": f"Club {c:04d}"} for c in range(1, clubs + 1)])
+        insert("INSERT INTO users (id, phone_number, full_name) VALUES (:id, :phone, :name)",
+               [{"id": u, "phone": f"9{u:09d}", "name": f"User {u}"} for u in range(1, users + 1)])
+
+        dependents = []
+        for u in range(1, users + 1):
+            for _ in range(rng.choice((0, 0, 1, 2))):
+                dependents.append({"id": len(dependents) + 1, "user_id": u,
+                                   "name": f"Dep {len(dependents) + 1}", "relation": "child"})
+        insert("INSERT INTO dependents (id, user_id, name, relation) VALUES (:id, :user_id, :name, :relation)",
+               dependents)
+        dependents_by_user = {}
+        for d in dependents:
+            dependents_by_user.setdefault(d["user_id"], []).append(d["id"])
+
+        memberships = []
+        clubs_by_user = {}
+        for u in range(1, users + 1):
+            for club_id in rng.sample(range(1, clubs + 1), rng.randint(1, 3)):
+                clubs_by_user.setdefault(u, []).append(club_id)
+                for dependent_id in [None] + dependents_by_user.get(u, []):
+                    memberships.append({
+                        "user_id": u,
+                        "club_id": club_id,
+                        "dependent_id": dependent_id,
+                        "status": rng.choice(("active", "active", "active", "pending", "rejected")),
+                        "role": "admin" if dependent_id is None and rng.random() < 0.002 else "member",
+                        "expiry_date": date(2026, 1, 1) + timedelta(days=rng.randint(0, 730)),
+                    })
+        insert("""
+            INSERT INTO memberships (user_id, club_id, dependent_id, status, role, expiry_date)
+            VALUES (:user_id, :club_id, :dependent_id, :status, :role, :expiry_date)
+        """, memberships)
+
+        events = []
+        events_by_club = {}
+        for club_id in range(1, clubs + 1):
+            for _ in range(20):
+                event_id = len(events) + 1
+                events_by_club.setdefault(club_id, []).append(event_id)
+                events.append({
+                    "id": event_id,
+                    "club_id": club_id,
+                    "title": f"Event {event_id}",
+                    "event_date": date(2025, 1, 1) + timedelta(days=rng.randint(0, 730)),
+                })
+        insert("""
+            INSERT INTO events (id, club_id, title, event_date, requires_pass)
+            VALUES (:id, :club_id, :title, :event_date, TRUE)
+        """, events)
+
+        passes = []
+        for u, user_clubs in clubs_by_user.items():
+            for club_id in user_clubs:
+                for event_id in rng.sample(events_by_club[club_id], 2):
+                    passes.append({"event_id": event_id, "user_id": u, "dependent_id": None,
+                                   "pass_code": uuid.uuid4().hex[:10]})
+        insert("""
+            INSERT INTO event_passes (event_id, user_id, dependent_id, pass_code)
+            VALUES (:event_id, :user_id, :dependent_id, :pass_code)
+        """, passes)
+
+        insert("INSERT INTO announcements (club_id, title, message) VALUES (:club_id, :title, 'x')",
+               [{"club_id": c, "title": f"News {i}"} for c in range(1, clubs + 1) for i in range(30)])
+
+        for table in ("clubs", "users", "dependents", "memberships", "events", "event_passes", "announcements"):
+            conn.execute(text(f"ANALYZE TABLE {table}"))
+
+    print(f"seeded {clubs} clubs, {users} users, {len(memberships)} memberships, "
+          f"{len(events)} events, {len(passes)} passes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the repo queries and flag slow plans")
+    parser.add_argument("--seed", action="store_true", help="fill an empty database with synthetic data first")
+    parser.add_argument("--users", type=int, default=50000, help="users to create with --seed")
+    parser.add_argument("--min-rows", type=int, default=100,
+                        help="ignore plan steps estimated below this many rows")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    pending = get_pending_migrations()
+    if pending:
+        print(f"warning: {len(pending)} migrations are pending, run python -m scripts.migrate first")
+
+    if args.seed:
+        seed(args.users)
+
+    flagged = 0
+    checked = 0
+    with engine.connect() as conn:
+        for path, line, function, sql in collect_statements():
+            if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+                continue
+
+            checked += 1
+            try:
+                plan = explain(conn, sql)
+            except Exception as e:
+                print(f"{path}:{line} {function}\n    could not EXPLAIN: {str(e).splitlines()[0]}")
+                continue
+
+            found = problems(plan, args.min_rows)
+            if found:
+                flagged += 1
+            if found or args.verbose:
+                print(f"{path}:{line} {function}")
+                for step in plan:
+                    print(
+                        f"    {step.get('table')}: type={step.get('type')} key={step.get('key')} "
+                        f"rows={step.get('rows')} {step.get('extra') or ''}"
+                    )
+                for problem in found:
+                    print(f"    !! {problem}")
+
+    print(f"{checked} statements checked, {flagged} flagged")
+    if flagged:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
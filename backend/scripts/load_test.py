@@ -0,0 +1,104 @@
+"""
+Closed-loop load test for a running API, to compare DB_ASYNC=false and DB_ASYNC=true.
+
+Usage (from backend/):
+    # terminal 1
+    DB_ASYNC=false uvicorn app.main:app --port 8000
+    # terminal 2
+    python -m scripts.load_test --user-id 1 --path /me/clubs --concurrency 200 --requests 20000
+
+--user-id signs a token for that user with AUTH_TOKEN_KEYS, so run both
+terminals with the same keys (or ALLOW_DEV_KEYS=1 on both). --token sends a
+token you already have instead.
+
+Then restart the server with DB_ASYNC=true and run the same command.
+Reports req/s and p50/p90/p99 latency.
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+
+
+def worker(base_url: str, path: str, token: str, count: int, latencies: list, failures: list):
+    url = urlparse(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                failures.append(response.status)
+        except Exception as e:
+            failures.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    conn.close()
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a GET endpoint")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/me/clubs")
+    auth = parser.add_mutually_exclusive_group(required=True)
+    auth.add_argument("--user-id", type=int, help="sign a token for this user")
+    auth.add_argument("--token", help="bearer token to send as is")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=10000)
+    args = parser.parse_args()
+
+    token = args.token
+    if token is None:
+        # Imported here so --token works without the server's key settings
+        from app.core.tokens import issue_token
+
+        token, _ = issue_token(args.user_id, [])
+
+    per_worker = max(1, args.requests // args.concurrency)
+    latencies = []
+    failures = []
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(args.base_url, args.path, token, per_worker, latencies, failures),
+        )
+        for _ in range(args.concurrency)
+    ]
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    if not latencies:
+        print(f"all {len(failures)} requests failed: {set(failures)}")
+        return
+
+    print(f"path={args.path} concurrency={args.concurrency}")
+    print(f"requests={len(latencies)} failures={len(failures)} seconds={elapsed:.2f}")
+    print(f"req/s={len(latencies) / elapsed:.1f}")
+    print(
+        f"p50={percentile(latencies, 50):.1f}ms "
+        f"p90={percentile(latencies, 90):.1f}ms "
+        f"p99={percentile(latencies, 99):.1f}ms "
+        f"mean={statistics.mean(latencies):.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Apply schema migrations (app/db/migrations) to DATABASE_URL.
+
+Usage (from backend/):
+    python -m scripts.migrate              # apply everything pending
+    python -m scripts.migrate --status     # list applied and pending versions
+    python -m scripts.migrate --to 1       # apply up to and including v001
+
+Run it before starting a release that depends on the new schema.
+"""
+import argparse
+
+from app.db.migrations import apply_migrations, get_applied_versions, load_migrations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations")
+    parser.add_argument("--status", action="store_true", help="show versions and exit")
+    parser.add_argument("--to", type=int, default=None, help="last version to apply")
+    args = parser.parse_args()
+
+    if args.status:
+        applied = get_applied_versions()
+        for version, name, module in load_migrations():
+            state = "applied" if version in applied else "pending"
+            print(f"v{version:03d} {state:8} {name}: {module.DESCRIPTION}")
+        return
+
+    versions = apply_migrations(target=args.to)
+    if not versions:
+        print("[MIGRATE] Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Recount the materialized dashboard counters (club_counters and
+events.seats_taken) from the memberships and event_passes tables.
+
+The write paths keep the counters up to date; run this after editing
+memberships or passes by hand, or whenever /admin/clubs/{id}/stats looks off.
+
+Usage (from backend/):
+    python -m scripts.rebuild_club_stats                # every club
+    python -m scripts.rebuild_club_stats --club-id 3    # one club
+"""
+import argparse
+
+from app.db.club_stats_repo import rebuild_club_counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild club dashboard counters")
+    parser.add_argument("--club-id", type=int, default=None)
+    args = parser.parse_args()
+
+    drift = rebuild_club_counters(args.club_id)
+    for c in drift["counters"]:
+        print(f"[STATS] club {c['club_id']} {c['counter']}: {c['stored']} -> {c['actual']}")
+    for e in drift["events"]:
+        print(f"[STATS] event {e['event_id']} seats_taken: {e['stored']} -> {e['actual']}")
+    if not drift["counters"] and not drift["events"]:
+        print("[STATS] Counters were up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,12 @@ import { getClubAnnouncements } from '../../lib/api/announcements';
 import { fetchMyClubs, type ClubResponse } from '../../lib/api/clubs';
 import { getClubEvents } from '../../lib/api/events';
 import {
-  generateEventPass,
+  generateEventPasses,
   getMyEventPasses,
 } from '../../lib/api/event_passes';
 import { getDependents } from '../../lib/api/dependents';
 import { APIError } from '../../lib/api/errors';
+import { subscribePush } from '../../lib/api/stream';
 import {
   getMembershipStatusConfig,
   membershipAllowsActions,
@@ -144,6 +145,18 @@ export default function ClubDetailScreen() {
     if (!isNaN(clubId)) loadData();
   }, [clubId]);
 
+  // Refresh on server push instead of polling
+  useEffect(() => {
+    if (isNaN(clubId)) return;
+    return subscribePush(({ event, data }) => {
+      if (event === 'announcement' && data.club_id === clubId) {
+        getClubAnnouncements(clubId).then(setAnnouncements).catch(() => {});
+      } else if ((event === 'membership' && data.club_id === clubId) || event === 'reconnected') {
+        loadData();
+      }
+    });
+  }, [clubId]);
+
   async function openAttend(event: ClubEvent) {
     if (!club) return;
 
@@ -193,11 +206,21 @@ export default function ClubDetailScreen() {
     }
 
     try {
-      for (const depId of selectedMembers) {
-        await generateEventPass(selectedEvent.id, depId);
-      }
+      const results = await generateEventPasses(
+        selectedMembers.map((depId) => ({
+          event_id: selectedEvent.id,
+          dependent_id: depId,
+        }))
+      );
 
-      alert('Passes generated successfully');
+      const waitlisted = results.filter((r) => r.status === 'waitlisted');
+      if (results.some((r) => r.status === 'not_member')) {
+        alert('Some passes could not be generated: only active members can attend');
+      } else if (waitlisted.length > 0) {
+        alert(`The event is full: added to the waitlist (position ${waitlisted[0].position})`);
+      } else {
+        alert('Passes generated successfully');
+      }
       setShowAttend(false);
       // Refresh data to show new passes
       loadData();
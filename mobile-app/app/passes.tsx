@@ -2,6 +2,7 @@ import { View, Text, ScrollView, TouchableOpacity } from 'react-native';
 import { useEffect, useState } from 'react';
 import { getMyPasses } from '../lib/api/passes';
 import { APIError } from '../lib/api/errors';
+import { subscribePush } from '../lib/api/stream';
 
 type Pass = {
   id: number;
@@ -36,6 +37,15 @@ export default function MyPassesScreen() {
     loadPasses();
   }, []);
 
+  // New passes arrive by server push
+  useEffect(() => {
+    return subscribePush(({ event }) => {
+      if (event === 'pass' || event === 'reconnected') {
+        getMyPasses().then(setPasses).catch(() => {});
+      }
+    });
+  }, []);
+
   if (loading) {
     return (
       <View
@@ -1,7 +1,7 @@
 import { getSharedAuthToken, getLogoutCallback } from '../auth/tokenStorage';
 import { APIError } from './errors';
 
-const BASE_URL =
+export const BASE_URL =
   process.env.EXPO_PUBLIC_API_BASE_URL ??
   (__DEV__
     ? 'http://192.168.1.118:8000'
@@ -31,14 +31,22 @@ export function getAuthToken() {
   return getSharedAuthToken();
 }
   
+// Last ETag and body of each GET, keyed by token + path. List endpoints
+// answer 304 Not Modified when nothing changed and the body is reused.
+const etagCache = new Map<string, { etag: string; body: unknown }>();
+
 async function request(
   path: string,
   options: RequestInit = {}
 ) {
   const authToken = getSharedAuthToken();
+  const isGet = !options.method || options.method === 'GET';
+  const cacheKey = `${authToken ?? ''} ${path}`;
+  const cached = isGet ? etagCache.get(cacheKey) : undefined;
   const headers: HeadersInit = {
     'Content-Type': 'application/json',
     ...(authToken ? { Authorization: `Bearer ${authToken}` } : {}),
+    ...(cached ? { 'If-None-Match': cached.etag } : {}),
     ...options.headers,
   };
   
@@ -69,6 +77,10 @@ async function request(
     throw new APIError('Network error. Please check your connection.', 0, '');
   }
   
+  if (response.status === 304 && cached) {
+    return cached.body;
+  }
+
   if (!response.ok) {
     const statusCode = response.status;
     
@@ -106,7 +118,12 @@ async function request(
   
   // Parse JSON response
   try {
-    return responseText ? JSON.parse(responseText) : {};
+    const body = responseText ? JSON.parse(responseText) : {};
+    const etag = response.headers.get('ETag');
+    if (isGet && etag) {
+      etagCache.set(cacheKey, { etag, body });
+    }
+    return body;
   } catch (error) {
     // If response is not JSON, return empty object
     return {};
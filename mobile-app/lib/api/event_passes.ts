@@ -9,6 +9,26 @@ export async function generateEventPass(
   });
 }
 
+export type PassRequest = {
+  event_id: number;
+  dependent_id: number | null;
+};
+
+export type PassResult = PassRequest & {
+  status: 'created' | 'existing' | 'waitlisted' | 'not_member';
+  pass_code: string | null;
+  // Place in line when waitlisted
+  position?: number;
+};
+
+// Many passes in one request, e.g. every selected family member
+export async function generateEventPasses(
+  items: PassRequest[]
+): Promise<PassResult[]> {
+  const response = await api.post('/me/passes/batch', { items });
+  return response.results;
+}
+
 export async function getMyEventPasses(eventId: number) {
   return api.get(`/events/${eventId}/passes/me`);
 }
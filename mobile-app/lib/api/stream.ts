@@ -0,0 +1,95 @@
+import { fetch } from 'expo/fetch';
+import { getSharedAuthToken } from '../auth/tokenStorage';
+import { BASE_URL } from './client';
+
+// 'announcement' | 'membership' | 'pass' from the server, plus 'reconnected'
+// when the stream comes back after dropping: updates may have been missed
+// while it was down, so screens refresh their lists on it.
+export type PushEvent = {
+  event: string;
+  data: any;
+};
+
+type Listener = (event: PushEvent) => void;
+
+const listeners = new Set<Listener>();
+let controller: AbortController | null = null;
+let retryMs = 5000;
+
+function emit(event: PushEvent) {
+  for (const listener of Array.from(listeners)) {
+    listener(event);
+  }
+}
+
+function handleBlock(block: string) {
+  let event = 'message';
+  let data = '';
+  for (const line of block.split('\n')) {
+    if (line.startsWith('event: ')) event = line.slice(7);
+    else if (line.startsWith('data: ')) data += line.slice(6);
+    else if (line.startsWith('retry: ')) retryMs = Number(line.slice(7)) || retryMs;
+  }
+  if (!data) return;
+  try {
+    emit({ event, data: JSON.parse(data) });
+  } catch {
+    // Ignore malformed frames
+  }
+}
+
+async function run(signal: AbortSignal) {
+  let opened = false;
+  while (!signal.aborted) {
+    const token = getSharedAuthToken();
+    try {
+      if (!token) throw new Error('Not logged in');
+      const response = await fetch(`${BASE_URL}/me/stream`, {
+        headers: { Authorization: `Bearer ${token}`, Accept: 'text/event-stream' },
+        signal,
+      });
+      if (!response.ok || !response.body) throw new Error(`Stream failed: ${response.status}`);
+
+      if (opened) emit({ event: 'reconnected', data: null });
+      opened = true;
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let end = buffer.indexOf('\n\n');
+        while (end !== -1) {
+          handleBlock(buffer.slice(0, end));
+          buffer = buffer.slice(end + 2);
+          end = buffer.indexOf('\n\n');
+        }
+      }
+    } catch {
+      // Dropped or refused: retry below
+    }
+    if (signal.aborted) return;
+    await new Promise((resolve) => setTimeout(resolve, retryMs));
+  }
+}
+
+/**
+ * Listen to server push (GET /me/stream) instead of polling list endpoints.
+ * One connection is shared by all listeners and closed when the last one
+ * unsubscribes. Returns the unsubscribe function.
+ */
+export function subscribePush(listener: Listener): () => void {
+  listeners.add(listener);
+  if (!controller) {
+    controller = new AbortController();
+    run(controller.signal);
+  }
+  return () => {
+    listeners.delete(listener);
+    if (listeners.size === 0 && controller) {
+      controller.abort();
+      controller = null;
+    }
+  };
+}